@@ -0,0 +1,259 @@
+"""Набір бенчмарків ядра симуляції без GUI з відстеженням регресій.
+
+Запуск:
+    python benchmarks.py                         # виміряти й надрукувати
+    python benchmarks.py --save baseline.json    # записати базову лінію
+    python benchmarks.py --baseline baseline.json --threshold 0.15
+
+Для кожного випадку вимірюється найкращий з --repeat замірів (короткі
+прогони повторюються в межах заміру не менше MIN_TIME секунд) і рахуються
+кроки сітки виводу (для kernel/* — виклики похідних) та обчислення
+похідних за секунду. Кількість
+обчислень похідних визначається окремим, не хронометрованим прогоном з
+лічильником навколо _scalar_kernel, тож на час він не впливає. Якщо
+задано --baseline, програма завершується з кодом 1, коли кроки/с
+будь-якого випадку впали більше ніж на threshold відносно базової лінії.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time as clock
+
+import numpy as np
+
+from rgr import AircraftSimulator
+from sweep import grid, run_sweep
+
+MODES = ("free_flight", "controlled", "special_rv")
+METHODS = ("euler", "rk4", "exact", "rk45")
+DT_LADDER = (0.5, 0.01, 0.001)  # завдання 2.8.1
+MIN_TIME = 0.05
+
+
+def _run_params(mode, **params):
+    y0 = [0.0, 0.0, 0.0, 0.0, 0.0] if mode == "controlled" else None
+    params = {"mode": mode, **params}
+    if y0 is not None:
+        params.setdefault("y0", y0)
+    return params
+
+
+def _steps(params):
+    return len(np.arange(0, params.get("T_end", 100.0), params.get("dt", 0.01)))
+
+
+def _simulation_case(params):
+    def setup():
+        sim = AircraftSimulator()
+        return lambda: sim.run_simulation(params), _steps(params)
+
+    return setup
+
+
+def _batch_case(n, **params):
+    params_list = [
+        _run_params("controlled", kv=kv, **params) for kv in np.linspace(2, 8, n)
+    ]
+
+    def setup():
+        sim = AircraftSimulator()
+        return lambda: sim.run_batch(params_list), n * _steps(params_list[0])
+
+    return setup
+
+
+def _sweep_case(n, workers, **params):
+    samples = grid(kv=np.linspace(2, 8, n).tolist())
+    params = _run_params("controlled", **params)
+
+    def setup():
+        def run():
+            run_sweep(samples, base_params=params, workers=workers)
+
+        return run, n * _steps(params)
+
+    return setup
+
+
+def _branch_case(n, shared, **params):
+    # Завдання 2.8.3 для n моментів відмови: окремі прогони або спільний префікс
+    params = _run_params("controlled", **params)
+    T_end = params.get("T_end", 100.0)
+    times = np.linspace(0, T_end, n + 2)[1:-1].tolist()
+    branches = [(t, {"failure": True, "failure_time": t}) for t in times]
+
+    def setup():
+        sim = AircraftSimulator()
+        if shared:
+            return lambda: sim.run_branches(params, branches), n * _steps(params)
+
+        def run():
+            for _, changes in branches:
+                sim.run_simulation({**params, **changes})
+
+        return run, n * _steps(params)
+
+    return setup
+
+
+def _kernel_case(kind, calls=100_000):
+    def setup():
+        sim = AircraftSimulator()
+        y = np.array([1.0, np.deg2rad(1.0), 0.01, 0.02, 5.0])
+        delta_v_rad, delta_g = float(np.deg2rad(-2.0)), 0.3
+        if kind == "numpy":
+            eom = sim._equations_of_motion
+
+            def run():
+                for _ in range(calls):
+                    eom(y, delta_v_rad, delta_g, "controlled")
+
+        else:
+            f, _ = sim._scalar_kernel("controlled")
+            args = (*y[:4].tolist(), delta_v_rad, delta_g)
+
+            def run():
+                for _ in range(calls):
+                    f(*args)
+
+        return run, calls
+
+    return setup
+
+
+def cases(quick=False):
+    """Словник {назва: setup}; setup() -> (функція прогону, кількість кроків)."""
+    T_end = 20.0 if quick else 100.0
+    result = {}
+    for method in METHODS:
+        for mode in MODES:
+            params = _run_params(mode, method=method, T_end=T_end)
+            result[f"{method}/{mode}"] = _simulation_case(params)
+    for dt in DT_LADDER:
+        params = _run_params("controlled", method="rk4", dt=dt, T_end=T_end)
+        result[f"dt/{dt:g}"] = _simulation_case(params)
+    long_T = 200.0 if quick else 1000.0
+    for method in ("rk4", "rk45"):
+        params = _run_params("controlled", method=method, T_end=long_T)
+        result[f"long/{method}"] = _simulation_case(params)
+    result["batch/rk4x64"] = _batch_case(64, method="rk4", T_end=T_end)
+    result["sweep/serial"] = _sweep_case(16, 1, T_end=T_end)
+    result["sweep/parallel"] = _sweep_case(16, None, T_end=T_end)
+    result["branch/separate"] = _branch_case(8, False, method="rk4", T_end=T_end)
+    result["branch/shared"] = _branch_case(8, True, method="rk4", T_end=T_end)
+    result["kernel/numpy"] = _kernel_case("numpy", 20_000 if quick else 100_000)
+    result["kernel/scalar"] = _kernel_case("scalar", 20_000 if quick else 100_000)
+    return result
+
+
+def count_evaluations(run):
+    """Кількість викликів похідних за один прогін (через _scalar_kernel)."""
+    original = AircraftSimulator._scalar_kernel
+    calls = [0]
+
+    def counting_kernel(self, *args, **kwargs):
+        f, alpha_rate = original(self, *args, **kwargs)
+
+        def counted(*state):
+            calls[0] += 1
+            return f(*state)
+
+        return counted, alpha_rate
+
+    AircraftSimulator._scalar_kernel = counting_kernel
+    try:
+        run()
+    finally:
+        AircraftSimulator._scalar_kernel = original
+    return calls[0]
+
+
+def measure(setup, repeat=3, count=True):
+    run, steps = setup()
+    # Лічильник працює лише для прогонів через _scalar_kernel у цьому процесі
+    evaluations = count_evaluations(setup()[0]) if count else None
+    best = min(_timed(run) for _ in range(repeat))
+    result = {"seconds": best, "steps": steps, "steps_per_s": steps / best}
+    if evaluations:
+        result["evaluations"] = evaluations
+        result["evaluations_per_s"] = evaluations / best
+    return result
+
+
+def _timed(run):
+    """Середній час одного прогону в замірі тривалістю не менше MIN_TIME."""
+    number, elapsed = 0, 0.0
+    start = clock.perf_counter()
+    while elapsed < MIN_TIME:
+        run()
+        number += 1
+        elapsed = clock.perf_counter() - start
+    return elapsed / number
+
+
+def compare(results, baseline, threshold):
+    """Список регресій: (назва, було кроків/с, стало кроків/с)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        if current["steps_per_s"] < previous["steps_per_s"] * (1.0 - threshold):
+            regressions.append((name, previous["steps_per_s"], current["steps_per_s"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="короткі прогони")
+    parser.add_argument("--filter", default="", help="підрядок назви випадку")
+    parser.add_argument("--save", help="записати результати у JSON")
+    parser.add_argument("--baseline", help="JSON базової лінії для порівняння")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, setup in cases(args.quick).items():
+        if args.filter not in name:
+            continue
+        count = not name.startswith(("sweep/", "batch/", "kernel/"))
+        results[name] = measure(setup, args.repeat, count)
+        r = results[name]
+        line = f"{name:24s} {r['seconds'] * 1e3:9.2f} мс"
+        line += f" {r['steps_per_s']:14,.0f} кроків/с"
+        if "evaluations_per_s" in r:
+            line += f"  {r['evaluations_per_s']:14,.0f} похідних/с"
+        print(line)
+
+    if args.save:
+        report = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "quick": args.quick,
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline.get("quick", False) != args.quick:
+            parser.error("базова лінія записана з іншим значенням --quick")
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(
+                f"РЕГРЕСІЯ {name}: {before:,.0f} -> {after:,.0f} кроків/с "
+                f"({after / before - 1:+.1%})"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Кеш результатів run_simulation з адресацією за вмістом.
+
+Ключ — SHA-256 від нормалізованих params разом із «відбитком» моделі
+(c, e, delta_v_bal_rad, V0, g та параметри автопілота), тож зміна
+коефіцієнтів автоматично дає інші ключі. params, що не серіалізуються в
+JSON (наприклад, функція coefficient_schedule), не кешуються: get дає
+промах, а put лише повертає історію. У пам'яті зберігається LRU,
+обмежений сумарним розміром масивів; за бажанням результати також
+записуються у .npz на диск, по підкаталогу на кожен відбиток моделі;
+GUI та cli.py типово зберігають їх у default_directory().
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+# Змінюється, коли змінюється чисельна схема, щоб не підхоплювати старі файли
+CACHE_VERSION = 2
+# Каталог дискового кешу; порожнє значення вимикає диск
+CACHE_ENV = "AIRCRAFT_SIM_CACHE"
+
+RUN_DEFAULTS = {
+    "dt": 0.01,
+    "method": "rk4",
+    "mode": "free_flight",
+    "T_end": 100.0,
+    "y0": [0.0, float(np.deg2rad(1.0)), 0.0, 0.0, 0.0],
+}
+
+
+def default_directory():
+    """Каталог дискового кешу: $AIRCRAFT_SIM_CACHE або кеш користувача ОС.
+
+    Повертає None, якщо змінна оточення задана порожньою (диск вимкнено).
+    """
+    path = os.environ.get(CACHE_ENV)
+    if path is not None:
+        return path or None
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "aircraft-flight-simulator")
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    return value
+
+
+def _digest(data):
+    text = json.dumps(_normalize(data), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SimulationCache:
+    """LRU-кеш історій у пам'яті (max_bytes) з необов'язковим сховищем на диску.
+
+    Повернені масиви позначені лише для читання, бо спільні для всіх
+    звернень з тим самим ключем.
+    """
+
+    def __init__(self, simulator, max_bytes=256 * 2**20, directory=None):
+        self.simulator = simulator
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def model_fingerprint(self):
+        sim = self.simulator
+        return _digest(
+            {
+                "version": CACHE_VERSION,
+                "c": sim.c,
+                "e": sim.e,
+                "delta_v_bal_rad": sim.delta_v_bal_rad,
+                "V0": sim.V0,
+                "g": sim.g,
+                "controller": sim.CONTROLLER_DEFAULTS,
+            }
+        )
+
+    def key(self, params):
+        """Ключ params або None, якщо params не серіалізуються."""
+        # Явно задані типові значення дають той самий прогін, а отже й ключ
+        normalized = {
+            **RUN_DEFAULTS,
+            **self.simulator.CONTROLLER_DEFAULTS,
+            "gain_factor": 1.0,
+            **params,
+        }
+        try:
+            params_hash = _digest(normalized)
+        except TypeError:
+            return None
+        return self.model_fingerprint()[:16] + "-" + params_hash
+
+    def get(self, params):
+        """Історія з кешу або None."""
+        key = self.key(params)
+        if key is None:
+            self.misses += 1
+            return None
+        history = self._entries.get(key)
+        if history is not None:
+            self._entries.move_to_end(key)
+        elif self.directory is not None:
+            history = self._load(key)
+            if history is not None:
+                self._remember(key, history)
+        if history is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return history
+
+    def put(self, params, history):
+        key = self.key(params)
+        history = self._freeze(history)
+        if key is None:
+            return history
+        self._remember(key, history)
+        if self.directory is not None:
+            self._store(key, history)
+        return history
+
+    def run_simulation(self, params):
+        history = self.get(params)
+        if history is None:
+            history = self.put(params, self.simulator.run_simulation(params))
+        return history
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        if self.directory is not None and os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+
+    def prune(self):
+        """Видаляє з диска результати, пораховані для інших коефіцієнтів моделі."""
+        if self.directory is None or not os.path.isdir(self.directory):
+            return
+        current = self.model_fingerprint()[:16]
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name != current and os.path.isdir(path):
+                shutil.rmtree(path)
+
+    @staticmethod
+    def _freeze(history):
+        frozen = {}
+        for name, values in history.items():
+            array = np.array(values, dtype=float)
+            array.flags.writeable = False
+            frozen[name] = array
+        return frozen
+
+    def _remember(self, key, history):
+        size = sum(array.nbytes for array in history.values())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= sum(a.nbytes for a in self._entries.pop(key).values())
+        self._entries[key] = history
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= sum(array.nbytes for array in evicted.values())
+
+    def _path(self, key):
+        model, params_hash = key.split("-", 1)
+        return os.path.join(self.directory, model, params_hash + ".npz")
+
+    def _load(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return self._freeze({name: data[name] for name in data.files})
+
+    def _store(self, key, history):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **history)
+        os.replace(tmp_path, path)
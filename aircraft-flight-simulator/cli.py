@@ -0,0 +1,190 @@
+"""Пакетні прогони run_simulation без GUI за файлами сценаріїв.
+
+Запуск:
+    python cli.py scenarios.toml -o results            # або python rgr.py ...
+    python cli.py a.json b.json --workers 4 --format csv
+
+Файл сценаріїв (JSON або TOML) містить або один сценарій — словник params
+для run_simulation, або список "scenarios" таких словників. Таблиця
+"defaults" доповнює кожен сценарій. Ключ "name" задає ім'я файлу
+результату (інакше — ім'я файлу сценаріїв з номером), а таблиця
+"aircraft" передається в AircraftSimulator.update_parameters. Спрацювання
+подій "events" (див. events.py) друкуються та записуються поруч з
+результатом у <назва>.events.json. Історії сценаріїв без подій кешуються
+на диску (cache.py) у --cache-dir, типово cache.default_directory();
+--no-cache вимикає кеш.
+Приклад TOML:
+
+    [defaults]
+    mode = "controlled"
+    y0 = [0, 0, 0, 0, 0]
+
+    [[scenarios]]
+    name = "dt_0.01"
+    dt = 0.01
+
+    [[scenarios]]
+    name = "heavy"
+    aircraft = { G = 80000 }
+
+    [[scenarios.events]]
+    type = "settle"
+    channel = "V"
+    target = 10.0
+    tol = 0.5
+    dwell = 5.0
+    action = "stop"
+"""
+
+import argparse
+import json
+import os
+import sys
+import time as clock
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from cache import SimulationCache, default_directory
+from rgr import AircraftSimulator
+from trajectory import TrajectoryWriter
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python 3.10
+    tomllib = None
+
+FORMATS = ("npz", "csv", "traj")
+
+
+def load_scenarios(path):
+    """Список пар (назва, params) з файлу JSON або TOML."""
+    stem, extension = os.path.splitext(os.path.basename(path))
+    if extension.lower() == ".toml":
+        if tomllib is None:
+            raise ValueError("Для TOML потрібен Python 3.11+ (модуль tomllib)")
+        with open(path, "rb") as file:
+            data = tomllib.load(file)
+    else:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+    if isinstance(data, list):
+        data = {"scenarios": data}
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: очікується словник або список сценаріїв")
+    defaults = data.get("defaults", {})
+    if "scenarios" in data:
+        scenarios = data["scenarios"]
+    else:
+        scenarios = [{k: v for k, v in data.items() if k != "defaults"}]
+
+    result = []
+    for index, scenario in enumerate(scenarios):
+        params = {**defaults, **scenario}
+        default_name = f"{stem}_{index}" if len(scenarios) > 1 else stem
+        name = str(params.pop("name", default_name))
+        result.append((name, params))
+    return result
+
+
+def run_scenario(params, cache_dir=None):
+    """Виконує один сценарій; повертає (історія, секунди, спрацювання подій).
+
+    cache_dir — каталог дискового кешу; сценарії з подіями не кешуються,
+    бо кеш не зберігає спрацювань.
+    """
+    params = dict(params)
+    simulator = AircraftSimulator()
+    if "aircraft" in params:
+        simulator.update_parameters(**params.pop("aircraft"))
+    event_log = []
+    start = clock.perf_counter()
+    if cache_dir is not None and not params.get("events"):
+        # Лише диск: кожен сценарій виконується один раз за запуск
+        cache = SimulationCache(simulator, max_bytes=0, directory=cache_dir)
+        history = cache.run_simulation(params)
+    else:
+        history = simulator.run_simulation(params, event_log=event_log)
+    return history, clock.perf_counter() - start, event_log
+
+
+def write_history(path, history, fmt, params=None):
+    if fmt == "npz":
+        np.savez(path, **history)
+    elif fmt == "traj":
+        with TrajectoryWriter(path) as writer:
+            writer.add(history, params)
+    else:
+        names = list(history)
+        columns = np.column_stack([history[name] for name in names])
+        np.savetxt(path, columns, delimiter=",", header=",".join(names), comments="")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="+", help="файли сценаріїв JSON/TOML")
+    parser.add_argument("-o", "--output", default="results", help="каталог результатів")
+    parser.add_argument("--format", choices=FORMATS, default="npz")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="кількість процесів (0 — усі ядра)"
+    )
+    parser.add_argument("--cache-dir", help="каталог кешу результатів на диску")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="не використовувати кеш результатів"
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers має бути невід'ємним (0 — усі ядра)")
+
+    scenarios = []
+    try:
+        for path in args.scenarios:
+            scenarios.extend(load_scenarios(path))
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    names = [name for name, _ in scenarios]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        parser.error(f"повторювані назви сценаріїв: {', '.join(duplicates)}")
+
+    params_list = [params for _, params in scenarios]
+    cache_dir = None if args.no_cache else args.cache_dir or default_directory()
+    run = partial(run_scenario, cache_dir=cache_dir)
+    if args.workers == 1:
+        results = map(run, params_list)
+    else:
+        executor = ProcessPoolExecutor(max_workers=args.workers or None)
+        results = executor.map(run, params_list)
+
+    os.makedirs(args.output, exist_ok=True)
+    try:
+        for name, params, (history, seconds, event_log) in zip(
+            names, params_list, results
+        ):
+            path = os.path.join(args.output, f"{name}.{args.format}")
+            write_history(path, history, args.format, params)
+            line = f"{name:24s} {len(history['t']):8d} записів {seconds:8.3f} с"
+            if len(history["t"]) and {"H", "V"} <= set(history):
+                line += f"  ΔH={history['H'][-1]:.3f} м  ΔV={history['V'][-1]:.3f} м/с"
+            print(f"{line}  -> {path}")
+            if event_log:
+                with open(
+                    os.path.join(args.output, f"{name}.events.json"),
+                    "w",
+                    encoding="utf-8",
+                ) as file:
+                    json.dump(event_log, file, ensure_ascii=False, indent=2)
+                for event in event_log:
+                    print(
+                        f"    {event['name']}: t={event['t']:.3f} с ({event['action']})"
+                    )
+    finally:
+        if args.workers != 1:
+            executor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
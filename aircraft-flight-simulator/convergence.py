@@ -0,0 +1,250 @@
+"""Збіжність за кроком інтегрування: сходинка dt, оцінки Річардсона, вибір dt.
+
+Для кожного методу (euler, rk4) прогони з геометричною сходинкою
+dt_k = dt_max / ratio^k виконуються паралельно в пулі процесів. Стан
+після кроку i відповідає моменту (i + 1)·dt, тож кожен рівень береться в
+точках k·dt_max (спільна сітка без інтерполяції). За трьома найдрібнішими
+рівнями оцінюється спостережуваний порядок p = log(‖y_h - y_h/r‖ /
+‖y_h/r - y_h/r²‖) / log r, а еталон — екстраполяція Річардсона
+найдрібнішого рівня з цим порядком. Похибка кожного рівня — максимум
+модуля відхилення від еталону за каналами V, H, alpha, ny. Рекомендований
+крок — найбільший dt, для якого він і всі дрібніші рівні вкладаються в
+допуски.
+
+Регулятор інтегрується кроком Ейлера за будь-якого методу, тож у режимі
+controlled спостережуваний порядок rk4 близький до першого — саме тому
+еталон будується зі спостережуваного, а не формального порядку.
+Запуск: python convergence.py --dt-max 0.1 --levels 6
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rgr import AircraftSimulator
+
+METHODS = ("euler", "rk4")
+ORDERS = {"euler": 1, "rk4": 4}
+STAGES = {"euler": 1, "rk4": 4}
+CHANNELS = ("V", "H", "alpha", "ny")
+# Абсолютні допуски: ΔV, м/с; ΔH, м; α, град; ny
+TOLERANCES = {"V": 0.01, "H": 0.1, "alpha": 0.01, "ny": 0.001}
+
+
+def ladder(dt_max=0.1, levels=6, ratio=2):
+    """Геометрична сходинка кроків: dt_max, dt_max / ratio, ..."""
+    if int(ratio) != ratio or ratio < 2 or levels < 3:
+        raise ValueError("ratio — ціле ≥ 2, levels ≥ 3")
+    return [dt_max / ratio**k for k in range(levels)]
+
+
+def _ratio(dts):
+    """Ціле відношення сусідніх кроків сходинки або ValueError."""
+    if len(dts) < 3:
+        raise ValueError("Для оцінки порядку потрібно щонайменше три кроки")
+    ratio = round(dts[0] / dts[1])
+    if ratio < 2 or any(
+        abs(coarse / fine - ratio) > 1e-9 * ratio for coarse, fine in zip(dts, dts[1:])
+    ):
+        raise ValueError("Кроки мають спадати з однаковим цілим відношенням ≥ 2")
+    return ratio
+
+
+def _tolerances(tol):
+    if tol is None:
+        return dict(TOLERANCES)
+    if isinstance(tol, dict):
+        unknown = set(tol) - set(CHANNELS)
+        if unknown:
+            raise ValueError(f"Невідомі канали допусків: {sorted(unknown)}")
+        return {**TOLERANCES, **tol}
+    return dict.fromkeys(CHANNELS, float(tol))
+
+
+def level_params(params, dts, methods=METHODS):
+    """params прогонів сходинки: для кожного методу — усі dt за спаданням."""
+    params = {"mode": "controlled", **(params or {})}
+    if params["mode"] == "controlled":
+        params.setdefault("y0", [0, 0, 0, 0, 0])
+    for method in methods:
+        if method not in ORDERS:
+            raise ValueError(f"Збіжність досліджується лише для {METHODS}")
+    # Кожен крок записується: спільна сітка вибирається з повної історії
+    return [
+        {**params, "method": method, "dt": dt, "channels": CHANNELS, "record_every": 1}
+        for method in methods
+        for dt in dts
+    ]
+
+
+def _norm(x):
+    """Максимум модуля; нескінченність, якщо рівень втратив стабільність."""
+    return float(np.max(np.abs(x))) if np.all(np.isfinite(x)) else np.inf
+
+
+def _order(coarse, middle, fine, ratio):
+    d1, d2 = _norm(middle - coarse), _norm(fine - middle)
+    if not np.isfinite(d1) or not np.isfinite(d2) or d1 == 0 or d2 == 0:
+        return np.nan
+    return float(np.log(d1 / d2) / np.log(ratio))
+
+
+def analyze(histories, dts, methods=METHODS, tol=None, T_end=100.0):
+    """Аналіз збіжності для історій у порядку level_params(params, dts, methods).
+
+    Повертає словник: "t" — спільна сітка, "dt" — кроки, "methods" —
+    {метод: {"reference", "order", "orders", "error", "rms", "evaluations",
+    "recommended"}}: еталон за каналами, спостережуваний порядок (за трьома
+    найдрібнішими рівнями та для кожної трійки сусідніх), похибки рівнів
+    (максимум і СКВ відхилення від еталону), кількість обчислень похідних
+    і рекомендований dt (None, якщо допусків не досягнуто); "recommended" —
+    (метод, dt) з найменшою кількістю обчислень похідних або None.
+    """
+    dts = list(dts)
+    ratio = _ratio(dts)
+    tol = _tolerances(tol)
+    strides = [ratio**k for k in range(len(dts))]
+    steps = [len(np.arange(0, T_end, dt)) for dt in dts]
+    count = min(n // stride for n, stride in zip(steps, strides))
+    t = dts[0] * np.arange(1, count + 1)
+
+    result = {"t": t, "dt": np.array(dts), "methods": {}}
+    for m, method in enumerate(methods):
+        levels = []
+        for k, stride in enumerate(strides):
+            history = histories[m * len(dts) + k]
+            index = np.arange(1, count + 1) * stride - 1
+            sampled = {}
+            for channel in CHANNELS:
+                values = np.full(count, np.nan)
+                valid = index < len(history[channel])
+                values[valid] = history[channel][index[valid]]
+                sampled[channel] = values
+            levels.append(sampled)
+
+        reference, order, orders, error, rms = {}, {}, {}, {}, {}
+        for channel in CHANNELS:
+            series = [level[channel] for level in levels]
+            orders[channel] = np.array(
+                [_order(*series[k : k + 3], ratio) for k in range(len(series) - 2)]
+            )
+            p = orders[channel][-1]
+            order[channel] = p
+            # Поза асимптотичною областю береться формальний порядок методу
+            if not 0.5 <= p <= ORDERS[method] + 1:
+                p = ORDERS[method]
+            fine, middle = series[-1], series[-2]
+            reference[channel] = fine + (fine - middle) / (ratio**p - 1)
+            deviations = [values - reference[channel] for values in series]
+            error[channel] = np.array([_norm(d) for d in deviations])
+            rms[channel] = np.array(
+                [
+                    float(np.sqrt(np.mean(d**2))) if np.isfinite(e) else np.inf
+                    for d, e in zip(deviations, error[channel])
+                ]
+            )
+
+        meets = np.all([error[channel] <= tol[channel] for channel in CHANNELS], 0)
+        recommended = None
+        for k in range(len(dts)):
+            if meets[k:].all():
+                recommended = dts[k]
+                break
+        result["methods"][method] = {
+            "reference": reference,
+            "order": order,
+            "orders": orders,
+            "error": error,
+            "rms": rms,
+            "evaluations": np.array(steps) * STAGES[method],
+            "recommended": recommended,
+        }
+
+    candidates = [
+        (entry["evaluations"][dts.index(entry["recommended"])], method)
+        for method, entry in result["methods"].items()
+        if entry["recommended"] is not None
+    ]
+    result["recommended"] = None
+    if candidates:
+        method = min(candidates)[1]
+        result["recommended"] = (method, result["methods"][method]["recommended"])
+    return result
+
+
+def _run_level(simulator, params):
+    return simulator.run_simulation(params)
+
+
+def study(
+    params=None, dts=None, methods=METHODS, tol=None, workers=None, simulator=None
+):
+    """Прогони сходинки dts (типово ladder()) паралельно та їх аналіз.
+
+    params — базові параметри прогону (типово режим controlled з нульовим
+    початковим станом, як у завданні 2.8.1); tol — число (для всіх
+    каналів) або словник допусків за каналами. workers=1 виконує все в
+    поточному процесі. Результат — як у analyze.
+    """
+    dts = list(ladder() if dts is None else dts)
+    _ratio(dts)
+    tol = _tolerances(tol)
+    simulator = simulator or AircraftSimulator()
+    params_list = level_params(params, dts, methods)
+    workers = min(workers or os.cpu_count() or 1, len(params_list))
+    if workers == 1:
+        histories = [_run_level(simulator, p) for p in params_list]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Найдрібніші (найдовші) прогони стартують першими
+            order = sorted(range(len(params_list)), key=lambda k: params_list[k]["dt"])
+            futures = {
+                k: executor.submit(_run_level, simulator, params_list[k]) for k in order
+            }
+            histories = [futures[k].result() for k in range(len(params_list))]
+    T_end = params_list[0].get("T_end", 100.0)
+    return analyze(histories, dts, methods, tol, T_end)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dt-max", type=float, default=0.1)
+    parser.add_argument("--levels", type=int, default=6)
+    parser.add_argument("--ratio", type=int, default=2)
+    parser.add_argument("--T-end", type=float, default=100.0)
+    parser.add_argument("--mode", default="controlled")
+    parser.add_argument("--tol", type=float, help="один допуск для всіх каналів")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    dts = ladder(args.dt_max, args.levels, args.ratio)
+    params = {"mode": args.mode, "T_end": args.T_end}
+    result = study(params, dts, tol=args.tol, workers=args.workers)
+    tol = _tolerances(args.tol)
+
+    print("Допуски: " + ", ".join(f"{ch} {tol[ch]:g}" for ch in CHANNELS))
+    for method, entry in result["methods"].items():
+        print(f"\n{method}")
+        print(f"{'dt':>10s} " + " ".join(f"{'err ' + ch:>11s}" for ch in CHANNELS))
+        for k, dt in enumerate(dts):
+            errors = " ".join(f"{entry['error'][ch][k]:11.3g}" for ch in CHANNELS)
+            print(f"{dt:10.6g} {errors}")
+        orders = " ".join(f"{entry['order'][ch]:11.2f}" for ch in CHANNELS)
+        print(f"{'порядок':>10s} {orders}")
+        recommended = entry["recommended"]
+        print(
+            f"рекомендований dt: {'—' if recommended is None else f'{recommended:g}'}"
+        )
+    if result["recommended"] is None:
+        print("\nЖоден крок сходинки не вкладається в допуски")
+    else:
+        method, dt = result["recommended"]
+        print(f"\nНайдешевше: {method}, dt = {dt:g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
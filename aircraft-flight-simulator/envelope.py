@@ -0,0 +1,145 @@
+"""Область режимів польоту: атмосфера ISA та таблиці коефіцієнтів c, e.
+
+Таблиця будується один раз на сітці (H, V): для кожного вузла параметри
+атмосфери беруться з isa(), а c[1..19], e[1..3] та δ_в бал розраховуються
+тим самим AircraftSimulator. Аеродинамічні похідні (Cya, m_z_alpha, ...)
+лишаються сталими (дані режиму №2) — змінюються лише густина, швидкість
+звуку та швидкісний напір. Проміжні умови отримуються векторизованою
+білінійною інтерполяцією; точки поза сіткою притискаються до її меж.
+"""
+
+import copy
+
+import numpy as np
+
+from rgr import AircraftSimulator
+
+# Міжнародна стандартна атмосфера (до 20 км)
+T0, P0, LAPSE, R_AIR, G0, GAMMA = 288.15, 101325.0, 0.0065, 287.05287, 9.80665, 1.4
+H_TROPOPAUSE = 11000.0
+
+C_KEYS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 16, 17, 18, 19)
+E_KEYS = (1, 2, 3)
+COLUMNS = tuple(f"c{k}" for k in C_KEYS) + tuple(f"e{k}" for k in E_KEYS)
+COLUMNS += ("delta_v_bal_rad",)
+
+
+def isa(H):
+    """Температура, К; тиск, Па; густина, кг/м³; швидкість звуку, м/с."""
+    H = np.asarray(H, dtype=float)
+    T_11 = T0 - LAPSE * H_TROPOPAUSE
+    p_11 = P0 * (T_11 / T0) ** (G0 / (LAPSE * R_AIR))
+    troposphere = H <= H_TROPOPAUSE
+    T = np.where(troposphere, T0 - LAPSE * H, T_11)
+    p = np.where(
+        troposphere,
+        P0 * (np.maximum(T, 1.0) / T0) ** (G0 / (LAPSE * R_AIR)),
+        p_11 * np.exp(-G0 * (H - H_TROPOPAUSE) / (R_AIR * T_11)),
+    )
+    rho = p / (R_AIR * T)
+    a = np.sqrt(GAMMA * R_AIR * T)
+    return T, p, rho, a
+
+
+class CoefficientTable:
+    """Щільна таблиця коефіцієнтів (nH, nV, len(COLUMNS)) з інтерполяцією."""
+
+    def __init__(self, H_grid, V_grid, values):
+        self.H_grid = np.asarray(H_grid, dtype=float)
+        self.V_grid = np.asarray(V_grid, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+
+    @classmethod
+    def build(cls, H_grid, V_grid, simulator=None):
+        """Розраховує таблицю; simulator задає незмінні параметри літака."""
+        simulator = copy.deepcopy(simulator) if simulator else AircraftSimulator()
+        H_grid = np.asarray(H_grid, dtype=float)
+        V_grid = np.asarray(V_grid, dtype=float)
+        _, _, rho, a = isa(H_grid)
+        values = np.empty((len(H_grid), len(V_grid), len(COLUMNS)))
+        for i, H in enumerate(H_grid):
+            for j, V in enumerate(V_grid):
+                # Густина в технічній системі одиниць, як rho_H у симуляторі
+                simulator.update_parameters(
+                    H0=float(H), V0=float(V), rho_H=rho[i] / simulator.g, a_H=a[i]
+                )
+                values[i, j] = _flatten(simulator)
+        return cls(H_grid, V_grid, values)
+
+    def save(self, path):
+        np.savez_compressed(
+            path, H_grid=self.H_grid, V_grid=self.V_grid, values=self.values
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["H_grid"], data["V_grid"], data["values"])
+
+    def interpolate(self, H, V):
+        """Білінійна інтерполяція; H, V — скаляри або масиви однієї форми.
+
+        Повертає масив форми (..., len(COLUMNS)).
+        """
+        H, V = np.broadcast_arrays(np.asarray(H, float), np.asarray(V, float))
+        i, u = _bracket(self.H_grid, H)
+        j, w = _bracket(self.V_grid, V)
+        u, w = u[..., None], w[..., None]
+        v = self.values
+        return (1 - u) * ((1 - w) * v[i, j] + w * v[i, j + 1]) + u * (
+            (1 - w) * v[i + 1, j] + w * v[i + 1, j + 1]
+        )
+
+    def coefficients(self, H, V):
+        """Набір (c, e, delta_v_bal_rad) у форматі AircraftSimulator."""
+        row = self.interpolate(H, V)
+        return _unflatten(row)
+
+    def simulator_at(self, H, V, simulator=None):
+        """Симулятор для умов (H, V) без повного перерахунку коефіцієнтів."""
+        simulator = simulator or AircraftSimulator()
+        _, _, rho, a = isa(H)
+        simulator.H0, simulator.V0 = float(H), float(V)
+        simulator.rho_H, simulator.a_H = float(rho) / simulator.g, float(a)
+        simulator._calculate_derived_values()
+        simulator.c, simulator.e, simulator.delta_v_bal_rad = self.coefficients(H, V)
+        simulator._transition_cache = {}
+        return simulator
+
+    def schedule(self, H_ref, V_ref):
+        """Функція для params["coefficient_schedule"].
+
+        Коефіцієнти беруться для фактичних умов H_ref + ΔH, V_ref + ΔV, тоді як
+        відхилення стану й далі відраховуються від опорного режиму.
+        """
+
+        def lookup(t, y):
+            c, e, _ = self.coefficients(H_ref + y[4], V_ref + y[0])
+            return c, e
+
+        return lookup
+
+
+def _flatten(simulator):
+    return (
+        [simulator.c[k] for k in C_KEYS]
+        + [simulator.e[k] for k in E_KEYS]
+        + [simulator.delta_v_bal_rad]
+    )
+
+
+def _unflatten(row):
+    row = np.asarray(row, dtype=float)
+    c = {k: float(row[n]) for n, k in enumerate(C_KEYS)}
+    e = {k: float(row[len(C_KEYS) + n]) for n, k in enumerate(E_KEYS)}
+    return c, e, float(row[-1])
+
+
+def _bracket(grid, x):
+    if len(grid) < 2:
+        raise ValueError("Сітка має містити щонайменше два вузли")
+    index = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+    frac = (np.clip(x, grid[0], grid[-1]) - grid[index]) / (
+        grid[index + 1] - grid[index]
+    )
+    return index, frac
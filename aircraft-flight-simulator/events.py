@@ -0,0 +1,293 @@
+"""Події прогону: перетин порогів і входження в смугу встановлення.
+
+Події задаються в params["events"] списком словників, тож сценарії
+JSON/TOML і ключі кешу працюють без змін:
+
+    {"channel": "ny", "threshold": 2.5, "direction": "rising", "action": "stop"}
+    {"type": "settle", "channel": "H", "target": 0.0, "tol": 1.0, "dwell": 5.0,
+     "action": "stop"}
+    {"channel": "alpha", "threshold": 3.0, "action": "switch",
+     "mode": "controlled"}
+
+Канали ті самі, що в історії (V, H, alpha, ny, omega_z, theta, delta_g;
+кути — у градусах). Момент події уточнюється всередині кроку: лінійною
+інтерполяцією для методів зі сталим кроком і методом Іллінойса на щільному
+виводі для rk45. Дії: record — лише запис, stop — завершення прогону,
+switch — перемикання режиму на mode. Кожне спрацювання додається словником
+(name, type, channel, t, value, action, ...) до списку event_log,
+переданого run_simulation/iter_simulation.
+"""
+
+import copy
+
+ACTIONS = ("record", "stop", "switch")
+MODES = ("free_flight", "controlled", "special_rv")
+DIRECTIONS = ("rising", "falling", "both")
+
+
+def _locate(t0, g0, t1, g1, crossed, g=None):
+    """Момент, коли g перетинає нуль на [t0, t1] (g0 — до, g1 — після).
+
+    Без g — лінійна інтерполяція. З g(t) — метод Іллінойса; повертається
+    права межа інтервалу, на якій умова crossed уже виконується.
+    """
+    if g is None:
+        return t0 + (t1 - t0) * g0 / (g0 - g1)
+    a, ga, b, gb = t0, g0, t1, g1
+    side = 0
+    for _ in range(60):
+        if b - a <= 1e-12 * max(1.0, abs(b)):
+            break
+        c = b - gb * (b - a) / (gb - ga)
+        if not a < c < b:
+            c = 0.5 * (a + b)
+        gc = g(c)
+        if crossed(gc):
+            b, gb = c, gc
+            if side == 1:
+                ga *= 0.5
+            side = 1
+        else:
+            a, ga = c, gc
+            if side == -1:
+                gb *= 0.5
+            side = -1
+    return b
+
+
+class _Event:
+    def __init__(self, spec, channels):
+        spec = dict(spec)
+        self.channel = spec.pop("channel", None)
+        if self.channel not in channels:
+            raise ValueError(f"Невідомий канал події: {self.channel!r}")
+        self.index = channels.index(self.channel)
+        self.action = spec.pop("action", "record")
+        if self.action not in ACTIONS:
+            raise ValueError(f"Невідома дія події: {self.action!r}")
+        self.mode = spec.pop("mode", None)
+        if self.action == "switch" and self.mode not in MODES:
+            raise ValueError(f"Для switch потрібен mode з {MODES}")
+        self.name = spec.pop("name", None)
+        self.spec = spec
+        self.active = True
+        self.prev = None
+
+    @property
+    def terminal(self):
+        return self.action != "record"
+
+    def _check_unused(self):
+        if self.spec:
+            raise ValueError(f"Невідомі ключі події: {sorted(self.spec)}")
+
+
+class ThresholdEvent(_Event):
+    """Перетин каналом порогу threshold у напрямку direction."""
+
+    kind = "threshold"
+
+    def __init__(self, spec, channels):
+        super().__init__(spec, channels)
+        if "threshold" not in self.spec:
+            raise ValueError("Для події перетину потрібен threshold")
+        self.threshold = float(self.spec.pop("threshold"))
+        self.direction = self.spec.pop("direction", "both")
+        if self.direction not in DIRECTIONS:
+            raise ValueError(f"direction має бути одним з {DIRECTIONS}")
+        self.repeat = bool(self.spec.pop("repeat", False))
+        self._check_unused()
+        if self.name is None:
+            self.name = f"{self.channel}_{self.direction}_{self.threshold:g}"
+
+    def g(self, values):
+        return values[self.index] - self.threshold
+
+    def start(self, t, g):
+        self.prev = g
+
+    def locate(self, t0, t1, g1, g=None):
+        """Момент перетину на (t0, t1] або None; стан події не змінює."""
+        g0 = self.prev
+        rising = g0 < 0.0 <= g1 and self.direction != "falling"
+        falling = g0 > 0.0 >= g1 and self.direction != "rising"
+        if not (rising or falling):
+            return None
+        crossed = (lambda x: x >= 0.0) if rising else (lambda x: x <= 0.0)
+        return _locate(t0, g0, t1, g1, crossed, g)
+
+    def advance(self, t0, t1, g1, g, fired):
+        self.prev = g1
+        if fired and not self.repeat:
+            self.active = False
+
+    def details(self, t):
+        return {"threshold": self.threshold, "direction": self.direction}
+
+
+class SettleEvent(_Event):
+    """Канал пробув у смузі |x - target| ≤ tol щонайменше dwell секунд.
+
+    Подія спрацьовує в момент входу в смугу + dwell; settled_at у записі —
+    момент входу, тобто час встановлення.
+    """
+
+    kind = "settle"
+
+    def __init__(self, spec, channels):
+        super().__init__(spec, channels)
+        self.target = float(self.spec.pop("target", 0.0))
+        self.tol = float(self.spec.pop("tol", 1.0))
+        self.dwell = float(self.spec.pop("dwell", 0.0))
+        if self.tol <= 0 or self.dwell < 0:
+            raise ValueError("tol має бути додатним, а dwell — невід'ємним")
+        self._check_unused()
+        if self.name is None:
+            self.name = f"{self.channel}_settled"
+        self.entered = None
+
+    def g(self, values):
+        return abs(values[self.index] - self.target) - self.tol
+
+    def start(self, t, g):
+        self.prev = g
+        self.entered = t if g <= 0.0 else None
+
+    def _entry(self, t0, t1, g1, g):
+        if g1 > 0.0:
+            return None
+        if self.entered is not None:
+            return self.entered
+        return _locate(t0, self.prev, t1, g1, lambda x: x <= 0.0, g)
+
+    def locate(self, t0, t1, g1, g=None):
+        entered = self._entry(t0, t1, g1, g)
+        if entered is None:
+            return None
+        # Допуск на округлення: момент, знайдений next_stop, має спрацювати
+        fire = entered + self.dwell
+        return fire if fire <= t1 + 1e-12 * max(1.0, abs(t1)) else None
+
+    def advance(self, t0, t1, g1, g, fired):
+        self.entered = self._entry(t0, t1, g1, g)
+        self.prev = g1
+        if fired:
+            self.active = False
+
+    def details(self, t):
+        settled_at = float(t - self.dwell)
+        return {"target": self.target, "tol": self.tol, "settled_at": settled_at}
+
+
+EVENT_TYPES = {"threshold": ThresholdEvent, "settle": SettleEvent}
+
+
+def parse_events(specs, channels):
+    """Перевіряє специфікації подій (список словників) і створює події."""
+    events = []
+    for spec in specs or ():
+        kind = spec.get("type", "threshold")
+        if kind not in EVENT_TYPES:
+            raise ValueError(f"Невідомий тип події: {kind!r}")
+        spec = {key: value for key, value in spec.items() if key != "type"}
+        events.append(EVENT_TYPES[kind](spec, channels))
+    return events
+
+
+def event_names(specs, channels):
+    """Назви подій у порядку оголошення (явні або згенеровані)."""
+    return [event.name for event in parse_events(specs, channels)]
+
+
+class EventMonitor:
+    """Стан подій одного прогону.
+
+    Цикл інтегрування викликає start() з початковими значеннями каналів і
+    update() після кожного прийнятого кроку. Для rk45 sample(t) повертає
+    значення каналів у будь-який момент кроку зі щільного виводу, а
+    next_stop() дозволяє обрізати крок точно в момент stop/switch.
+    """
+
+    def __init__(self, specs, channels, log=None):
+        self.specs = copy.deepcopy(list(specs or ()))
+        self.events = parse_events(specs, channels)
+        self.log = [] if log is None else log
+        self.t = None
+        self.values = None
+
+    @property
+    def terminal(self):
+        """Чи лишились активні події зі stop/switch."""
+        return any(event.active and event.terminal for event in self.events)
+
+    def snapshot(self):
+        """Копія стану подій для SimulationState: (specs, події, t, значення)."""
+        return copy.deepcopy((self.specs, self.events, self.t, self.values))
+
+    def restore(self, snapshot):
+        """Відновлює стан зі snapshot(); t не None — start() вже не потрібен."""
+        _, events, self.t, self.values = copy.deepcopy(snapshot)
+        self.events = events
+
+    def start(self, t, values):
+        self.t, self.values = t, values
+        for event in self.events:
+            event.start(t, event.g(values))
+
+    @staticmethod
+    def _sampled(event, sample):
+        if sample is None:
+            return None
+        return lambda s: event.g(sample(s))
+
+    def next_stop(self, t, values, sample=None):
+        """Найраніший момент stop/switch на (попередній t, t] або None."""
+        times = [
+            event.locate(self.t, t, event.g(values), self._sampled(event, sample))
+            for event in self.events
+            if event.active and event.terminal
+        ]
+        return min((time for time in times if time is not None), default=None)
+
+    def update(self, t, values, sample=None):
+        """Просуває події до моменту t зі значеннями каналів values.
+
+        Спрацювання додаються до log у порядку часу; повертається запис
+        першої події зі stop/switch або None.
+        """
+        t0, values0 = self.t, self.values
+        fired = []
+        for event in self.events:
+            if not event.active:
+                continue
+            g1, g = event.g(values), self._sampled(event, sample)
+            time = event.locate(t0, t, g1, g)
+            event.advance(t0, t, g1, g, time is not None)
+            if time is not None:
+                fired.append((time, event))
+        self.t, self.values = t, values
+
+        terminal = None
+        for time, event in sorted(fired, key=lambda item: item[0]):
+            k = event.index
+            if sample is not None:
+                value = sample(time)[k]
+            elif t > t0:
+                value = values0[k] + (values[k] - values0[k]) * (time - t0) / (t - t0)
+            else:
+                value = values[k]
+            entry = {
+                "name": event.name,
+                "type": event.kind,
+                "channel": event.channel,
+                "t": float(time),
+                "value": float(value),
+                "action": event.action,
+                **event.details(time),
+            }
+            if event.action == "switch":
+                entry["mode"] = event.mode
+            self.log.append(entry)
+            if terminal is None and event.terminal:
+                terminal = entry
+        return terminal
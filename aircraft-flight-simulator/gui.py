@@ -0,0 +1,635 @@
+"""Графічний інтерфейс (Tkinter + Matplotlib) для AircraftSimulator.
+
+Запуск: python rgr.py (або python gui.py [--cache-dir DIR | --no-cache]).
+Результати прогонів кешуються на диску в cache.default_directory().
+"""
+
+import argparse
+import multiprocessing
+import queue
+import sys
+import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
+from tkinter import ttk
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.figure import Figure
+
+import convergence
+from cache import SimulationCache, default_directory
+from history_table import HistoryTable
+from plotting import PlotView
+from rgr import AircraftSimulator, _run_simulation_job
+
+
+class AircraftSimulationApp(tk.Tk):
+    """Головний клас GUI додатку."""
+
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, cache_dir=None):
+        """cache_dir — каталог дискового кешу результатів (None — лише пам'ять)."""
+        super().__init__()
+        self.title("Моделювання динаміки польоту літака (РК-4)")
+        self.geometry("1400x900")
+        self.simulator = AircraftSimulator()
+        self.cache = SimulationCache(self.simulator, directory=cache_dir)
+        # Результати для інших коефіцієнтів моделі чи версії кешу не знадобляться
+        self.cache.prune()
+        self._executor, self._manager, self._job = None, None, None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._configure_styles()
+        main_frame = ttk.Frame(self, padding=10, style="Main.TFrame")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        left_panel = ttk.Frame(main_frame, style="Main.TFrame")
+        left_panel.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+        right_panel = ttk.Frame(main_frame, style="Main.TFrame")
+        right_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._create_controls(left_panel)
+        self._create_job_panel(left_panel)
+        self._create_tables_and_plots(right_panel)
+        self._populate_coefficients_tree()
+
+    def _create_job_panel(self, parent):
+        frame = ttk.LabelFrame(parent, text="Виконання", padding=10)
+        frame.pack(fill=tk.X, side=tk.BOTTOM, pady=8)
+        self.progress_var = tk.DoubleVar(value=0.0)
+        ttk.Progressbar(frame, variable=self.progress_var, maximum=100.0).pack(
+            fill=tk.X, padx=5, pady=4
+        )
+        self.status_var = tk.StringVar(value="Готово")
+        ttk.Label(frame, textvariable=self.status_var).pack(fill=tk.X, padx=5)
+        self.cancel_button = ttk.Button(
+            frame, text="Скасувати", command=self._cancel_job, state=tk.DISABLED
+        )
+        self.cancel_button.pack(fill=tk.X, padx=5, pady=4)
+
+    def _ensure_executor(self):
+        if self._executor is None:
+            # spawn: дочірні процеси не успадковують з'єднання Tk головного процесу
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(mp_context=context)
+            self._manager = context.Manager()
+        return self._executor
+
+    def _submit(self, params_list, on_done, live=None):
+        """Запускає прогони у пулі процесів, не блокуючи головний потік Tk.
+
+        on_done(results) викликається з циклу after() після завершення всіх
+        прогонів; results — історії у порядку params_list. live — фабрика
+        (див. _live_plot), що викликається, лише якщо прогони справді
+        виконуються, і повертає on_chunk(job_id, chunk) для блоків історії.
+        """
+        self._cancel_job()
+        cached = [self.cache.get(params) for params in params_list]
+        if all(history is not None for history in cached):
+            self.progress_var.set(100.0)
+            self.status_var.set("Готово (з кешу)")
+            on_done(cached)
+            return
+
+        executor = self._ensure_executor()
+        on_chunk = live() if live is not None else None
+        self._job = {
+            "params": params_list,
+            "results": cached,
+            "futures": {},
+            "progress": [0.0 if h is None else 1.0 for h in cached],
+            "queue": self._manager.Queue(),
+            "cancel": self._manager.Event(),
+            "on_done": on_done,
+            "on_chunk": on_chunk,
+        }
+        for job_id, params in enumerate(params_list):
+            if cached[job_id] is not None:
+                continue
+            self._job["futures"][job_id] = executor.submit(
+                _run_simulation_job,
+                self.simulator,
+                params,
+                job_id,
+                self._job["queue"],
+                self._job["cancel"],
+                stream=on_chunk is not None,
+            )
+        self.progress_var.set(0.0)
+        self.status_var.set(f"Виконується прогонів: {len(params_list)}")
+        self.cancel_button.configure(state=tk.NORMAL)
+        self.after(self.POLL_INTERVAL_MS, self._poll_job, self._job)
+
+    def _poll_job(self, job):
+        if job is not self._job:
+            return
+        streamed = False
+        try:
+            while True:
+                job_id, fraction, chunk = job["queue"].get_nowait()
+                job["progress"][job_id] = fraction
+                if chunk is not None and job["on_chunk"] is not None:
+                    job["on_chunk"](job_id, chunk)
+                    streamed = True
+        except queue.Empty:
+            pass
+        if streamed:
+            self.plots.blit()
+        self.progress_var.set(100.0 * sum(job["progress"]) / len(job["progress"]))
+
+        if not all(future.done() for future in job["futures"].values()):
+            self.after(self.POLL_INTERVAL_MS, self._poll_job, job)
+            return
+
+        self._job = None
+        self.cancel_button.configure(state=tk.DISABLED)
+        self.plots.stop_live()
+        results = job["results"]
+        try:
+            for job_id, future in job["futures"].items():
+                results[job_id] = future.result()
+        except Exception as exc:  # помилка у процесі пулу
+            self.status_var.set(f"Помилка: {exc}")
+            return
+        if any(history is None for history in results):
+            self.status_var.set("Скасовано")
+            return
+        for job_id in job["futures"]:
+            results[job_id] = self.cache.put(job["params"][job_id], results[job_id])
+        self.progress_var.set(100.0)
+        self.status_var.set("Готово")
+        job["on_done"](results)
+
+    def _cancel_job(self):
+        job, self._job = self._job, None
+        if job is None:
+            return
+        job["cancel"].set()
+        for future in job["futures"].values():
+            future.cancel()
+        self.plots.stop_live()
+        self.progress_var.set(0.0)
+        self.status_var.set("Скасовано")
+        self.cancel_button.configure(state=tk.DISABLED)
+
+    def _on_close(self):
+        self._cancel_job()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+        self.destroy()
+
+    def _configure_styles(self):
+        BG_COLOR, TEXT_COLOR, FRAME_COLOR, HEADER_BG, ACCENT_COLOR = (
+            "#fdeef4",
+            "#5d4a66",
+            "#ffffff",
+            "#f7f7f7",
+            "#c33c54",
+        )
+        self.style = ttk.Style(self)
+        self.style.theme_use("clam")
+        self.configure(background=BG_COLOR)
+        self.style.configure(
+            ".", background=BG_COLOR, foreground=TEXT_COLOR, font=("Segoe UI", 10)
+        )
+        self.style.configure("Main.TFrame", background=BG_COLOR)
+        self.style.configure("TLabel", background=BG_COLOR, foreground=TEXT_COLOR)
+        self.style.configure("TLabelframe", background=BG_COLOR)
+        self.style.configure(
+            "TLabelframe.Label",
+            background=BG_COLOR,
+            foreground=TEXT_COLOR,
+            font=("Segoe UI", 10, "bold"),
+        )
+        self.style.configure(
+            "TButton", background="#f0f0f0", foreground="black", borderwidth=1
+        )
+        self.style.map("TButton", background=[("active", "#e0e0e0")])
+        self.style.configure(
+            "Accent.TButton", background=ACCENT_COLOR, foreground="white"
+        )
+        self.style.map("Accent.TButton", background=[("active", "#e06c75")])
+        self.style.configure(
+            "Treeview",
+            background=FRAME_COLOR,
+            foreground="black",
+            fieldbackground=FRAME_COLOR,
+            rowheight=25,
+        )
+        self.style.map("Treeview", background=[("selected", ACCENT_COLOR)])
+        self.style.configure(
+            "Treeview.Heading",
+            background=HEADER_BG,
+            foreground="black",
+            font=("Segoe UI", 10, "bold"),
+        )
+        self.style.map("Treeview.Heading", background=[("active", "#f0f0f0")])
+
+    def _create_controls(self, parent):
+        def add_task_frame(parent, text, commands, accent=False):
+            frame = ttk.LabelFrame(parent, text=text, padding=10)
+            frame.pack(fill=tk.X, pady=8)
+            for btn_text, command in commands:
+                style = "Accent.TButton" if accent else "TButton"
+                ttk.Button(frame, text=btn_text, command=command, style=style).pack(
+                    fill=tk.X, padx=5, pady=4
+                )
+
+        add_task_frame(
+            parent,
+            "2.5/2.6: 'Вільний' політ",
+            [
+                ("Запуск (Ейлер, dt=0.01с)", self.run_task_2_5),
+                ("Запуск (РК-4, dt=0.01с)", self.run_task_2_6),
+            ],
+        )
+        add_task_frame(
+            parent,
+            "2.8.1: Вплив кроку інтеграції",
+            [
+                (f"Запуск (dt={dt}с)", lambda dt=dt: self.run_task_2_8_1(dt))
+                for dt in [0.01, 0.001, 0.5]
+            ]
+            + [("Збіжність за кроком (Ейлер, РК-4)", self.run_convergence_study)],
+        )
+        f282 = ttk.LabelFrame(parent, text="2.8.2: Вплив коефіцієнта k_v", padding=10)
+        f282.pack(fill=tk.X, pady=8)
+        self.gain_vars = {
+            "Зменшене": tk.DoubleVar(value=0.5),
+            "Номінальне": tk.DoubleVar(value=1.0),
+            "Збільшене": tk.DoubleVar(value=2.0),
+        }
+        for name, var in self.gain_vars.items():
+            frame = ttk.Frame(f282, style="Main.TFrame")
+            frame.pack(fill=tk.X, padx=5, pady=3)
+            ttk.Label(frame, text=f"{name}:").pack(side=tk.LEFT)
+            ttk.Entry(frame, textvariable=var, width=5).pack(side=tk.LEFT, padx=5)
+        ttk.Button(
+            f282,
+            text="Запустити порівняння",
+            command=self.run_task_2_8_2,
+            style="Accent.TButton",
+        ).pack(fill=tk.X, padx=5, pady=5)
+        add_task_frame(
+            parent,
+            "2.8.3: Відмова датчика",
+            [("Відмова датчика швидкості (20с)", self.run_task_2_8_3)],
+        )
+        add_task_frame(
+            parent,
+            "Спец. завдання: Реакція на РВ",
+            [("Реакція на відхилення РВ = -2°", self.run_task_2_9)],
+        )
+
+    def _create_tables_and_plots(self, parent):
+        plot_frame = ttk.Frame(parent, style="Main.TFrame")
+        plot_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        tables_container = ttk.Frame(parent, style="Main.TFrame")
+        tables_container.pack(fill=tk.BOTH, expand=True)
+        self.figure = Figure(dpi=100, facecolor="#fdeef4")
+        self.figure.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=plot_frame)
+        self.plots = PlotView(self.figure, self.canvas)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, plot_frame)
+        self.toolbar.update()
+        self.toolbar.configure(background="#fdeef4")
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        coeffs_frame = ttk.LabelFrame(
+            tables_container, text="Розраховані коефіцієнти", padding=10
+        )
+        coeffs_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        self.coeffs_tree = ttk.Treeview(
+            coeffs_frame, columns=("Parameter", "Value"), show="headings", height=10
+        )
+        self.coeffs_tree.heading("Parameter", text="Параметр")
+        self.coeffs_tree.heading("Value", text="Значення")
+        self.coeffs_tree.column("Parameter", width=120, anchor="w")
+        self.coeffs_tree.column("Value", width=140, anchor="e")
+        self.coeffs_tree.pack(fill="both", expand=True)
+        dynamic_results_frame = ttk.LabelFrame(
+            tables_container, text="Результати симуляції", padding=10
+        )
+        dynamic_results_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        self.results_table = HistoryTable(dynamic_results_frame, interval=0.1)
+        self.results_table.pack(fill="both", expand=True)
+
+    def _populate_coefficients_tree(self):
+        for i in self.coeffs_tree.get_children():
+            self.coeffs_tree.delete(i)
+        for name, value in self.simulator.c.items():
+            self.coeffs_tree.insert("", "end", values=(f"c{name}", f"{value:.6f}"))
+        for name, value in self.simulator.e.items():
+            self.coeffs_tree.insert("", "end", values=(f"e{name}", f"{value:.6f}"))
+        self.coeffs_tree.insert(
+            "",
+            "end",
+            values=("δ_v_bal", f"{np.rad2deg(self.simulator.delta_v_bal_rad):.4f}"),
+        )
+
+    def _update_dynamic_results_table(self, history):
+        self.results_table.set_history(history)
+
+    def _setup_light_ax(self, ax):
+        TEXT_COLOR = "#5d4a66"
+        ax.set_facecolor("white")
+        ax.grid(True, linestyle=":", color="gray", alpha=0.6)
+        ax.tick_params(axis="x", colors="black")
+        ax.tick_params(axis="y", colors="black")
+        for spine in ax.spines.values():
+            spine.set_color("gray")
+        ax.title.set_color(TEXT_COLOR)
+        ax.xaxis.label.set_color(TEXT_COLOR)
+        ax.yaxis.label.set_color(TEXT_COLOR)
+        if ax.get_legend():
+            legend = ax.get_legend()
+            legend.get_frame().set_facecolor("#f7f7f7")
+            for text in legend.get_texts():
+                text.set_color("black")
+
+    def _plot_free_flight(self, history, title):
+        (ax,) = self.plots.layout("free_flight")
+        self.plots.line(
+            ax,
+            "alpha",
+            history["t"],
+            history["alpha"],
+            label="Кут атаки α",
+            color="#9b59b6",
+        )
+        self.plots.finish()
+        ax.set_title(title)
+        ax.set_xlabel("Час, с")
+        ax.set_ylabel("Кут атаки α, град")
+        ax.legend()
+        self._setup_light_ax(ax)
+        self.plots.draw()
+        return {"alpha": (ax, "alpha")}
+
+    def _plot_ny_response(self, history, title):
+        (ax,) = self.plots.layout("ny_response")
+        self.plots.line(
+            ax,
+            "ny",
+            history["t"],
+            history["ny"],
+            label="Перевантаження ny",
+            color="#2ecc71",
+            linewidth=2,
+        )
+        if len(history["ny"]):
+            final_ny = history["ny"][-1]
+            self.plots.hline(
+                ax,
+                "final",
+                final_ny,
+                color="r",
+                linestyle="--",
+                label=f"Стабілізація ≈ {final_ny:.3f}",
+            )
+        self.plots.finish()
+        ax.set_title(title)
+        ax.set_xlabel("Час, с")
+        ax.set_ylabel("ny")
+        ax.legend(loc="lower right")
+        self._setup_light_ax(ax)
+        self.plots.draw()
+        return {"ny": (ax, "ny")}
+
+    def _plot_controlled_flight(self, results, title, labels, failure_time=None):
+        ax1, ax2 = self.plots.layout("controlled", rows=2)
+        colors = ["#9b59b6", "#2ecc71", "#3498db", "#e74c3c"]
+        for i, res in enumerate(results):
+            color = colors[i % len(colors)]
+            self.plots.line(ax1, i, res["t"], res["H"], label=labels[i], color=color)
+            self.plots.line(ax2, i, res["t"], res["V"], label=labels[i], color=color)
+        self.plots.hline(
+            ax1, "target", 0, color="r", linestyle="--", label="H_зад = 0 м"
+        )
+        V_zad = 10.0
+        self.plots.hline(
+            ax2,
+            "target",
+            V_zad,
+            color="r",
+            linestyle="--",
+            label=f"V_зад = {V_zad:.1f} м/с",
+        )
+        if failure_time is not None:
+            for ax in (ax1, ax2):
+                self.plots.vline(
+                    ax,
+                    "failure",
+                    failure_time,
+                    color="magenta",
+                    linestyle="-.",
+                    linewidth=2,
+                    label="Момент відмови",
+                )
+        self.plots.finish()
+        ax1.set_title("Керування висотою")
+        ax1.set_ylabel("Відхилення висоти ΔH, м")
+        ax1.legend()
+        self._setup_light_ax(ax1)
+        ax2.set_title("Керування швидкістю")
+        ax2.set_xlabel("Час, с")
+        ax2.set_ylabel("Відхилення швидкості ΔV, м/с")
+        ax2.legend()
+        self._setup_light_ax(ax2)
+        self.plots.draw(title, rect=[0, 0.03, 1, 0.95])
+        return {"H": (ax1, 0), "V": (ax2, 0)}
+
+    def _live_plot(self, plot, T_end):
+        """Фабрика для _submit: порожній графік plot() у живому режимі.
+
+        plot(history) малює графік і повертає {канал: (осі, лінія)}; далі
+        блоки історії з процесу пулу дописуються в ці лінії через blit.
+        """
+
+        def start():
+            empty = {name: np.empty(0) for name in ("t", "V", "H", "alpha", "ny")}
+            lines = plot(empty)
+            self.plots.start_live(list(lines.values()), (0.0, T_end))
+
+            def on_chunk(job_id, chunk):
+                for channel, (ax, slot) in lines.items():
+                    self.plots.extend_live(ax, slot, chunk["t"], chunk[channel])
+
+            return on_chunk
+
+        return start
+
+    def run_task_2_5(self):
+        params = {"mode": "free_flight", "method": "euler", "T_end": 15}
+
+        def plot(history):
+            return self._plot_free_flight(
+                history, "п. 2.5: 'Вільний' літак (Ейлер, dt=0.01с)"
+            )
+
+        def show(results):
+            plot(results[0])
+            self._update_dynamic_results_table(results[0])
+
+        self._submit([params], show, live=self._live_plot(plot, params["T_end"]))
+
+    def run_task_2_6(self):
+        params = {"mode": "free_flight", "method": "rk4", "T_end": 15}
+
+        def plot(history):
+            return self._plot_free_flight(
+                history, "п. 2.6: 'Вільний' літак (Рунге-Кутта 4, dt=0.01с)"
+            )
+
+        def show(results):
+            plot(results[0])
+            self._update_dynamic_results_table(results[0])
+
+        self._submit([params], show, live=self._live_plot(plot, params["T_end"]))
+
+    def run_task_2_8_1(self, dt):
+        params = {
+            "mode": "controlled",
+            "y0": [0, 0, 0, 0, 0],
+            "dt": dt,
+            "method": "rk4",
+        }
+
+        def plot(history):
+            return self._plot_controlled_flight(
+                [history], f"п. 2.8.1: Вплив кроку інтеграції (dt={dt}c)", [""]
+            )
+
+        def show(results):
+            plot(results[0])
+            self._update_dynamic_results_table(results[0])
+
+        self._submit([params], show, live=self._live_plot(plot, 100.0))
+
+    def run_convergence_study(self):
+        # Сходинка dt у пулі процесів; аналіз — після завершення всіх прогонів
+        dts = convergence.ladder()
+        params_list = convergence.level_params(None, dts)
+
+        def show(results):
+            result = convergence.analyze(results, dts)
+            self._plot_convergence(result)
+            if result["recommended"] is None:
+                self.status_var.set("Жоден крок сходинки не вкладається в допуски")
+            else:
+                method, dt = result["recommended"]
+                self.status_var.set(f"Рекомендовано: {method}, dt = {dt:g} с")
+
+        self._submit(params_list, show)
+
+    def _plot_convergence(self, result):
+        methods = result["methods"]
+        axes = self.plots.layout("convergence", rows=len(methods))
+        colors = ["#9b59b6", "#2ecc71", "#3498db", "#e74c3c"]
+        dts = result["dt"][::-1]
+        for ax, (method, entry) in zip(axes, methods.items()):
+            ax.set_xscale("log")
+            ax.set_yscale("log")
+            for i, channel in enumerate(convergence.CHANNELS):
+                ratio = entry["error"][channel] / convergence.TOLERANCES[channel]
+                order = entry["order"][channel]
+                self.plots.line(
+                    ax,
+                    channel,
+                    dts,
+                    ratio[::-1],
+                    label=f"{channel} (порядок {order:.2f})",
+                    color=colors[i],
+                    marker="o",
+                )
+            self.plots.hline(ax, "tol", 1.0, color="r", linestyle="--", label="Допуск")
+            recommended = entry["recommended"]
+            if recommended is not None:
+                self.plots.vline(
+                    ax,
+                    "dt",
+                    recommended,
+                    color="magenta",
+                    linestyle="-.",
+                    label=f"dt = {recommended:g} с",
+                )
+        self.plots.finish()
+        for ax, method in zip(axes, methods):
+            ax.set_title(method)
+            ax.set_ylabel("Похибка / допуск")
+            ax.legend(fontsize=8)
+            self._setup_light_ax(ax)
+        axes[-1].set_xlabel("Крок dt, с")
+        self.plots.draw(
+            "п. 2.8.1: Збіжність за кроком інтеграції", rect=[0, 0.03, 1, 0.95]
+        )
+
+    def run_task_2_8_2(self):
+        base_params = {"mode": "controlled", "y0": [0, 0, 0, 0, 0], "method": "rk4"}
+        gains = {name: var.get() for name, var in self.gain_vars.items()}
+        labels = [f"{name} (k_v_factor={gain})" for name, gain in gains.items()]
+
+        def show(results):
+            self._plot_controlled_flight(
+                results, "п. 2.8.2: Вплив коефіцієнтів керування k_v", labels
+            )
+            self._update_dynamic_results_table(results[-1])
+
+        # Незалежні прогони виконуються паралельно в різних процесах
+        self._submit(
+            [{**base_params, "gain_factor": gain} for gain in gains.values()], show
+        )
+
+    def run_task_2_8_3(self):
+        params = {
+            "mode": "controlled",
+            "y0": [0, 0, 0, 0, 0],
+            "failure": True,
+            "failure_time": 20,
+            "method": "rk4",
+        }
+
+        def plot(history):
+            return self._plot_controlled_flight(
+                [history],
+                "п. 2.8.3: Імітація відмови датчика швидкості (на 20 с)",
+                ["Відмова"],
+                failure_time=20.0,
+            )
+
+        def show(results):
+            plot(results[0])
+            self._update_dynamic_results_table(results[0])
+
+        self._submit([params], show, live=self._live_plot(plot, 100.0))
+
+    def run_task_2_9(self):
+        params = {
+            "mode": "special_rv",
+            "y0": [0, 0, 0, 0, 0],
+            "method": "rk4",
+            "T_end": 15,
+        }
+
+        def plot(history):
+            return self._plot_ny_response(history, "Реакція на відхилення РВ = -2°")
+
+        def show(results):
+            plot(results[0])
+            self._update_dynamic_results_table(results[0])
+
+        self._submit([params], show, live=self._live_plot(plot, params["T_end"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache-dir", help="каталог кешу результатів на диску")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="кешувати результати лише в пам'яті"
+    )
+    args = parser.parse_args(argv)
+    cache_dir = None if args.no_cache else args.cache_dir or default_directory()
+    AircraftSimulationApp(cache_dir).mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
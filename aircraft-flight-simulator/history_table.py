@@ -0,0 +1,200 @@
+"""Віртуалізована таблиця результатів поверх масивів історії.
+
+Treeview містить лише стільки рядків, скільки їх видно; прокручування
+переписує значення цих рядків з масивів історії, тож оновлення таблиці
+коштує однаково для прогону на 10 с і на 10 000 с. Рядки таблиці — кожен
+step-й запис історії, де step відповідає заданому інтервалу.
+"""
+
+import tkinter as tk
+from tkinter import filedialog, ttk
+
+import numpy as np
+
+# (канал історії, заголовок, формат)
+COLUMNS = (
+    ("t", "Час, с", "{:.1f}"),
+    ("V", "ΔV, м/с", "{:.4f}"),
+    ("H", "ΔH, м", "{:.4f}"),
+    ("alpha", "α, град", "{:.4f}"),
+    ("ny", "ny", "{:.4f}"),
+)
+CSV_BLOCK_ROWS = 65536
+
+
+def table_step(t, interval):
+    """Крок за записами історії, що відповідає інтервалу таблиці, с."""
+    dt = t[1] - t[0] if len(t) > 1 else 1.0
+    return max(1, int(round(interval / dt)))
+
+
+def write_csv(path, history, step=1, columns=COLUMNS):
+    """Записує кожен step-й рядок історії у CSV блоками, без проміжних списків."""
+    names = [name for name, _, _ in columns if name in history]
+    rows = np.arange(0, len(history["t"]), step)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write(",".join(names) + "\n")
+        for start in range(0, len(rows), CSV_BLOCK_ROWS):
+            index = rows[start : start + CSV_BLOCK_ROWS]
+            block = np.column_stack([history[name][index] for name in names])
+            np.savetxt(file, block, delimiter=",", fmt="%.10g")
+
+
+class HistoryTable(ttk.Frame):
+    """Таблиця з прокруткою, переходом до моменту часу та експортом у CSV."""
+
+    ROW_HEIGHT = 25
+
+    def __init__(self, parent, interval=0.1, rows=10, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.history = {"t": np.empty(0)}
+        self.step = 1
+        self.count = 0
+        self.offset = 0
+        self.interval_var = tk.DoubleVar(value=interval)
+        self.jump_var = tk.DoubleVar(value=0.0)
+        self._create_controls()
+
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(
+            body,
+            columns=[name for name, _, _ in COLUMNS],
+            show="headings",
+            height=rows,
+            selectmode="none",
+        )
+        for name, heading, _ in COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=100, anchor="e")
+        self.scrollbar = ttk.Scrollbar(
+            body, orient=tk.VERTICAL, command=self._on_scroll
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._items = []
+        self._resize(rows)
+        self.tree.configure(height=rows)
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-len(self._items)))
+        self.tree.bind("<Next>", lambda event: self.scroll(len(self._items)))
+
+    def _create_controls(self):
+        bar = ttk.Frame(self)
+        bar.pack(fill=tk.X, pady=(0, 4))
+        ttk.Label(bar, text="Крок, с:").pack(side=tk.LEFT)
+        interval = ttk.Entry(bar, textvariable=self.interval_var, width=6)
+        interval.pack(side=tk.LEFT, padx=(2, 8))
+        interval.bind("<Return>", lambda event: self.set_interval())
+        ttk.Label(bar, text="Перейти до t, с:").pack(side=tk.LEFT)
+        jump = ttk.Entry(bar, textvariable=self.jump_var, width=8)
+        jump.pack(side=tk.LEFT, padx=2)
+        jump.bind("<Return>", lambda event: self._jump())
+        ttk.Button(bar, text="→", width=3, command=self._jump).pack(side=tk.LEFT)
+        ttk.Button(bar, text="CSV…", command=self.export_csv).pack(side=tk.RIGHT)
+
+    def set_history(self, history):
+        self.history = history
+        self.offset = 0
+        self._recount()
+
+    def set_interval(self, interval=None):
+        """Змінює інтервал між рядками, зберігаючи поточний момент часу."""
+        if interval is not None:
+            self.interval_var.set(interval)
+        try:
+            interval = self.interval_var.get()
+        except tk.TclError:
+            return
+        if interval <= 0:
+            return
+        top = self.offset * self.step
+        self._recount()
+        self.scroll_to(top // self.step)
+
+    def _recount(self):
+        t = self.history["t"]
+        try:
+            interval = self.interval_var.get()
+        except tk.TclError:
+            interval = 0.1
+        self.step = table_step(t, interval) if interval > 0 else 1
+        self.count = -(-len(t) // self.step)
+        self._refresh()
+
+    def jump_to(self, time):
+        """Прокручує таблицю так, щоб першим був рядок з моментом ≥ time."""
+        t = self.history["t"]
+        record = int(np.searchsorted(t, time))
+        self.scroll_to(-(-record // self.step))
+
+    def _jump(self):
+        try:
+            self.jump_to(self.jump_var.get())
+        except tk.TclError:
+            pass
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, row):
+        last = max(0, self.count - len(self._items))
+        self.offset = min(max(0, int(row)), last)
+        self._refresh()
+
+    def _refresh(self):
+        history, step = self.history, self.step
+        for k, item in enumerate(self._items):
+            row = self.offset + k
+            if row < self.count:
+                i = row * step
+                values = [
+                    fmt.format(history[name][i]) if name in history else ""
+                    for name, _, fmt in COLUMNS
+                ]
+            else:
+                values = ()
+            self.tree.item(item, values=values)
+        if self.count:
+            first = self.offset / self.count
+            self.scrollbar.set(first, min(1.0, first + len(self._items) / self.count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _resize(self, rows):
+        rows = max(1, rows)
+        while len(self._items) < rows:
+            self._items.append(self.tree.insert("", "end", values=()))
+        while len(self._items) > rows:
+            self.tree.delete(self._items.pop())
+
+    def _on_configure(self, event):
+        # Кількість рядків підлаштовується під фактичну висоту віджета
+        # (один рядок займає заголовок); запитана висота не змінюється
+        rows = event.height // self.ROW_HEIGHT - 1
+        if rows != len(self._items) and rows > 0:
+            self._resize(rows)
+            self.scroll_to(self.offset)
+
+    def _on_scroll(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(value) * self.count))
+        elif action == "scroll":
+            page = len(self._items) if unit == "pages" else 1
+            self.scroll(int(value) * page)
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def export_csv(self):
+        if not len(self.history["t"]):
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".csv", filetypes=[("CSV", "*.csv")]
+        )
+        if path:
+            write_csv(path, self.history, self.step)
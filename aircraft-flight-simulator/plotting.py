@@ -0,0 +1,210 @@
+"""Швидке малювання довгих рядів: постійні лінії, min/max-проріджування, blit.
+
+PlotView тримає осі та лінії між натисканнями кнопок: повторний графік того
+самого макета лише оновлює дані через set_data. Кожна лінія отримує не
+більше ~2 точок на стовпчик пікселів осі (мінімум і максимум кошика), тож
+піки зберігаються, а час перемальовування не залежить від довжини прогону.
+Після масштабування панеллю інструментів видима ділянка проріджується
+заново з повних даних. Для потокових прогонів start_live/extend_live/blit
+дописують блоки в анімовані лінії та перемальовують лише їх.
+"""
+
+import numpy as np
+
+
+def minmax_decimate(x, y, buckets):
+    """Мінімум і максимум y у кожному з buckets рівних за кількістю точок кошиків.
+
+    Точки кожного кошика йдуть у порядку зростання x; перша й остання точки
+    ряду зберігаються завжди. Короткі ряди повертаються без змін.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if buckets < 1 or n <= 2 * buckets + 2:
+        return x, y
+    per = -(-n // buckets)
+    count = -(-n // per)
+    padded = np.pad(y, (0, count * per - n), mode="edge").reshape(count, per)
+    offsets = np.arange(count) * per
+    i_min = np.argmin(padded, axis=1) + offsets
+    i_max = np.argmax(padded, axis=1) + offsets
+    index = np.empty(2 * count + 2, dtype=np.intp)
+    index[0], index[-1] = 0, n - 1
+    index[1:-1:2] = np.minimum(i_min, i_max)
+    index[2:-1:2] = np.maximum(i_min, i_max)
+    index = np.minimum(index, n - 1)
+    return x[index], y[index]
+
+
+class PlotView:
+    """Постійні осі та лінії поверх matplotlib figure/canvas.
+
+    Порядок використання: layout() -> line()/hline()/vline() -> finish() ->
+    (підписи, легенда, стиль) -> draw(). Лінії, не оновлені між layout() та
+    finish(), ховаються, а не видаляються.
+    """
+
+    def __init__(self, figure, canvas):
+        self.figure, self.canvas = figure, canvas
+        self.key, self.axes = None, []
+        self._artists = {}
+        self._series = {}
+        self._used = set()
+        self._fresh = False
+        self._building = False
+        self._live = None
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def layout(self, key, rows=1):
+        """Осі макета key; фігура перебудовується лише при зміні макета."""
+        if key != self.key:
+            self.stop_live()
+            self.figure.clear()
+            grid = self.figure.add_gridspec(rows, 1)
+            self.axes = [self.figure.add_subplot(grid[i, 0]) for i in range(rows)]
+            self._artists = {ax: {} for ax in self.axes}
+            self._series = {}
+            for ax in self.axes:
+                ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+            self.key, self._fresh = key, True
+        self._used = set()
+        self._building = True
+        return self.axes
+
+    def _artist(self, ax, slot, create, props):
+        artist = self._artists[ax].get(slot)
+        if artist is None:
+            artist = create()
+            self._artists[ax][slot] = artist
+        artist.update(props)
+        artist.set_visible(True)
+        self._used.add(artist)
+        return artist
+
+    def line(self, ax, slot, x, y, **props):
+        """Лінія slot на осях ax з повними даними x, y (проріджується)."""
+        artist = self._artist(ax, slot, lambda: ax.plot([], [])[0], props)
+        self._series[artist] = (np.asarray(x), np.asarray(y))
+        self._decimate(artist, ax, None)
+        return artist
+
+    def hline(self, ax, slot, y, **props):
+        artist = self._artist(ax, slot, lambda: ax.axhline(y), props)
+        artist.set_ydata([y, y])
+        return artist
+
+    def vline(self, ax, slot, x, **props):
+        artist = self._artist(ax, slot, lambda: ax.axvline(x), props)
+        artist.set_xdata([x, x])
+        return artist
+
+    def finish(self):
+        """Ховає невикористані лінії та масштабує осі під видимі дані."""
+        self._building = False
+        for ax in self.axes:
+            for artist in self._artists[ax].values():
+                if artist not in self._used:
+                    artist.set_visible(False)
+                    artist.set_label("_hidden")
+            ax.relim(visible_only=True)
+            ax.set_autoscale_on(True)
+            ax.autoscale_view()
+
+    def draw(self, suptitle="", rect=None):
+        self.figure.suptitle(suptitle, fontsize=14, color="#5d4a66", weight="bold")
+        if self._fresh:
+            # Розміщення осей рахується лише для нового макета
+            self.figure.tight_layout(rect=rect)
+            self._fresh = False
+        self.canvas.draw_idle()
+
+    def _decimate(self, artist, ax, xlim):
+        x, y = self._series[artist]
+        if xlim is not None and len(x):
+            start, stop = np.searchsorted(x, xlim)
+            x, y = x[max(0, start - 1) : stop + 1], y[max(0, start - 1) : stop + 1]
+        buckets = max(1, int(ax.bbox.width))
+        artist.set_data(*minmax_decimate(x, y, buckets))
+
+    def _on_xlim_changed(self, ax):
+        # Проміжні межі під час побудови (axhline тощо) не звужують дані
+        if self._building or self._live is not None:
+            return
+        xlim = sorted(ax.get_xlim())
+        for artist in self._artists.get(ax, {}).values():
+            if artist in self._series:
+                self._decimate(artist, ax, xlim)
+
+    def start_live(self, lines, xlim):
+        """Анімовані лінії lines — список (ax, slot) — для блочних оновлень."""
+        self.stop_live()
+        artists = [self._artists[ax][slot] for ax, slot in lines]
+        for ax in {ax for ax, _ in lines}:
+            ax.set_xlim(xlim)
+        for artist in artists:
+            artist.set_animated(True)
+            artist.set_data([], [])
+        self._live = {
+            "artists": artists,
+            "points": {artist: ([], []) for artist in artists},
+            "span": xlim[1] - xlim[0],
+            "limits": {},
+            "background": None,
+            "redraw": False,
+        }
+        self.canvas.draw()
+
+    def extend_live(self, ax, slot, x, y):
+        """Дописує блок даних у живу лінію (застосовується в blit())."""
+        live = self._live
+        if live is None or not len(x):
+            return
+        artist = self._artists[ax][slot]
+        share = (x[-1] - x[0]) / live["span"] if live["span"] > 0 else 1.0
+        x, y = minmax_decimate(x, y, max(1, int(ax.bbox.width * share)))
+        xs, ys = live["points"][artist]
+        xs.append(x)
+        ys.append(y)
+        artist.set_data(np.concatenate(xs), np.concatenate(ys))
+        finite = y[np.isfinite(y)]
+        if len(finite):
+            # Межі осі рахуються лише за даними поточного живого прогону
+            y_min, y_max = finite.min(), finite.max()
+            low, high = live["limits"].get(ax, (y_min, y_max))
+            if ax not in live["limits"] or y_min < low or y_max > high:
+                low, high = min(low, y_min), max(high, y_max)
+                live["limits"][ax] = (low, high)
+                margin = 0.1 * (high - low) or 1.0
+                ax.set_ylim(low - margin, high + margin)
+                live["redraw"] = True
+
+    def blit(self):
+        """Перемальовує лише живі лінії; повний draw — якщо змінились межі осей."""
+        live = self._live
+        if live is None:
+            return
+        if live["redraw"] or live["background"] is None:
+            live["redraw"] = False
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(live["background"])
+        self._draw_live()
+        self.canvas.blit(self.figure.bbox)
+
+    def stop_live(self):
+        if self._live is None:
+            return
+        for artist in self._live["artists"]:
+            artist.set_animated(False)
+        self._live = None
+        self.canvas.draw_idle()
+
+    def _draw_live(self):
+        for artist in self._live["artists"]:
+            artist.axes.draw_artist(artist)
+
+    def _on_draw(self, event):
+        # Після повного малювання (також зміни розміру вікна) оновлюємо фон
+        if self._live is not None:
+            self._live["background"] = self.canvas.copy_from_bbox(self.figure.bbox)
+            self._draw_live()
@@ -1,13 +1,358 @@
-import tkinter as tk
-from tkinter import ttk
+"""Ядро моделі: рівняння руху, інтегратори та запис історії.
+
+Модуль не імпортує tkinter і matplotlib, тож його можна використовувати
+зі скриптів і на серверах без дисплея. Запуск:
+    python rgr.py                   # графічний інтерфейс (gui.py)
+    python rgr.py scenario.json     # пакетні прогони без GUI (cli.py)
+"""
+
+import copy
+import math
+import pickle
+import sys
+import time as clock
+
 import numpy as np
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+from events import EventMonitor
+from turbulence import CHUNK_STEPS, shared_turbulence
+
+
+def _expm(M):
+    """Матрична експонента: масштабування з піднесенням до квадрата + ряд Тейлора."""
+    norm = np.linalg.norm(M, ord=np.inf)
+    squarings = max(0, int(np.ceil(np.log2(norm / 0.5)))) if norm > 0.5 else 0
+    X = M / 2.0**squarings
+    result = np.eye(M.shape[0])
+    term = np.eye(M.shape[0])
+    for k in range(1, 20):
+        term = term @ X / k
+        result = result + term
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+# Таблиця Бутчера методу Дормана–Прінса 5(4) та коефіцієнти щільного виводу
+_DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+]
+_DP_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+_DP_E = np.array(
+    [-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40]
+)
+_DP_P = np.array(
+    [
+        [
+            1,
+            -8048581381 / 2820520608,
+            8663915743 / 2820520608,
+            -12715105075 / 11282082432,
+        ],
+        [0, 0, 0, 0],
+        [
+            0,
+            131558114200 / 32700410799,
+            -68118460800 / 10900136933,
+            87487479700 / 32700410799,
+        ],
+        [
+            0,
+            -1754552775 / 470086768,
+            14199869525 / 1410260304,
+            -10690763975 / 1880347072,
+        ],
+        [
+            0,
+            127303824393 / 49829197408,
+            -318862633887 / 49829197408,
+            701980252875 / 199316789632,
+        ],
+        [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+        [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+    ]
+)
+
+
+class HistoryRecorder:
+    """Колонковий запис історії у попередньо виділені масиви float64.
+
+    Канали: V — ΔV, м/с; H — ΔH, м; alpha, theta — град; omega_z — град/с;
+    ny; delta_g — команда тяги. Параметри прогону record_every (кожен k-й
+    крок) або output_dt (с) задають проріджування, channels — набір каналів.
+    Для ансамблю (rows=N) кожен канал — матриця (N, кількість записів).
+    Якщо задано chunk_steps, буфер вміщує chunk_steps кроків інтегрування,
+    округлених угору до кратного record_every (ceil(chunk_steps /
+    record_every) записів), і спорожнюється методом flush(),
+    тож пам'ять не залежить від тривалості прогону; без chunk_steps буфер
+    вміщує всю історію й спорожнюється лише після останнього кроку
+    інтегрування. start_row — номер
+    першого рядка (продовження прогону зі знімка стану).
+    """
+
+    CHANNELS = ("V", "H", "alpha", "ny", "omega_z", "theta", "delta_g")
+    DEFAULT_CHANNELS = ("V", "H", "alpha", "ny")
+
+    def __init__(self, time, dt, params, rows=None, chunk_steps=None, start_row=0):
+        self.every = self.decimation(dt, params)
+
+        self.channels = tuple(params.get("channels", self.DEFAULT_CHANNELS))
+        unknown = set(self.channels) - set(self.CHANNELS)
+        if unknown:
+            raise ValueError(f"Невідомі канали історії: {sorted(unknown)}")
+
+        self.t = time[:: self.every]
+        self.chunked = chunk_steps is not None
+        if chunk_steps is None:
+            self.capacity = len(self.t)
+        elif chunk_steps < 1:
+            raise ValueError("chunk_steps має бути додатним")
+        else:
+            self.capacity = -(-int(chunk_steps) // self.every)
+        self.rows = rows
+        self.offset = start_row
+        self._allocate()
+
+    @staticmethod
+    def decimation(dt, params):
+        """Крок проріджування (кожен k-й крок) з record_every або output_dt."""
+        every = params.get("record_every")
+        if every is None:
+            every = max(1, round(params.get("output_dt", dt) / dt))
+        if int(every) < 1:
+            raise ValueError("record_every має бути додатним")
+        return int(every)
+
+    def _allocate(self):
+        self.size = min(self.capacity, len(self.t) - self.offset)
+        shape = (self.size,) if self.rows is None else (self.rows, self.size)
+        self.columns = {name: np.empty(shape) for name in self.channels}
+        self._slots = [
+            (self.columns[name], self.CHANNELS.index(name)) for name in self.channels
+        ]
+        self.n = 0
+
+    @property
+    def recorded(self):
+        """Загальна кількість записаних рядків з урахуванням спорожнених блоків."""
+        return self.offset + self.n
+
+    @property
+    def full(self):
+        return self.n == self.size
+
+    def record(self, row):
+        """Записує один рядок — кортеж значень у порядку CHANNELS."""
+        n = self.n
+        for column, k in self._slots:
+            column[..., n] = row[k]
+        self.n = n + 1
+
+    def extend(self, rows):
+        """Записує блок рядків, скільки вміщує буфер; повертає їх кількість."""
+        n = self.n
+        m = min(len(rows[0]), self.size - n)
+        for column, k in self._slots:
+            column[..., n : n + m] = rows[k][:m]
+        self.n = n + m
+        return m
+
+    def count(self, steps):
+        """Кількість записаних рядків після steps кроків інтегрування."""
+        return (steps + self.every - 1) // self.every
+
+    def history(self, n=None, row=None):
+        n = self.n if n is None else n
+        history = {"t": self.t[self.offset : self.offset + n]}
+        for name, column in self.columns.items():
+            history[name] = (column if row is None else column[row])[:n]
+        return history
+
+    def flush(self):
+        """Повертає заповнену частину буфера та починає новий блок."""
+        history = self.history()
+        self.offset += self.n
+        self._allocate()
+        return history
+
+
+class SimulationStats:
+    """Необов'язкова інструментація прогонів: лічильники та час за фазами.
+
+    Передається як stats у run_simulation/iter_simulation і накопичує дані
+    всіх прогонів, у яких брала участь. Фази: schedule (таблиця
+    коефіцієнтів), controller (регулятор), integrate (кроки інтегратора),
+    check (перевірка на NaN), ny (обчислення dα/dt для перевантаження),
+    events (перевірка подій), record (запис історії), hooks (виклики
+    hooks). Кожен hook(t, y) викликається після прийнятого кроку зі станом
+    y = [ΔV, α, ωz, θ, ΔH] у момент t. Без stats цикли інтегрування не
+    вимірюють час.
+    """
+
+    PHASES = (
+        "schedule",
+        "controller",
+        "integrate",
+        "check",
+        "ny",
+        "events",
+        "record",
+        "hooks",
+    )
+
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self.runs = 0
+        self.steps = 0
+        self.evaluations = 0
+        self.ny_evaluations = 0
+        self.rejected_steps = 0
+        self.unstable_steps = 0
+        self.time = dict.fromkeys(self.PHASES, 0.0)
+
+    @property
+    def total_time(self):
+        return sum(self.time.values())
+
+    def lap(self, phase, mark):
+        """Додає час від mark до фази phase; повертає нову позначку."""
+        now = clock.perf_counter()
+        self.time[phase] += now - mark
+        return now
+
+    def counted(self, f):
+        """Обгортка функції похідних, що рахує її виклики."""
+
+        def wrapper(*args):
+            self.evaluations += 1
+            return f(*args)
+
+        return wrapper
+
+    def step(self, t, y):
+        """Прийнятий крок: лічильник і виклик hooks."""
+        self.steps += 1
+        if self.hooks:
+            mark = clock.perf_counter()
+            for hook in self.hooks:
+                hook(t, y)
+            self.lap("hooks", mark)
+
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "steps": self.steps,
+            "evaluations": self.evaluations,
+            "ny_evaluations": self.ny_evaluations,
+            "rejected_steps": self.rejected_steps,
+            "unstable_steps": self.unstable_steps,
+            "time": dict(self.time),
+            "total_time": self.total_time,
+        }
+
+    def __repr__(self):
+        phases = ", ".join(f"{k}={v * 1e3:.2f}мс" for k, v in self.time.items() if v)
+        return (
+            f"SimulationStats(runs={self.runs}, steps={self.steps}, "
+            f"evaluations={self.evaluations}, rejected={self.rejected_steps}, "
+            f"unstable={self.unstable_steps}, {phases})"
+        )
+
+
+class SimulationState:
+    """Знімок повного стану прогону для продовження та розгалуження.
+
+    z — [ΔV, α, ωz, θ, ΔH, стан PD-фільтра, δ_г]; t — модельний час; step —
+    номер наступного кроку сталої сітки; rows — кількість уже записаних
+    рядків історії; mode — поточний режим (після подій switch може
+    відрізнятися від params); kernel — (c, e) з таблиці коефіцієнтів;
+    h — поточний крок rk45; events — стан подій. finished — прогін
+    зупинено подією stop або втратою стабільності.
+
+    Передається як state у run_simulation/iter_simulation, що оновлюють
+    його на місці; fork() дає незалежну копію для гілки. Продовжувати
+    можна з тими самими dt, method та проріджуванням запису.
+    """
+
+    def __init__(self, params):
+        dt = params.get("dt", 0.01)
+        self.dt = dt
+        self.method = params.get("method", "rk4")
+        self.every = HistoryRecorder.decimation(dt, params)
+        self.mode = params.get("mode", "free_flight")
+        y0 = params.get("y0", [0.0, np.deg2rad(1.0), 0.0, 0.0, 0.0])
+        self.z = [float(v) for v in y0] + [0.0, 0.0]
+        self.t = 0.0
+        self.step = 0
+        self.rows = 0
+        self.h = None
+        self.kernel = ()
+        self.events = None
+        self.finished = False
+
+    def capture(self, t, step, recorder, z, mode, kernel=(), monitor=None, h=None):
+        """Оновлює знімок з локального стану циклу інтегрування."""
+        self.t, self.step, self.rows = t, step, recorder.recorded
+        self.z, self.mode, self.kernel, self.h = z, mode, kernel, h
+        if monitor is not None:
+            self.events = monitor.snapshot()
+
+    def fork(self):
+        """Незалежна копія для гілки; коефіцієнти kernel спільні (лише читання)."""
+        branch = copy.copy(self)
+        branch.z = list(self.z)
+        branch.events = copy.deepcopy(self.events)
+        return branch
+
+    def check(self, params):
+        dt, method = params.get("dt", 0.01), params.get("method", "rk4")
+        every = HistoryRecorder.decimation(dt, params)
+        if (dt, method, every) != (self.dt, self.method, self.every):
+            raise ValueError(
+                "Стан створено для інших dt/method/проріджування запису: "
+                f"{self.dt}/{self.method}/{self.every}"
+            )
+
+    def save(self, path):
+        """Зберігає знімок у файл (pickle) для продовження після перерви."""
+        with open(path, "wb") as file:
+            pickle.dump(self, file)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as file:
+            state = pickle.load(file)
+        if not isinstance(state, SimulationState):
+            raise ValueError(f"{path}: не знімок стану симуляції")
+        return state
+
+    def __repr__(self):
+        return (
+            f"SimulationState(t={self.t:.3f}, step={self.step}, rows={self.rows}, "
+            f"mode={self.mode!r}, finished={self.finished})"
+        )
 
 
 class AircraftSimulator:
     """Клас для розрахунку коефіцієнтів та проведення симуляції."""
 
+    # Параметри автопілота; кожен можна перевизначити ключем у params прогону
+    CONTROLLER_DEFAULTS = {
+        "kv": 5,
+        "kv_dot": 3.6,
+        "T_dv": 1.0,
+        "Tv_dot": 2.0,
+        "Fv_limit": 5.5,
+        "V_pr_zad": 10.0,
+        "kh": 0.1,
+        "kh_dot": 0.4,
+    }
+
     def __init__(self):
         """Ініціалізація параметрів літака та середовища для режиму №2."""
         self.S = 201.45
@@ -20,14 +365,12 @@ class AircraftSimulator:
         self.rho_H = 0.0636
         self.a_H = 314.34
         self.g = 9.81
-        self.m = self.G / self.g
 
         # Аеродинамічні коефіцієнти (Додаток Г, режим 2)
         self.Cya = 5.90
         self.Cyd_v = 0.2865
         self.Cxa = 0.336
         self.Cx_grp = 0.0275
-        self.Cy_grp = (2 * self.G) / (self.S * self.rho_H * self.V0**2)
         self.m_z_wz = -13.4
         self.m_z_alpha = -1.95
         self.m_z_alpha_dot = -4.0
@@ -50,11 +393,35 @@ class AircraftSimulator:
         self.Cy_M = 0
         self.m_z_M = 0
 
-        self.delta_X_t_bar = self.X_t_bar - 0.24
         self.c = {}
         self.e = {}
+        self._calculate_derived_values()
+        self._calculate_coefficients()
+        self._calculate_trim_values()
+
+    def update_parameters(self, **parameters):
+        """Змінює параметри літака/середовища та перераховує c, e і балансування.
+
+        Приймає лише наявні вихідні параметри (Cya, m_z_alpha, rho_H, V0, G,
+        X_t_bar тощо); похідні величини m, Cy_grp, delta_X_t_bar
+        перераховуються автоматично.
+        """
+        derived = {"m", "Cy_grp", "delta_X_t_bar", "c", "e", "delta_v_bal_rad"}
+        for name, value in parameters.items():
+            if name in derived or not isinstance(
+                getattr(self, name, None), float | int
+            ):
+                raise ValueError(f"Невідомий параметр літака: {name}")
+            setattr(self, name, value)
+        self._calculate_derived_values()
         self._calculate_coefficients()
         self._calculate_trim_values()
+        return self
+
+    def _calculate_derived_values(self):
+        self.m = self.G / self.g
+        self.Cy_grp = (2 * self.G) / (self.S * self.rho_H * self.V0**2)
+        self.delta_X_t_bar = self.X_t_bar - 0.24
 
     def _calculate_coefficients(self):
         m, V0, rho_H, S, bA, Iz, g = (
@@ -86,6 +453,7 @@ class AircraftSimulator:
         self.e[1] = (rho_H * V0 / m) * S * self.Cx_grp
         self.e[2] = (57.3 * rho_H / m) * S * self.Cy_grp
         self.e[3] = 0
+        self._transition_cache = {}
 
     def _calculate_trim_values(self):
         alpha_bal_rad = (self.Cy_grp - self.c_y_0) / self.Cya
@@ -135,47 +503,432 @@ class AircraftSimulator:
             d_alpha_dt,
         )
 
-    def run_simulation(self, params):
-        dt, method, mode = (
-            params.get("dt", 0.01),
-            params.get("method", "rk4"),
-            params.get("mode", "free_flight"),
+    def _equations_of_motion_batch(self, Y, delta_v_rad, delta_g, special, gust=None):
+        """Векторизована версія _equations_of_motion для матриці станів (N, 5).
+
+        gust — (α_г, ΔV_г) по рядках: збурення аеродинамічних членів, як у
+        _scalar_kernel; похідна висоти лишається від справжнього стану.
+        """
+        delta_V, alpha_rad, omega_z_rad, theta_rad, _ = Y.T
+        c, e = self.c, self.e
+        d_delta_H_dt = (self.V0 + delta_V) * np.sin(theta_rad - alpha_rad)
+        if gust is not None:
+            alpha_rad, delta_V = alpha_rad + gust[0], delta_V + gust[1]
+
+        d_gamma_dt = (
+            c[4] * alpha_rad
+            + np.deg2rad(e[2] * delta_V)
+            + np.deg2rad(c[9] * np.rad2deg(delta_v_rad))
+        )
+        d_alpha_dt = omega_z_rad - d_gamma_dt
+
+        d_delta_V_dt = np.where(
+            special,
+            0.0,
+            -e[1] * delta_V
+            - c[8] * np.rad2deg(alpha_rad)
+            - c[7] * np.rad2deg(theta_rad)
+            - c[19] * delta_g,
+        )
+
+        d_omega_z_dt = (
+            -c[1] * omega_z_rad
+            - (c[2] + c[17]) * alpha_rad
+            - c[5] * d_alpha_dt
+            - np.deg2rad(e[3] * delta_V)
+            - (c[3] + c[18]) * delta_v_rad
         )
-        y = np.array(
-            params.get("y0", [0.0, np.deg2rad(1.0), 0.0, 0.0, 0.0]), dtype=float
+        d_theta_dt = omega_z_rad
+
+        return (
+            np.stack(
+                [d_delta_V_dt, d_alpha_dt, d_omega_z_dt, d_theta_dt, d_delta_H_dt],
+                axis=1,
+            ),
+            d_alpha_dt,
         )
 
-        kv, kv_dot, T_dv, Tv_dot, Fv_limit, V_pr_zad = 5, 3.6, 1.0, 2.0, 5.5, 10.0
-        kh, kh_dot = 0.1, 0.4
+    def _state_space(self, mode):
+        """Матриці A (5x5) та B (5x2) лінійної моделі, вхід u = [δ_в, рад; δ_г].
+
+        Канал висоти лінеаризовано для малих кутів: dΔH/dt ≈ V0 * (θ - α);
+        нелінійний залишок враховується окремо (_altitude_residual).
+        """
+        c, e = self.c, self.e
+        d2r, r2d = np.pi / 180.0, 180.0 / np.pi
+        A = np.zeros((5, 5))
+        B = np.zeros((5, 2))
+
+        if mode != "special_rv":
+            A[0] = [-e[1], -c[8] * r2d, 0.0, -c[7] * r2d, 0.0]
+            B[0] = [0.0, -c[19]]
+        A[1] = [-e[2] * d2r, -c[4], 1.0, 0.0, 0.0]
+        B[1] = [-c[9], 0.0]
+        A[2] = [-e[3] * d2r, -(c[2] + c[17]), -c[1], 0.0, 0.0] - c[5] * A[1]
+        B[2] = [-(c[3] + c[18]), 0.0] - c[5] * B[1]
+        A[3] = [0.0, 0.0, 1.0, 0.0, 0.0]
+        A[4] = [0.0, -self.V0, 0.0, self.V0, 0.0]
+        return A, B
+
+    def _transition_matrices(self, mode, dt):
+        """Дискретні Φ = exp(A·dt) та Γ для кусково-сталого входу (кеш за dt)."""
+        key = (mode != "special_rv", dt)
+        if key not in self._transition_cache:
+            A, B = self._state_space(mode)
+            M = np.zeros((7, 7))
+            M[:5, :5], M[:5, 5:] = A, B
+            E = _expm(M * dt)
+            self._transition_cache[key] = (E[:5, :5], E[:5, 5:])
+        return self._transition_cache[key]
+
+    def _altitude_residual(self, y):
+        """Різниця між нелінійною та лінеаризованою швидкістю зміни висоти."""
+        delta_V, alpha_rad, _, theta_rad = y[:4]
+        gamma = theta_rad - alpha_rad
+        return (self.V0 + delta_V) * np.sin(gamma) - self.V0 * gamma
+
+    def _scalar_exact(self, mode, dt):
+        """Крок точної дискретизації на звичайних float-ах для одиночних прогонів.
+
+        Φ та Γ розгорнуто в локальні константи; ΔH не входить у праву частину
+        (стовпець ΔH матриці A нульовий), тож перші чотири рядки Φ його
+        пропускають. Повертає step(ΔV, α, ωz, θ, ΔH, δ_в, δ_г) -> новий y
+        разом із трапецієвидною поправкою висоти (_altitude_residual).
+        """
+        Phi, Gamma = self._transition_matrices(mode, dt)
+        (a0, a1, a2, a3, _), (b0, b1, b2, b3, _) = Phi[:2].tolist()
+        (c0, c1, c2, c3, _), (d0, d1, d2, d3, _) = Phi[2:4].tolist()
+        h0, h1, h2, h3, h4 = Phi[4].tolist()
+        (ga0, ga1), (gb0, gb1), (gc0, gc1), (gd0, gd1), (gh0, gh1) = Gamma.tolist()
+        V0, half_dt, sin = self.V0, 0.5 * dt, math.sin
+
+        def step(delta_V, alpha, omega_z, theta, delta_H, delta_v_rad, delta_g):
+            gamma = theta - alpha
+            residual = (V0 + delta_V) * sin(gamma) - V0 * gamma
+            new_V = (a0 * delta_V + a1 * alpha + a2 * omega_z + a3 * theta) + (
+                ga0 * delta_v_rad + ga1 * delta_g
+            )
+            new_alpha = (b0 * delta_V + b1 * alpha + b2 * omega_z + b3 * theta) + (
+                gb0 * delta_v_rad + gb1 * delta_g
+            )
+            new_omega_z = (c0 * delta_V + c1 * alpha + c2 * omega_z + c3 * theta) + (
+                gc0 * delta_v_rad + gc1 * delta_g
+            )
+            new_theta = (d0 * delta_V + d1 * alpha + d2 * omega_z + d3 * theta) + (
+                gd0 * delta_v_rad + gd1 * delta_g
+            )
+            new_H = (
+                h0 * delta_V + h1 * alpha + h2 * omega_z + h3 * theta + h4 * delta_H
+            ) + (gh0 * delta_v_rad + gh1 * delta_g)
+            # Поправка до лінеаризованої висоти (метод трапецій)
+            gamma = new_theta - new_alpha
+            residual += (V0 + new_V) * sin(gamma) - V0 * gamma
+            return [
+                new_V,
+                new_alpha,
+                new_omega_z,
+                new_theta,
+                new_H + half_dt * residual,
+            ]
+
+        return step
+
+    def _controller_constants(self, params):
+        kv, kv_dot, T_dv, Tv_dot, Fv_limit, V_pr_zad, kh, kh_dot = (
+            params.get(name, value) for name, value in self.CONTROLLER_DEFAULTS.items()
+        )
         if "gain_factor" in params:
             kv *= params["gain_factor"]
+        return kv, kv_dot, T_dv, Tv_dot, Fv_limit, V_pr_zad, kh, kh_dot
+
+    def _scalar_kernel(self, mode, c=None, e=None, gust=None):
+        """Права частина рівнянь руху на звичайних float-ах для одиночних прогонів.
+
+        Коефіцієнти c/e разом із множниками переведення градусів/радіан
+        згорнуто в локальні константи, тож виклик не створює масивів numpy.
+        Результат збігається з _equations_of_motion з відносною похибкою
+        порядку 1e-12 (інший порядок округлення згорнутих множників).
+        Замість self.c/self.e можна передати інший набір коефіцієнтів.
+        gust — список [α_г, ΔV_г], який цикл прогону оновлює на кожному
+        кроці: збурення додаються до α та ΔV в аеродинамічних членах, а
+        похідна висоти лишається від справжнього стану.
+        """
+        c = self.c if c is None else c
+        e = self.e if e is None else e
+        d2r, r2d = np.pi / 180.0, 180.0 / np.pi
+        V0 = self.V0
+        special = mode == "special_rv"
+        sin = math.sin
+
+        g_alpha, g_V, g_dv = c[4], e[2] * d2r, c[9]
+        v_V, v_alpha, v_theta, v_dg = -e[1], -c[8] * r2d, -c[7] * r2d, -c[19]
+        w_wz, w_alpha, w_dalpha = -c[1], -(c[2] + c[17]), -c[5]
+        w_V, w_dv = -e[3] * d2r, -(c[3] + c[18])
+
+        def alpha_rate(delta_V, alpha, omega_z, delta_v_rad):
+            return omega_z - (g_alpha * alpha + g_V * delta_V + g_dv * delta_v_rad)
+
+        def derivs(delta_V, alpha, omega_z, theta, delta_v_rad, delta_g):
+            d_alpha = omega_z - (g_alpha * alpha + g_V * delta_V + g_dv * delta_v_rad)
+            if special:
+                d_V = 0.0
+            else:
+                d_V = v_V * delta_V + v_alpha * alpha + v_theta * theta + v_dg * delta_g
+            d_omega_z = (
+                w_wz * omega_z
+                + w_alpha * alpha
+                + w_dalpha * d_alpha
+                + w_V * delta_V
+                + w_dv * delta_v_rad
+            )
+            d_H = (V0 + delta_V) * sin(theta - alpha)
+            return d_V, d_alpha, d_omega_z, omega_z, d_H
+
+        if gust is None:
+            return derivs, alpha_rate
+        calm_derivs, calm_alpha_rate = derivs, alpha_rate
+
+        def alpha_rate(delta_V, alpha, omega_z, delta_v_rad):
+            return calm_alpha_rate(
+                delta_V + gust[1], alpha + gust[0], omega_z, delta_v_rad
+            )
+
+        def derivs(delta_V, alpha, omega_z, theta, delta_v_rad, delta_g):
+            d_V, d_alpha, d_omega_z, _, _ = calm_derivs(
+                delta_V + gust[1], alpha + gust[0], omega_z, theta, delta_v_rad, delta_g
+            )
+            d_H = (V0 + delta_V) * sin(theta - alpha)
+            return d_V, d_alpha, d_omega_z, omega_z, d_H
+
+        return derivs, alpha_rate
+
+    def initial_state(self, params):
+        """Стан на початку прогону params (t = 0) — SimulationState."""
+        return SimulationState(params)
+
+    def run_simulation(
+        self, params, stats=None, event_log=None, state=None, until=None
+    ):
+        """Повна історія прогону; stats — необов'язковий SimulationStats.
+
+        Спрацювання подій params["events"] додаються до списку event_log.
+        state та until — див. iter_simulation.
+        """
+        return next(
+            self.iter_simulation(
+                params,
+                chunk_steps=None,
+                stats=stats,
+                event_log=event_log,
+                state=state,
+                until=until,
+            )
+        )
+
+    def run_branches(self, params, branches, stats=None):
+        """Гілки прогону зі спільним префіксом.
 
-        pd_filter_state, delta_g_state = 0.0, 0.0
+        branches — список пар (t_гілки, зміни params). До t_гілки гілка
+        збігається з прогоном params, тож префікс інтегрується один раз, а
+        кожна гілка — лише від своєї точки (зміни не повинні впливати на
+        рух до t_гілки: наприклад, відмова з failure_time ≥ t_гілки; "mode"
+        у змінах перемикає режим у точці гілки). Повертає повні історії у
+        порядку branches.
+        """
+        state = self.initial_state(params)
+        prefix, results = [], [None] * len(branches)
+        for k in sorted(range(len(branches)), key=lambda k: branches[k][0]):
+            t_branch, changes = branches[k]
+            prefix.append(
+                self.run_simulation(params, stats=stats, state=state, until=t_branch)
+            )
+            branch = state.fork()
+            branch.mode = changes.get("mode", branch.mode)
+            tail = self.run_simulation({**params, **changes}, stats=stats, state=branch)
+            parts = prefix + [tail]
+            results[k] = {
+                key: np.concatenate([part[key] for part in parts]) for key in tail
+            }
+        return results
+
+    def iter_simulation(
+        self,
+        params,
+        chunk_steps=1000,
+        stats=None,
+        event_log=None,
+        state=None,
+        until=None,
+    ):
+        """Потокова симуляція: генератор блоків історії фіксованого розміру.
+
+        Кожен блок — словник масивів ("t" та канали) на chunk_steps кроків
+        інтегрування, округлених угору до кратного проріджування
+        (record_every), тож межі блоків збігаються з записаними рядками;
+        останній блок може бути коротшим. Стан інтегратора та
+        регулятора зберігається між блоками, а закриття генератора
+        (close() або вихід з циклу) зупиняє прогін. chunk_steps=None —
+        уся історія одним блоком, як у run_simulation.
+
+        Для euler/rk4 params["coefficient_schedule"] — функція (t, y) -> (c, e)
+        або None, що викликається кожні schedule_every кроків і дозволяє
+        змінювати коефіцієнти під час прогону. Так само лише для euler/rk4
+        params["turbulence"] — атмосферна турбулентність і пориви (див.
+        turbulence.py), відтворювані за seed.
 
+        Якщо передано stats (SimulationStats), у нього записуються лічильники
+        та час за фазами; без нього інструментація не виконується.
+
+        params["events"] — список подій (див. events.py): перетини порогів і
+        встановлення каналів, що записуються, зупиняють прогін або
+        перемикають режим. Події перевіряються на кожному кроці
+        інтегрування до кінця прогону незалежно від проріджування запису.
+        Записи про спрацювання додаються до event_log (якщо передано);
+        після stop історія закінчується на цьому кроці.
+
+        state (SimulationState) продовжує прогін зі знімка й оновлюється на
+        місці, зокрема перед кожним блоком, тож його можна зберегти як
+        контрольну точку; історія містить лише нові рядки. until — момент
+        зупинки (на сітці dt), після якого прогін можна продовжити тим самим
+        state; знімок береться точно в until, навіть якщо цей крок не
+        записується. Методи зі сталим кроком дають при цьому історію, побітово
+        однакову з прогоном без зупинок.
+        """
+        dt, method = params.get("dt", 0.01), params.get("method", "rk4")
+        if "coefficient_schedule" in params and method not in ("euler", "rk4"):
+            raise ValueError("coefficient_schedule підтримується лише для euler та rk4")
+        if params.get("turbulence") and method not in ("euler", "rk4"):
+            raise ValueError("turbulence підтримується лише для euler та rk4")
+        if state is None:
+            state = self.initial_state(params)
+        else:
+            state.check(params)
         time = np.arange(0, params.get("T_end", 100.0), dt)
-        history = {"t": time, "V": [], "H": [], "alpha": [], "ny": []}
+        stop = len(time)
+        if until is not None:
+            stop = min(stop, max(state.step, int(round(until / dt))))
+        if state.finished:
+            stop = state.step
+        recorder = HistoryRecorder(
+            time[:stop], dt, params, chunk_steps=chunk_steps, start_row=state.rows
+        )
+        first_row = recorder.offset
+        if stats is not None:
+            stats.runs += 1
+        monitor = None
+        if params.get("events"):
+            monitor = EventMonitor(params["events"], recorder.CHANNELS, event_log)
+            if state.events is not None and state.events[0] == list(params["events"]):
+                monitor.restore(state.events)
+
+        if method == "rk45":
+            iterator = self._iter_rk45
+        else:
+            iterator = self._iter_fixed_step
+        yield from iterator(params, time[:stop], recorder, stats, monitor, state)
+
+        if recorder.n or recorder.offset == first_row:
+            yield recorder.flush()
+
+    def _iter_fixed_step(self, params, time, recorder, stats, monitor, state):
+        dt, method, mode = params.get("dt", 0.01), state.method, state.mode
+        y = state.z[:5]
+
+        kv, kv_dot, T_dv, Tv_dot, Fv_limit, V_pr_zad, kh, kh_dot = (
+            self._controller_constants(params)
+        )
+        failure = params.get("failure", False)
+        failure_time = params.get("failure_time", 20.0)
+
+        pd_filter_state, delta_g_state = state.z[5:]
+
+        if method == "exact":
+            exact_step = self._scalar_exact(mode, dt)
 
-        for t in time:
+        schedule = params.get("coefficient_schedule")
+        schedule_every = params.get("schedule_every", 10)
+
+        # Збурення поточного кроку [α_г, ΔV_г]; ряд береться блоками кроків
+        gusts, gust = None, None
+        gust_alpha, gust_V = 0.0, 0.0
+        if params.get("turbulence"):
+            gusts = shared_turbulence(params["turbulence"], self.V0, dt)
+            gust_start, gust_stop = state.step, state.step + gusts.chunk
+            gust_series = [
+                part.tolist() for part in gusts.series(gust_start, gust_stop)
+            ]
+            gust = [gust_series[0][0], gust_series[1][0]]
+
+        instrumented = stats is not None
+        kernel = state.kernel  # (c, e) з таблиці коефіцієнтів, якщо вона задана
+        f, alpha_rate = self._scalar_kernel(mode, *kernel, gust=gust)
+        if instrumented:
+            f, lap = stats.counted(f), stats.lap
+        d2r, r2d = np.pi / 180.0, 180.0 / np.pi
+        V0, ny_gain = self.V0, self.V0 / self.g
+        c, e = kernel or (self.c, self.e)
+        v_V, v_alpha = -e[1], -c[8] * r2d
+        v_theta, v_dg = -c[7] * r2d, -c[19]
+        half_dt, sixth_dt = 0.5 * dt, dt / 6.0
+
+        record, every = recorder.record, recorder.every
+        fired = None
+        if monitor is not None and monitor.t is None:
+            delta_v_cmd_rad = -2.0 * d2r if mode == "special_rv" else 0.0
+            delta_g_cmd = delta_g_state if mode == "controlled" else 0.0
+            if mode == "controlled":
+                H_dot = (V0 + y[0]) * math.sin(y[3] - y[1])
+                delta_v_cmd_rad = (kh * y[4] + kh_dot * H_dot) * d2r
+            d_alpha_dt = alpha_rate(y[0], y[1], y[2], delta_v_cmd_rad)
+            ny = 1 + ny_gain * (y[2] - d_alpha_dt)
+            monitor.start(
+                state.t,
+                (y[0], y[4], y[1] * r2d, ny, y[2] * r2d, y[3] * r2d, delta_g_cmd),
+            )
+
+        # Стан оновлюється перед кожним блоком і після циклу (знімок state)
+        i, finished = state.step - 1, False
+        for i, t in enumerate(time[state.step :].tolist(), state.step):
             try:
+                if instrumented:
+                    mark = clock.perf_counter()
+                if gusts is not None:
+                    if i >= gust_stop:
+                        gust_start, gust_stop = i, i + gusts.chunk
+                        gust_series = [
+                            part.tolist() for part in gusts.series(i, gust_stop)
+                        ]
+                    gust_alpha = gust[0] = gust_series[0][i - gust_start]
+                    gust_V = gust[1] = gust_series[1][i - gust_start]
+                # Коефіцієнти для поточних умов польоту (наприклад, з envelope)
+                if schedule is not None and i % schedule_every == 0:
+                    coefficients = schedule(t, y)
+                    if coefficients is not None:
+                        c, e = kernel = coefficients
+                        f, alpha_rate = self._scalar_kernel(mode, c, e, gust=gust)
+                        if instrumented:
+                            f = stats.counted(f)
+                        v_V, v_alpha = -e[1], -c[8] * r2d
+                        v_theta, v_dg = -c[7] * r2d, -c[19]
+                    if instrumented:
+                        mark = lap("schedule", mark)
+
+                delta_V, alpha, omega_z, theta, delta_H = y
                 delta_v_cmd_deg, delta_g_cmd = 0.0, 0.0
                 if mode == "controlled":
-                    delta_V, alpha_rad, _, theta_rad, delta_H = y
-                    H_dot = (self.V0 + delta_V) * np.sin(theta_rad - alpha_rad)
+                    H_dot = (V0 + delta_V) * math.sin(theta - alpha)
                     delta_v_cmd_deg = +(kh * delta_H + kh_dot * H_dot)
 
-                    is_failure = params.get("failure", False) and t >= params.get(
-                        "failure_time", 20.0
-                    )
+                    is_failure = failure and t >= failure_time
                     error_V = delta_V - V_pr_zad
                     current_error_V = error_V if not is_failure else 0.0
 
-                    d_delta_V_dt_val = (
-                        -self.e[1] * delta_V
-                        - self.c[8] * np.rad2deg(alpha_rad)
-                        - self.c[7] * np.rad2deg(theta_rad)
-                        - self.c[19] * delta_g_state
+                    d_error_V_dt = (
+                        v_V * (delta_V + gust_V)
+                        + v_alpha * (alpha + gust_alpha)
+                        + v_theta * theta
+                        + v_dg * delta_g_state
                     )
-                    d_error_V_dt = d_delta_V_dt_val
 
                     pd_filter_state_dot = (1 / Tv_dot) * (
                         kv_dot * d_error_V_dt - pd_filter_state
@@ -183,419 +936,575 @@ class AircraftSimulator:
                     pd_filter_state += pd_filter_state_dot * dt
                     p_delta_g_star = -(kv * current_error_V + pd_filter_state)
                     delta_g_state += (
-                        np.clip(p_delta_g_star, -Fv_limit, Fv_limit) / T_dv
+                        min(max(p_delta_g_star, -Fv_limit), Fv_limit) / T_dv
                     ) * dt
                     delta_g_cmd = delta_g_state
 
                 elif mode == "special_rv":
                     delta_v_cmd_deg = -2.0
 
-                delta_v_cmd_rad = np.deg2rad(delta_v_cmd_deg)
+                delta_v_cmd_rad = delta_v_cmd_deg * d2r
+                if instrumented:
+                    mark = lap("controller", mark)
 
                 if method == "rk4":  # РК-4
-                    k1, _ = self._equations_of_motion(
-                        y, delta_v_cmd_rad, delta_g_cmd, mode
-                    )
-                    k2, _ = self._equations_of_motion(
-                        y + 0.5 * dt * k1, delta_v_cmd_rad, delta_g_cmd, mode
+                    k1 = f(delta_V, alpha, omega_z, theta, delta_v_cmd_rad, delta_g_cmd)
+                    k2 = f(
+                        delta_V + half_dt * k1[0],
+                        alpha + half_dt * k1[1],
+                        omega_z + half_dt * k1[2],
+                        theta + half_dt * k1[3],
+                        delta_v_cmd_rad,
+                        delta_g_cmd,
                     )
-                    k3, _ = self._equations_of_motion(
-                        y + 0.5 * dt * k2, delta_v_cmd_rad, delta_g_cmd, mode
+                    k3 = f(
+                        delta_V + half_dt * k2[0],
+                        alpha + half_dt * k2[1],
+                        omega_z + half_dt * k2[2],
+                        theta + half_dt * k2[3],
+                        delta_v_cmd_rad,
+                        delta_g_cmd,
                     )
-                    k4, _ = self._equations_of_motion(
-                        y + dt * k3, delta_v_cmd_rad, delta_g_cmd, mode
+                    k4 = f(
+                        delta_V + dt * k3[0],
+                        alpha + dt * k3[1],
+                        omega_z + dt * k3[2],
+                        theta + dt * k3[3],
+                        delta_v_cmd_rad,
+                        delta_g_cmd,
                     )
-                    y += (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+                    y = [
+                        yi + sixth_dt * (a + 2 * b + 2 * c + d)
+                        for yi, a, b, c, d in zip(y, k1, k2, k3, k4)
+                    ]
+                elif method == "exact":  # точна дискретизація лінійної моделі
+                    y = exact_step(*y, delta_v_cmd_rad, delta_g_cmd)
                 else:  # ейлер
-                    derivs, _ = self._equations_of_motion(
-                        y, delta_v_cmd_rad, delta_g_cmd, mode
+                    derivs = f(
+                        delta_V, alpha, omega_z, theta, delta_v_cmd_rad, delta_g_cmd
                     )
-                    y += derivs * dt
+                    y = [yi + d * dt for yi, d in zip(y, derivs)]
+                if instrumented:
+                    mark = lap("integrate", mark)
 
-                if np.isnan(y).any():
+                if not all(map(math.isfinite, y)):
+                    if instrumented:
+                        stats.unstable_steps += 1
                     print(f"Симуляція втратила стабільність при t={t:.2f}c")
+                    finished = True
                     break
+                if instrumented:
+                    lap("check", mark)
+                    stats.step(t + dt, y)
 
-                _, d_alpha_dt_final = self._equations_of_motion(
-                    y, delta_v_cmd_rad, delta_g_cmd, mode
-                )
-                ny = 1 + (self.V0 / self.g) * (y[2] - d_alpha_dt_final)
+                # Події перевіряються на кожному кроці, запис — на сітці виводу
+                if i % every and monitor is None:
+                    continue
+
+                if instrumented:
+                    mark = clock.perf_counter()
+                    stats.ny_evaluations += 1
+                # dα/dt у новій точці — лінійна комбінація, повний виклик не потрібен
+                d_alpha_dt_final = alpha_rate(y[0], y[1], y[2], delta_v_cmd_rad)
+                ny = 1 + ny_gain * (y[2] - d_alpha_dt_final)
+                if instrumented:
+                    mark = lap("ny", mark)
+
+                row = (y[0], y[4], y[1] * r2d, ny, y[2] * r2d, y[3] * r2d, delta_g_cmd)
+                if monitor is not None:
+                    fired = monitor.update(t + dt, row)
+                    if instrumented:
+                        mark = lap("events", mark)
+
+                if not i % every:
+                    record(row)
+                    if instrumented:
+                        lap("record", mark)
+                    # Уся історія віддається після циклу: кроки між останнім
+                    # записаним рядком і кінцем прогону теж інтегруються
+                    if recorder.full and recorder.chunked:
+                        z = [*y, pd_filter_state, delta_g_state]
+                        state.capture(t + dt, i + 1, recorder, z, mode, kernel, monitor)
+                        yield recorder.flush()
 
-                history["V"].append(y[0])
-                history["alpha"].append(np.rad2deg(y[1]))
-                history["H"].append(y[4])
-                history["ny"].append(ny)
+                if fired is not None:
+                    if fired["action"] == "stop":
+                        finished = True
+                        break
+                    mode = fired["mode"]
+                    f, alpha_rate = self._scalar_kernel(mode, *kernel, gust=gust)
+                    if instrumented:
+                        f = stats.counted(f)
+                    if method == "exact":
+                        exact_step = self._scalar_exact(mode, dt)
+                    fired = None
 
             except (OverflowError, ValueError):
+                if instrumented:
+                    stats.unstable_steps += 1
                 print(
                     f"Математична помилка (ймовірно, втрата стабільності) при t={t:.2f}c"
                 )
+                finished = True
                 break
 
-        # Обрізаємо масиви історії до моменту втрати стабільності
-        num_points = len(history["V"])
-        for key in history:
-            history[key] = history[key][:num_points]
+        if i >= state.step:
+            z = [*y, pd_filter_state, delta_g_state]
+            state.capture(t + dt, i + 1, recorder, z, mode, kernel, monitor)
+        state.finished = state.finished or finished
 
-        return history
+    def _augmented_rhs(self, mode, params):
+        """Права частина для адаптивного інтегратора.
 
+        Вектор стану z = [ΔV, α, ωz, θ, ΔH, стан PD-фільтра, δ_г]: внутрішні
+        стани регулятора інтегруються разом зі станами літака, а не окремим
+        кроком Ейлера. Повертає rhs(z, failed) та command(z) — δ_в, рад.
+        """
+        f, _ = self._scalar_kernel(mode)
+        kv, kv_dot, T_dv, Tv_dot, Fv_limit, V_pr_zad, kh, kh_dot = (
+            self._controller_constants(params)
+        )
+        V0, d2r = self.V0, np.pi / 180.0
+        controlled = mode == "controlled"
+        delta_v_const = -2.0 * d2r if mode == "special_rv" else 0.0
 
-class AircraftSimulationApp(tk.Tk):
-    """Головний клас GUI додатку."""
+        def command(z):
+            if not controlled:
+                return delta_v_const
+            delta_V, alpha, _, theta, delta_H = z[:5]
+            H_dot = (V0 + delta_V) * np.sin(theta - alpha)
+            return (kh * delta_H + kh_dot * H_dot) * d2r
 
-    def __init__(self):
-        super().__init__()
-        self.title("Моделювання динаміки польоту літака (РК-4)")
-        self.geometry("1400x900")
-        self.simulator = AircraftSimulator()
-        self._configure_styles()
-        main_frame = ttk.Frame(self, padding=10, style="Main.TFrame")
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        left_panel = ttk.Frame(main_frame, style="Main.TFrame")
-        left_panel.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
-        right_panel = ttk.Frame(main_frame, style="Main.TFrame")
-        right_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self._create_controls(left_panel)
-        self._create_tables_and_plots(right_panel)
-        self._populate_coefficients_tree()
-
-    def _configure_styles(self):
-        BG_COLOR, TEXT_COLOR, FRAME_COLOR, HEADER_BG, ACCENT_COLOR = (
-            "#fdeef4",
-            "#5d4a66",
-            "#ffffff",
-            "#f7f7f7",
-            "#c33c54",
-        )
-        self.style = ttk.Style(self)
-        self.style.theme_use("clam")
-        self.configure(background=BG_COLOR)
-        self.style.configure(
-            ".", background=BG_COLOR, foreground=TEXT_COLOR, font=("Segoe UI", 10)
-        )
-        self.style.configure("Main.TFrame", background=BG_COLOR)
-        self.style.configure("TLabel", background=BG_COLOR, foreground=TEXT_COLOR)
-        self.style.configure("TLabelframe", background=BG_COLOR)
-        self.style.configure(
-            "TLabelframe.Label",
-            background=BG_COLOR,
-            foreground=TEXT_COLOR,
-            font=("Segoe UI", 10, "bold"),
-        )
-        self.style.configure(
-            "TButton", background="#f0f0f0", foreground="black", borderwidth=1
-        )
-        self.style.map("TButton", background=[("active", "#e0e0e0")])
-        self.style.configure(
-            "Accent.TButton", background=ACCENT_COLOR, foreground="white"
-        )
-        self.style.map("Accent.TButton", background=[("active", "#e06c75")])
-        self.style.configure(
-            "Treeview",
-            background=FRAME_COLOR,
-            foreground="black",
-            fieldbackground=FRAME_COLOR,
-            rowheight=25,
-        )
-        self.style.map("Treeview", background=[("selected", ACCENT_COLOR)])
-        self.style.configure(
-            "Treeview.Heading",
-            background=HEADER_BG,
-            foreground="black",
-            font=("Segoe UI", 10, "bold"),
-        )
-        self.style.map("Treeview.Heading", background=[("active", "#f0f0f0")])
-
-    def _create_controls(self, parent):
-        def add_task_frame(parent, text, commands, accent=False):
-            frame = ttk.LabelFrame(parent, text=text, padding=10)
-            frame.pack(fill=tk.X, pady=8)
-            for btn_text, command in commands:
-                style = "Accent.TButton" if accent else "TButton"
-                ttk.Button(frame, text=btn_text, command=command, style=style).pack(
-                    fill=tk.X, padx=5, pady=4
-                )
+        def rhs(z, failed):
+            delta_V, alpha, omega_z, theta, _, pd_filter, delta_g = z.tolist()
+            delta_v_rad = command(z)
+            delta_g_cmd = delta_g if controlled else 0.0
+            derivs = f(delta_V, alpha, omega_z, theta, delta_v_rad, delta_g_cmd)
+            d_pd_filter = d_delta_g = 0.0
+            if controlled:
+                current_error_V = 0.0 if failed else delta_V - V_pr_zad
+                d_pd_filter = (1 / Tv_dot) * (kv_dot * derivs[0] - pd_filter)
+                p_delta_g_star = -(kv * current_error_V + pd_filter)
+                d_delta_g = min(max(p_delta_g_star, -Fv_limit), Fv_limit) / T_dv
+            return np.array([*derivs, d_pd_filter, d_delta_g])
 
-        add_task_frame(
-            parent,
-            "2.5/2.6: 'Вільний' політ",
-            [
-                ("Запуск (Ейлер, dt=0.01с)", self.run_task_2_5),
-                ("Запуск (РК-4, dt=0.01с)", self.run_task_2_6),
-            ],
-        )
-        add_task_frame(
-            parent,
-            "2.8.1: Вплив кроку інтеграції",
-            [
-                (f"Запуск (dt={dt}с)", lambda dt=dt: self.run_task_2_8_1(dt))
-                for dt in [0.01, 0.001, 0.5]
-            ],
-        )
-        f282 = ttk.LabelFrame(parent, text="2.8.2: Вплив коефіцієнта k_v", padding=10)
-        f282.pack(fill=tk.X, pady=8)
-        self.gain_vars = {
-            "Зменшене": tk.DoubleVar(value=0.5),
-            "Номінальне": tk.DoubleVar(value=1.0),
-            "Збільшене": tk.DoubleVar(value=2.0),
-        }
-        for name, var in self.gain_vars.items():
-            frame = ttk.Frame(f282, style="Main.TFrame")
-            frame.pack(fill=tk.X, padx=5, pady=3)
-            ttk.Label(frame, text=f"{name}:").pack(side=tk.LEFT)
-            ttk.Entry(frame, textvariable=var, width=5).pack(side=tk.LEFT, padx=5)
-        ttk.Button(
-            f282,
-            text="Запустити порівняння",
-            command=self.run_task_2_8_2,
-            style="Accent.TButton",
-        ).pack(fill=tk.X, padx=5, pady=5)
-        add_task_frame(
-            parent,
-            "2.8.3: Відмова датчика",
-            [("Відмова датчика швидкості (20с)", self.run_task_2_8_3)],
-        )
-        add_task_frame(
-            parent,
-            "Спец. завдання: Реакція на РВ",
-            [("Реакція на відхилення РВ = -2°", self.run_task_2_9)],
-        )
+        return rhs, command
 
-    def _create_tables_and_plots(self, parent):
-        plot_frame = ttk.Frame(parent, style="Main.TFrame")
-        plot_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        tables_container = ttk.Frame(parent, style="Main.TFrame")
-        tables_container.pack(fill=tk.BOTH, expand=True)
-        self.figure = Figure(dpi=100, facecolor="#fdeef4")
-        self.figure.ax = self.figure.add_subplot(111)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=plot_frame)
-        self.toolbar = NavigationToolbar2Tk(self.canvas, plot_frame)
-        self.toolbar.update()
-        self.toolbar.configure(background="#fdeef4")
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        coeffs_frame = ttk.LabelFrame(
-            tables_container, text="Розраховані коефіцієнти", padding=10
-        )
-        coeffs_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        self.coeffs_tree = ttk.Treeview(
-            coeffs_frame, columns=("Parameter", "Value"), show="headings", height=10
-        )
-        self.coeffs_tree.heading("Parameter", text="Параметр")
-        self.coeffs_tree.heading("Value", text="Значення")
-        self.coeffs_tree.column("Parameter", width=120, anchor="w")
-        self.coeffs_tree.column("Value", width=140, anchor="e")
-        self.coeffs_tree.pack(fill="both", expand=True)
-        dynamic_results_frame = ttk.LabelFrame(
-            tables_container, text="Результати симуляції (крок 0.1 с)", padding=10
-        )
-        dynamic_results_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        self.dynamic_results_tree = ttk.Treeview(
-            dynamic_results_frame,
-            columns=("Time", "Delta_V", "Delta_H", "Alpha", "ny"),
-            show="headings",
-            height=10,
-        )
-        self.dynamic_results_tree.heading("Time", text="Час, с")
-        self.dynamic_results_tree.heading("Delta_V", text="ΔV, м/с")
-        self.dynamic_results_tree.heading("Delta_H", text="ΔH, м")
-        self.dynamic_results_tree.heading("Alpha", text="α, град")
-        self.dynamic_results_tree.heading("ny", text="ny")
-        for col in self.dynamic_results_tree["columns"]:
-            self.dynamic_results_tree.column(col, width=100, anchor="e")
-        self.dynamic_results_tree.pack(fill="both", expand=True)
-
-    def _populate_coefficients_tree(self):
-        for i in self.coeffs_tree.get_children():
-            self.coeffs_tree.delete(i)
-        for name, value in self.simulator.c.items():
-            self.coeffs_tree.insert("", "end", values=(f"c{name}", f"{value:.6f}"))
-        for name, value in self.simulator.e.items():
-            self.coeffs_tree.insert("", "end", values=(f"e{name}", f"{value:.6f}"))
-        self.coeffs_tree.insert(
-            "",
-            "end",
-            values=("δ_v_bal", f"{np.rad2deg(self.simulator.delta_v_bal_rad):.4f}"),
-        )
+    def _iter_rk45(self, params, time, recorder, stats, monitor, state):
+        """Адаптивний метод Дормана–Прінса 5(4) з контролем похибки.
+
+        Крок обирається за rtol/atol, а V, H, α та ny на сітці виводу
+        отримуються щільним виводом 4-го порядку. Як і у методах зі сталим
+        кроком, рядок i історії відповідає стану в момент t[i] + dt.
+        Моменти подій уточнюються на тому ж щільному виводі, а крок, у
+        якому спрацювала stop/switch, обрізається точно в момент події.
+        """
+        dt, mode = params.get("dt", 0.01), state.mode
+        rtol, atol = params.get("rtol", 1e-6), params.get("atol", 1e-8)
+        max_step = params.get("max_step", np.inf)
+        rhs, command = self._augmented_rhs(mode, params)
+        _, alpha_rate = self._scalar_kernel(mode)
+        ny_gain = self.V0 / self.g
+        instrumented = stats is not None
+        if instrumented:
+            rhs, lap = stats.counted(rhs), stats.lap
+
+        out_t = recorder.t + dt
+        z = np.array(state.z, dtype=float)
+
+        # Відмова датчика — розрив правої частини, тож інтегруємо по сегментах
+        t0 = state.t
+        t_final = time[-1] + dt if len(time) else 0.0
+        failure_time = params.get("failure_time", 20.0)
+        segments = [(t0, t_final, False)]
+        controlled = mode == "controlled" or monitor is not None
+        if controlled and params.get("failure", False):
+            if failure_time <= t0:
+                segments = [(t0, t_final, True)]
+            elif failure_time < t_final:
+                segments = [(t0, failure_time, False), (failure_time, t_final, True)]
 
-    def _update_dynamic_results_table(self, history, interval=0.1):
-        for i in self.dynamic_results_tree.get_children():
-            self.dynamic_results_tree.delete(i)
-        t = history.get("t", [])
-        if not t.size:
-            return
-        dt = t[1] - t[0] if len(t) > 1 else 1.0
-        step = max(1, int(interval / dt))
-        for i in range(0, len(t), step):
-            self.dynamic_results_tree.insert(
-                "",
-                "end",
-                values=(
-                    f"{t[i]:.1f}",
-                    f"{history['V'][i]:.4f}",
-                    f"{history['H'][i]:.4f}",
-                    f"{history['alpha'][i]:.4f}",
-                    f"{history['ny'][i]:.4f}",
-                ),
+        def error_norm(err, z_old, z_new):
+            scale = atol + rtol * np.maximum(np.abs(z_old), np.abs(z_new))
+            return np.sqrt(np.mean((err / scale) ** 2))
+
+        def channels(Z):
+            """Канали історії (у порядку CHANNELS) для станів-стовпців Z."""
+            delta_V, alpha, omega_z = Z[0], Z[1], Z[2]
+            d_alpha = alpha_rate(delta_V, alpha, omega_z, command(Z))
+            return (
+                delta_V,
+                Z[4],
+                np.rad2deg(alpha),
+                1 + ny_gain * (omega_z - d_alpha),
+                np.rad2deg(omega_z),
+                np.rad2deg(Z[3]),
+                Z[6],
             )
 
-    def _setup_light_ax(self, ax):
-        TEXT_COLOR = "#5d4a66"
-        ax.set_facecolor("white")
-        ax.grid(True, linestyle=":", color="gray", alpha=0.6)
-        ax.tick_params(axis="x", colors="black")
-        ax.tick_params(axis="y", colors="black")
-        for spine in ax.spines.values():
-            spine.set_color("gray")
-        ax.title.set_color(TEXT_COLOR)
-        ax.xaxis.label.set_color(TEXT_COLOR)
-        ax.yaxis.label.set_color(TEXT_COLOR)
-        if ax.get_legend():
-            legend = ax.get_legend()
-            legend.get_frame().set_facecolor("#f7f7f7")
-            for text in legend.get_texts():
-                text.set_color("black")
-
-    def _plot_free_flight(self, history, title):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.plot(history["t"], history["alpha"], label="Кут атаки α", color="#9b59b6")
-        ax.set_title(title)
-        ax.set_xlabel("Час, с")
-        ax.set_ylabel("Кут атаки α, град")
-        ax.legend()
-        self._setup_light_ax(ax)
-        self.figure.tight_layout()
-        self.canvas.draw()
-
-    def _plot_ny_response(self, history, title):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.plot(
-            history["t"],
-            history["ny"],
-            label="Перевантаження ny",
-            color="#2ecc71",
-            linewidth=2,
-        )
-        final_ny = history["ny"][-1]
-        ax.axhline(
-            y=final_ny,
-            color="r",
-            linestyle="--",
-            label=f"Стабілізація ≈ {final_ny:.3f}",
-        )
-        ax.set_title(title)
-        ax.set_xlabel("Час, с")
-        ax.set_ylabel("ny")
-        ax.legend(loc="lower right")
-        self._setup_light_ax(ax)
-        self.figure.tight_layout()
-        self.canvas.draw()
-
-    def _plot_controlled_flight(self, results, title, labels):
-        self.figure.clear()
-        gs = self.figure.add_gridspec(2, 1, hspace=0.35)
-        ax1 = self.figure.add_subplot(gs[0, 0])
-        ax2 = self.figure.add_subplot(gs[1, 0])
-        colors = ["#9b59b6", "#2ecc71", "#3498db", "#e74c3c"]
-        for i, res in enumerate(results):
-            ax1.plot(res["t"], res["H"], label=labels[i], color=colors[i % len(colors)])
-            ax2.plot(res["t"], res["V"], label=labels[i], color=colors[i % len(colors)])
-        ax1.axhline(y=0, color="r", linestyle="--", label="H_зад = 0 м")
-        ax1.set_title("Керування висотою")
-        ax1.set_ylabel("Відхилення висоти ΔH, м")
-        ax1.legend()
-        self._setup_light_ax(ax1)
-        V_zad = 10.0
-        ax2.axhline(
-            y=V_zad, color="r", linestyle="--", label=f"V_зад = {V_zad:.1f} м/с"
-        )
-        ax2.set_title("Керування швидкістю")
-        ax2.set_xlabel("Час, с")
-        ax2.set_ylabel("Відхилення швидкості ΔV, м/с")
-        ax2.legend()
-        self._setup_light_ax(ax2)
-        self.figure.suptitle(title, fontsize=14, color="#5d4a66", weight="bold")
-        self.figure.tight_layout(rect=[0, 0.03, 1, 0.95])
-        self.canvas.draw()
-
-    def run_task_2_5(self):
-        params = {"mode": "free_flight", "method": "euler", "T_end": 15}
-        history = self.simulator.run_simulation(params)
-        self._plot_free_flight(history, "п. 2.5: 'Вільний' літак (Ейлер, dt=0.01с)")
-        self._update_dynamic_results_table(history)
-
-    def run_task_2_6(self):
-        params = {"mode": "free_flight", "method": "rk4", "T_end": 15}
-        history = self.simulator.run_simulation(params)
-        self._plot_free_flight(
-            history, "п. 2.6: 'Вільний' літак (Рунге-Кутта 4, dt=0.01с)"
-        )
-        self._update_dynamic_results_table(history)
-
-    def run_task_2_8_1(self, dt):
-        params = {
-            "mode": "controlled",
-            "y0": [0, 0, 0, 0, 0],
-            "dt": dt,
-            "method": "rk4",
-        }
-        history = self.simulator.run_simulation(params)
-        self._plot_controlled_flight(
-            [history], f"п. 2.8.1: Вплив кроку інтеграції (dt={dt}c)", [""]
-        )
-        self._update_dynamic_results_table(history)
-
-    def run_task_2_8_2(self):
-        results, labels = [], []
-        base_params = {"mode": "controlled", "y0": [0, 0, 0, 0, 0], "method": "rk4"}
-        for name, var in self.gain_vars.items():
-            params = {**base_params, "gain_factor": var.get()}
-            results.append(self.simulator.run_simulation(params))
-            labels.append(f"{name} (k_v_factor={var.get()})")
-        self._plot_controlled_flight(
-            results, "п. 2.8.2: Вплив коефіцієнтів керування k_v", labels
+        if monitor is not None and monitor.t is None:
+            monitor.start(t0, [float(v[0]) for v in channels(z[:, None])])
+
+        t, h, finished = t0, state.h, False
+        try:
+            for t, t_end, failed in segments:
+                k_first = rhs(z, failed)
+                if h is None:
+                    h = self._initial_step(rhs, z, k_first, failed, rtol, atol)
+                while t < t_end:
+                    if instrumented:
+                        mark = clock.perf_counter()
+                    h = min(h, max_step, t_end - t)
+                    last = h == t_end - t
+                    if h < 1e-12 * max(1.0, abs(t)):
+                        if instrumented:
+                            stats.unstable_steps += 1
+                        print(f"Симуляція втратила стабільність при t={t:.2f}c")
+                        finished = True
+                        return
+
+                    with np.errstate(over="ignore", invalid="ignore"):
+                        K = np.empty((7, 7))
+                        K[0] = k_first
+                        for s in range(1, 6):
+                            dz = np.dot(_DP_A[s], K[:s]) * h
+                            K[s] = rhs(z + dz, failed)
+                        z_new = z + h * (_DP_B @ K[:6])
+                        K[6] = rhs(z_new, failed)
+                        err = error_norm(h * (_DP_E @ K), z, z_new)
+                    if instrumented:
+                        mark = lap("integrate", mark)
+
+                    if not np.isfinite(err):
+                        if instrumented:
+                            stats.unstable_steps += 1
+                        print(f"Симуляція втратила стабільність при t={t:.2f}c")
+                        finished = True
+                        return
+                    if err > 1.0:
+                        if instrumented:
+                            stats.rejected_steps += 1
+                        h *= max(0.2, 0.9 * err**-0.2)
+                        continue
+                    if instrumented:
+                        lap("check", mark)
+                        stats.step(t + h, z_new[:5].tolist())
+                        mark = clock.perf_counter()
+
+                    # Останній крок сегмента закінчується точно в t_end
+                    t_new = t_end if last else t + h
+                    Q = K.T @ _DP_P
+
+                    def dense(s):
+                        x = (np.atleast_1d(s) - t) / h
+                        return z[:, None] + h * (Q @ np.vstack([x, x**2, x**3, x**4]))
+
+                    fired = None
+                    if monitor is not None:
+
+                        def sample(s):
+                            return [float(v[0]) for v in channels(dense(s))]
+
+                        values = sample(t_new)
+                        if monitor.terminal:
+                            t_stop = monitor.next_stop(t_new, values, sample)
+                            if t_stop is not None and t_stop < t_new:
+                                t_new, z_new = t_stop, dense(t_stop)[:, 0]
+                                values = sample(t_new)
+                        fired = monitor.update(t_new, values, sample)
+                        if instrumented:
+                            mark = lap("events", mark)
+
+                    # Щільний вивід у всіх точках сітки на [t, t_new]
+                    start = recorder.recorded
+                    stop = np.searchsorted(out_t, t_new, side="right")
+                    if t_new >= t_end:
+                        stop = max(stop, np.searchsorted(out_t, t_end, side="right"))
+                    if stop > start:
+                        rows = channels(dense(out_t[start:stop]))
+                        if instrumented:
+                            stats.ny_evaluations += stop - start
+                        while len(rows[0]):
+                            written = recorder.extend(rows)
+                            rows = [row[written:] for row in rows]
+                            if recorder.full and recorder.chunked:
+                                if instrumented:
+                                    mark = lap("record", mark)
+                                step = int(t / dt + 1e-9)
+                                state.capture(
+                                    t, step, recorder, z.tolist(), mode, (), monitor, h
+                                )
+                                yield recorder.flush()
+                                if instrumented:
+                                    mark = clock.perf_counter()
+                    if instrumented:
+                        lap("record", mark)
+
+                    if fired is not None:
+                        if fired["action"] == "stop":
+                            t, z, finished = t_new, z_new, True
+                            return
+                        mode = fired["mode"]
+                        rhs, command = self._augmented_rhs(mode, params)
+                        _, alpha_rate = self._scalar_kernel(mode)
+                        if instrumented:
+                            rhs = stats.counted(rhs)
+                        K[6] = rhs(z_new, failed)
+                    elif t_new < t + h:
+                        K[6] = rhs(z_new, failed)
+
+                    t, z, k_first = t_new, z_new, K[6]
+                    factor = 10.0 if err == 0 else min(10.0, 0.9 * err**-0.2)
+                    h *= factor
+        except (OverflowError, ValueError):
+            if instrumented:
+                stats.unstable_steps += 1
+            print(f"Математична помилка (ймовірно, втрата стабільності) при t={t:.2f}c")
+            finished = True
+        finally:
+            # Також при закритті генератора — знімок лишається узгодженим
+            step = len(time) if t >= t_final else int(t / dt + 1e-9)
+            state.capture(t, step, recorder, z.tolist(), mode, (), monitor, h)
+            state.finished = state.finished or finished
+
+    @staticmethod
+    def _initial_step(rhs, z0, f0, failed, rtol, atol):
+        """Початковий крок за алгоритмом Хайрера–Ваннера."""
+        scale = atol + rtol * np.abs(z0)
+        d0 = np.sqrt(np.mean((z0 / scale) ** 2))
+        d1 = np.sqrt(np.mean((f0 / scale) ** 2))
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        f1 = rhs(z0 + h0 * f0, failed)
+        d2 = np.sqrt(np.mean(((f1 - f0) / scale) ** 2)) / h0
+        if max(d1, d2) <= 1e-15:
+            h1 = max(1e-6, h0 * 1e-3)
+        else:
+            h1 = (0.01 / max(d1, d2)) ** 0.2
+        return min(100 * h0, h1)
+
+    def run_batch(self, params_list):
+        """Ансамблева симуляція: N сценаріїв інтегруються одночасно.
+
+        Сценарії з однаковими dt, method, T_end, проріджуванням запису та
+        набором каналів об'єднуються в одну матрицю станів (N, 5), тож
+        вартість групи — один цикл Python замість N.
+        Повертає список історій у порядку params_list. Події (params["events"])
+        ансамбль не підтримує — для них потрібен run_simulation. Сценарії з
+        однаковою params["turbulence"] мають спільний ряд збурень.
+        """
+        if any(params.get("events") for params in params_list):
+            raise ValueError("events підтримуються лише в run_simulation")
+        if any(
+            params.get("turbulence") and params.get("method", "rk4") == "exact"
+            for params in params_list
+        ):
+            raise ValueError("turbulence підтримується лише для euler та rk4")
+        groups = {}
+        for idx, params in enumerate(params_list):
+            dt = params.get("dt", 0.01)
+            key = (
+                dt,
+                params.get("method", "rk4"),
+                params.get("T_end", 100.0),
+                # Рекордер групи спільний: запис і канали мають збігатися
+                HistoryRecorder.decimation(dt, params),
+                tuple(params.get("channels", HistoryRecorder.DEFAULT_CHANNELS)),
+            )
+            groups.setdefault(key, []).append(idx)
+
+        results = [None] * len(params_list)
+        for (dt, method, T_end, *_), indices in groups.items():
+            histories = self._run_batch_group(
+                [params_list[i] for i in indices], dt, method, T_end, indices
+            )
+            for i, history in zip(indices, histories):
+                results[i] = history
+        return results
+
+    def _run_batch_group(self, params_list, dt, method, T_end, indices):
+        n = len(params_list)
+        modes = np.array([p.get("mode", "free_flight") for p in params_list])
+        controlled = modes == "controlled"
+        special = modes == "special_rv"
+        Y = np.array(
+            [p.get("y0", [0.0, np.deg2rad(1.0), 0.0, 0.0, 0.0]) for p in params_list],
+            dtype=float,
+        ).reshape(n, 5)
+
+        kv, kv_dot, T_dv, Tv_dot, Fv_limit, V_pr_zad, kh, kh_dot = (
+            np.array(col, dtype=float)
+            for col in zip(*(self._controller_constants(p) for p in params_list))
         )
-        self._update_dynamic_results_table(results[-1])
-
-    def run_task_2_8_3(self):
-        params = {
-            "mode": "controlled",
-            "y0": [0, 0, 0, 0, 0],
-            "failure": True,
-            "failure_time": 20,
-            "method": "rk4",
-        }
-        history = self.simulator.run_simulation(params)
-        self._plot_controlled_flight(
-            [history],
-            "п. 2.8.3: Імітація відмови датчика швидкості (на 20 с)",
-            ["Відмова"],
+        failure = np.array([bool(p.get("failure", False)) for p in params_list])
+        failure_time = np.array(
+            [p.get("failure_time", 20.0) for p in params_list], dtype=float
         )
-        for ax in self.figure.get_axes():
-            ax.axvline(
-                x=20.0,
-                color="magenta",
-                linestyle="-.",
-                linewidth=2,
-                label="Момент відмови",
-            )
-            ax.legend()
-        self.canvas.draw()
-        self._update_dynamic_results_table(history)
-
-    def run_task_2_9(self):
-        params = {
-            "mode": "special_rv",
-            "y0": [0, 0, 0, 0, 0],
-            "method": "rk4",
-            "T_end": 15,
-        }
-        history = self.simulator.run_simulation(params)
-        self._plot_ny_response(history, "Реакція на відхилення РВ = -2°")
-        self._update_dynamic_results_table(history)
+
+        pd_filter_state, delta_g_state = np.zeros(n), np.zeros(n)
+        delta_v_cmd_deg = np.where(special, -2.0, 0.0)
+
+        if method == "exact":
+            # Φ та Γ для кожного сценарію відповідно до його режиму; якщо
+            # матриці в усіх однакові — один матричний добуток на крок
+            shared = len({mode != "special_rv" for mode in modes.tolist()}) == 1
+            if shared:
+                Phi, Gamma = (m.T for m in self._transition_matrices(modes[0], dt))
+            else:
+                Phi, Gamma = (
+                    np.stack(mats)
+                    for mats in zip(
+                        *(self._transition_matrices(mode, dt) for mode in modes)
+                    )
+                )
+
+        time = np.arange(0, T_end, dt)
+        recorder = HistoryRecorder(time, dt, params_list[0], rows=n)
+        lengths = np.full(n, len(time))
+        alive = np.ones(n, dtype=bool)
+
+        # Рядки з однаковою специфікацією турбулентності ділять один ряд
+        fields, gust, gust_alpha, gust_V = {}, None, 0.0, 0.0
+        for k, params in enumerate(params_list):
+            if params.get("turbulence"):
+                field = shared_turbulence(params["turbulence"], self.V0, dt)
+                fields.setdefault(id(field), (field, []))[1].append(k)
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            for i, t in enumerate(time):
+                if fields:
+                    if i % CHUNK_STEPS == 0:
+                        stop = min(i + CHUNK_STEPS, len(time))
+                        gusts = np.zeros((stop - i, 2, n))
+                        for field, rows in fields.values():
+                            alpha_g, V_g = field.series(i, stop)
+                            gusts[:, 0, rows] = alpha_g[:, None]
+                            gusts[:, 1, rows] = V_g[:, None]
+                    gust = gust_alpha, gust_V = gusts[i % CHUNK_STEPS]
+                delta_g_cmd = np.zeros(n)
+                if controlled.any():
+                    delta_V, alpha_rad, _, theta_rad, delta_H = Y.T
+                    H_dot = (self.V0 + delta_V) * np.sin(theta_rad - alpha_rad)
+                    delta_v_cmd_deg = np.where(
+                        controlled, kh * delta_H + kh_dot * H_dot, delta_v_cmd_deg
+                    )
+
+                    is_failure = failure & (t >= failure_time)
+                    error_V = delta_V - V_pr_zad
+                    current_error_V = np.where(is_failure, 0.0, error_V)
+
+                    d_error_V_dt = (
+                        -self.e[1] * (delta_V + gust_V)
+                        - self.c[8] * np.rad2deg(alpha_rad + gust_alpha)
+                        - self.c[7] * np.rad2deg(theta_rad)
+                        - self.c[19] * delta_g_state
+                    )
+                    pd_filter_state_dot = (1 / Tv_dot) * (
+                        kv_dot * d_error_V_dt - pd_filter_state
+                    )
+                    pd_filter_state = np.where(
+                        controlled,
+                        pd_filter_state + pd_filter_state_dot * dt,
+                        pd_filter_state,
+                    )
+                    p_delta_g_star = -(kv * current_error_V + pd_filter_state)
+                    delta_g_state = np.where(
+                        controlled,
+                        delta_g_state
+                        + (np.clip(p_delta_g_star, -Fv_limit, Fv_limit) / T_dv) * dt,
+                        delta_g_state,
+                    )
+                    delta_g_cmd = np.where(controlled, delta_g_state, 0.0)
+
+                delta_v_cmd_rad = np.deg2rad(delta_v_cmd_deg)
+                args = (delta_v_cmd_rad, delta_g_cmd, special, gust)
+
+                if method == "rk4":  # РК-4
+                    k1, _ = self._equations_of_motion_batch(Y, *args)
+                    k2, _ = self._equations_of_motion_batch(Y + 0.5 * dt * k1, *args)
+                    k3, _ = self._equations_of_motion_batch(Y + 0.5 * dt * k2, *args)
+                    k4, _ = self._equations_of_motion_batch(Y + dt * k3, *args)
+                    Y += (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+                elif method == "exact":  # точна дискретизація лінійної моделі
+                    residual = self._altitude_residual(Y.T)
+                    U = np.stack([delta_v_cmd_rad, delta_g_cmd], axis=1)
+                    if shared:
+                        Y = Y @ Phi + U @ Gamma
+                    else:
+                        Y = np.einsum("nij,nj->ni", Phi, Y) + np.einsum(
+                            "nij,nj->ni", Gamma, U
+                        )
+                    Y[:, 4] += 0.5 * dt * (residual + self._altitude_residual(Y.T))
+                else:  # ейлер
+                    derivs, _ = self._equations_of_motion_batch(Y, *args)
+                    Y += derivs * dt
+
+                # Сценарії, що втратили стабільність, далі не записуються
+                lost = alive & ~np.isfinite(Y).all(axis=1)
+                if lost.any():
+                    for k in np.flatnonzero(lost):
+                        print(
+                            f"Сценарій {indices[k]}: симуляція втратила стабільність "
+                            f"при t={t:.2f}c"
+                        )
+                    lengths[lost] = i
+                    alive &= ~lost
+                    if not alive.any():
+                        break
+
+                if i % recorder.every:
+                    continue
+
+                _, d_alpha_dt_final = self._equations_of_motion_batch(Y, *args)
+                ny = 1 + (self.V0 / self.g) * (Y[:, 2] - d_alpha_dt_final)
+
+                recorder.record(
+                    (
+                        Y[:, 0],
+                        Y[:, 4],
+                        np.rad2deg(Y[:, 1]),
+                        ny,
+                        np.rad2deg(Y[:, 2]),
+                        np.rad2deg(Y[:, 3]),
+                        delta_g_cmd,
+                    )
+                )
+
+        return [recorder.history(recorder.count(lengths[k]), row=k) for k in range(n)]
+
+
+def _run_simulation_job(
+    simulator, params, job_id, progress, cancel, chunk_steps=2000, stream=False
+):
+    """Виконує один прогін у процесі пулу, повідомляючи прогрес після блоків.
+
+    У progress надходять кортежі (job_id, частка, блок): блок історії — лише
+    при stream=True (для живого графіка), інакше None. Повертає історію або
+    None, якщо прогін скасовано подією cancel.
+    """
+    dt, T_end = params.get("dt", 0.01), params.get("T_end", 100.0)
+    chunks = []
+    for chunk in simulator.iter_simulation(params, chunk_steps=chunk_steps):
+        if cancel.is_set():
+            return None
+        chunks.append(chunk)
+        if len(chunk["t"]):
+            fraction = min(1.0, (chunk["t"][-1] + dt) / T_end)
+            progress.put((job_id, fraction, chunk if stream else None))
+    progress.put((job_id, 1.0, None))
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from cli import main as cli_main
+
+        return cli_main(argv)
+    # GUI та matplotlib імпортуються лише при запуску інтерфейсу
+    from gui import main as gui_main
+
+    return gui_main([])
 
 
 if __name__ == "__main__":
-    app = AircraftSimulationApp()
-    app.mainloop()
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Чутливості траєкторії до параметрів літака й автопілота за один прогін.
+
+Рівняння чутливостей ∂z/∂p інтегруються разом зі станами методом
+комплексного кроку: кожен параметр p_k — окремий рядок ансамблю, у якому
+p_k дістає уявний приріст i·h, а c, e перераховуються з їхніх визначень у
+AircraftSimulator._calculate_coefficients (через update_parameters з
+комплексним значенням). Усі рядки просуваються тією самою схемою, що й
+run_simulation (euler або rk4, регулятор — кроком Ейлера), тож
+Im(z_k) / h — точна похідна дискретної траєкторії (без похибки
+скінченних різниць), а Re(z_k) — сама траєкторія. Лінійна частина кроку
+зведена до матриць (_step_matrices), тому прогін ансамблю з P рядків
+коштує приблизно як п'ять звичайних прогонів незалежно від P — замість
+2·P прогонів центральних різниць.
+
+Параметри — атрибути літака (Cya, m_z_alpha, m_z_dv, m_z_wz, V0, G, ...)
+та ключі AircraftSimulator.CONTROLLER_DEFAULTS разом із gain_factor.
+Запуск: python sensitivity.py — таблиця чутливостей для автопілота.
+"""
+
+import cmath
+import copy
+import sys
+
+import numpy as np
+
+from rgr import AircraftSimulator, HistoryRecorder
+
+PARAMETERS = ("Cya", "m_z_alpha", "m_z_dv", "kv", "kv_dot", "kh", "kh_dot")
+CONTROLLER = (*AircraftSimulator.CONTROLLER_DEFAULTS, "gain_factor")
+# Комплексний крок: похибка O(h²) і жодного віднімання близьких чисел
+STEP = 1e-30
+
+
+def _row(simulator, params, name):
+    """Коефіцієнти ядра та регулятора для рядка з комплексним приростом name."""
+    if name in CONTROLLER:
+        default = AircraftSimulator.CONTROLLER_DEFAULTS.get(name, 1.0)
+        value = params.get(name, default) + 1j * STEP
+        probe = simulator
+        constants = simulator._controller_constants({**params, name: value})
+    else:
+        if not isinstance(getattr(simulator, name, None), float | int):
+            raise ValueError(f"Невідомий параметр: {name}")
+        probe = copy.copy(simulator)
+        probe.c, probe.e = {}, {}  # c, e спільні з simulator — не змінювати їх
+        probe.update_parameters(**{name: getattr(simulator, name) + 1j * STEP})
+        constants = simulator._controller_constants(params)
+
+    c, e, d2r, r2d = probe.c, probe.e, np.pi / 180.0, 180.0 / np.pi
+    # Ті самі згорнуті множники, що в AircraftSimulator._scalar_kernel
+    kernel = (
+        c[4],
+        e[2] * d2r,
+        c[9],
+        -e[1],
+        -c[8] * r2d,
+        -c[7] * r2d,
+        -c[19],
+        -c[1],
+        -(c[2] + c[17]),
+        -c[5],
+        -e[3] * d2r,
+        -(c[3] + c[18]),
+        probe.V0,
+        probe.V0 / probe.g,
+    )
+    return kernel + tuple(constants)
+
+
+def _step_matrices(columns, special, method, dt):
+    """Крок euler/rk4 для ξ = [ΔV, α, ωz, θ, δ_в, δ_г] як матриці рядків.
+
+    За сталих команд ξ̇ = E ξ лінійне (ΔH у праву частину не входить), тож
+    крок схеми й усі її проміжні стадії — матриці, обчислені один раз.
+    Повертає (W, weights): рядки W дають новий [ΔV, α, ωz, θ], ΔV стадій,
+    θ - α стадій та похідну помилки швидкості для регулятора на наступному
+    кроці; ΔH += Σ weights · (V0 + ΔV_s) · sin(θ_s - α_s).
+    """
+    g_alpha, g_V, g_dv, v_V, v_alpha, v_theta, v_dg = columns[:7]
+    w_wz, w_alpha, w_dalpha, w_V, w_dv = columns[7:12]
+    zero, one = np.zeros_like(g_alpha), np.ones_like(g_alpha)
+    d_error_V = (v_V, v_alpha, zero, v_theta, zero, v_dg)
+    d_V = (zero,) * 6 if special else d_error_V
+    d_alpha = (-g_V, -g_alpha, one, zero, -g_dv, zero)
+    d_omega_z = tuple(w + w_dalpha * d for w, d in zip((w_V, w_alpha, w_wz), d_alpha))
+    d_omega_z += (zero, w_dv + w_dalpha * -g_dv, zero)
+    d_theta = (zero, zero, one, zero, zero, zero)
+    E = np.zeros((len(zero), 6, 6), dtype=complex)
+    E[:, :4] = np.moveaxis(np.array([d_V, d_alpha, d_omega_z, d_theta]), -1, 0)
+
+    identity = np.eye(6)
+    if method == "rk4":
+        nodes, weights = (0.5, 0.5, 1.0), np.array([1.0, 2.0, 2.0, 1.0]) * dt / 6.0
+    else:
+        nodes, weights = (), np.array([dt])
+    stages = [np.broadcast_to(identity, E.shape)]
+    for node in nodes:
+        stages.append(identity + node * dt * E @ stages[-1])
+    step = identity + sum(w * E @ S for w, S in zip(weights, stages))
+    W = np.concatenate(
+        [
+            step[:, :4],
+            np.stack([S[:, 0] for S in stages], axis=1),
+            np.stack([S[:, 3] - S[:, 1] for S in stages], axis=1),
+            np.einsum("ik,kij->kj", np.array(d_error_V), step)[:, None],
+        ],
+        axis=1,
+    )
+    return W, weights
+
+
+def sensitivities(simulator=None, params=None, parameters=PARAMETERS):
+    """Історія прогону та її похідні за parameters.
+
+    Повертає (history, sensitivities): history — словник масивів, як у
+    run_simulation (для euler/rk4 — ті самі значення з точністю до
+    округлення); sensitivities — {параметр: {канал: ∂канал/∂параметр}} в
+    одиницях каналів (кути — градуси). Канали та проріджування — з
+    params, як у run_simulation. Події, coefficient_schedule та
+    turbulence не підтримуються.
+    """
+    simulator = simulator or AircraftSimulator()
+    params = params or {}
+    parameters = tuple(parameters)
+    dt, method = params.get("dt", 0.01), params.get("method", "rk4")
+    if method not in ("euler", "rk4"):
+        raise ValueError("Чутливості підтримуються лише для euler та rk4")
+    if params.get("events") or "coefficient_schedule" in params:
+        raise ValueError("events та coefficient_schedule не підтримуються")
+    if params.get("turbulence"):
+        raise ValueError("turbulence не підтримується")
+    if not parameters or len(set(parameters)) != len(parameters):
+        raise ValueError("parameters — непорожній список різних назв")
+
+    mode = params.get("mode", "free_flight")
+    columns = np.array([_row(simulator, params, name) for name in parameters]).T
+    W, weights = _step_matrices(columns, mode == "special_rv", method, dt)
+    stages = len(weights)
+    g_alpha, g_V, g_dv, v_V, v_alpha, v_theta = columns[:6]
+    V0, ny_gain = columns[12:14]
+    kv, kv_dot, T_dv, Tv_dot, Fv_limit, V_pr_zad, kh, kh_dot = columns[14:]
+    Fv_real = Fv_limit[0].real
+    filter_gain, filter_decay, thrust_rate = (
+        kv_dot * dt / Tv_dot,
+        dt / Tv_dot,
+        dt / T_dv,
+    )
+
+    failure = params.get("failure", False)
+    failure_time = params.get("failure_time", 20.0)
+    d2r, r2d = np.pi / 180.0, 180.0 / np.pi
+
+    n = len(parameters)
+    y0 = params.get("y0", [0.0, np.deg2rad(1.0), 0.0, 0.0, 0.0])
+    xi = np.zeros((6, n), dtype=complex)  # [ΔV, α, ωz, θ, δ_в, δ_г]
+    xi[:4] = np.array(y0[:4], dtype=float)[:, None]
+    delta_H = np.full(n, float(y0[4]), dtype=complex)
+    pd_filter_state = np.zeros(n, dtype=complex)
+    delta_g_state = np.zeros(n, dtype=complex)
+    d_error_V_dt = v_V * xi[0] + v_alpha * xi[1] + v_theta * xi[3]
+    if mode == "special_rv":
+        xi[4] = -2.0 * d2r
+
+    time = np.arange(0, params.get("T_end", 100.0), dt)
+    # Рекордер перевіряє канали та задає сітку виводу; рядки — комплексні
+    recorder = HistoryRecorder(time, dt, params)
+    every, channels = recorder.every, recorder.channels
+    slots = [HistoryRecorder.CHANNELS.index(name) for name in channels]
+    records = np.empty((len(channels), n, len(recorder.t)), dtype=complex)
+    count = 0
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        for i, t in enumerate(time.tolist()):
+            if mode == "controlled":
+                delta_V, alpha, _, theta = xi[:4]
+                H_dot = (V0 + delta_V) * np.sin(theta - alpha)
+                xi[4] = (kh * delta_H + kh_dot * H_dot) * d2r
+
+                is_failure = failure and t >= failure_time
+                current_error_V = 0.0 if is_failure else delta_V - V_pr_zad
+                pd_filter_state = (
+                    pd_filter_state
+                    + filter_gain * d_error_V_dt
+                    - filter_decay * pd_filter_state
+                )
+                p = -(kv * current_error_V + pd_filter_state)
+                # Дійсні частини рядків однакові, тож гілку обирає рядок 0;
+                # у насиченні похідна береться від межі
+                if p[0].real > Fv_real:
+                    p = Fv_limit
+                elif p[0].real < -Fv_real:
+                    p = -Fv_limit
+                delta_g_state = delta_g_state + thrust_rate * p
+                xi[5] = delta_g_state
+
+            out = np.einsum("kij,jk->ik", W, xi)
+            delta_H = delta_H + weights @ (
+                (V0 + out[4 : 4 + stages]) * np.sin(out[4 + stages : -1])
+            )
+            xi[:4] = out[:4]
+            d_error_V_dt = out[-1]
+            # Як у rgr: нескінченність — теж втрата стабільності
+            if not all(map(cmath.isfinite, [*out[:4, 0].tolist(), delta_H[0]])):
+                print(f"Симуляція втратила стабільність при t={t:.2f}c")
+                break
+
+            if i % every:
+                continue
+            delta_V, alpha, omega_z, theta, delta_v_cmd_rad, delta_g_cmd = xi
+            ny = 1 + ny_gain * (
+                g_alpha * alpha + g_V * delta_V + g_dv * delta_v_cmd_rad
+            )
+            row = (
+                delta_V,
+                delta_H,
+                alpha * r2d,
+                ny,
+                omega_z * r2d,
+                theta * r2d,
+                delta_g_cmd,
+            )
+            for slot, k in enumerate(slots):
+                records[slot, :, count] = row[k]
+            count += 1
+
+    history = {"t": recorder.t[:count]}
+    result = {name: {} for name in parameters}
+    for slot, channel in enumerate(channels):
+        history[channel] = records[slot, 0, :count].real.copy()
+        for k, name in enumerate(parameters):
+            result[name][channel] = records[slot, k, :count].imag / STEP
+    return history, result
+
+
+def peak_gradient(history, result, channel="ny"):
+    """Пік каналу та його похідні: (значення, t піку, {параметр: ∂пік/∂p}).
+
+    Похідна максимуму — чутливість у точці максимуму (вона не рухається
+    при малій зміні параметра, доки пік не перескакує на інший запис).
+    """
+    k = int(np.argmax(history[channel]))
+    gradient = {name: float(columns[channel][k]) for name, columns in result.items()}
+    return float(history[channel][k]), float(history["t"][k]), gradient
+
+
+def main():
+    params = {
+        "mode": "controlled",
+        "y0": [0, 0, 0, 0, 0],
+        "T_end": 100.0,
+        "channels": ("V", "H", "ny"),
+    }
+    history, result = sensitivities(params=params)
+    ny_max, t_max, gradient = peak_gradient(history, result)
+    print(f"Чутливості прогону з автопілотом, T_end = {params['T_end']:g} c")
+    print(f"{'параметр':10s} {'∂ΔV_кінц':>12s} {'∂ΔH_кінц':>12s} {'∂ny_max':>12s}")
+    for name, columns in result.items():
+        print(
+            f"{name:10s} {columns['V'][-1]:12.4g} {columns['H'][-1]:12.4g} "
+            f"{gradient[name]:12.4g}"
+        )
+    print(f"ny_max = {ny_max:.4f} при t = {t_max:.2f} c")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,653 @@
+"""Локальний сервіс симуляції: HTTP на localhost або на Unix-сокеті (asyncio).
+
+Інструменти звертаються до одного «теплого» процесу замість того, щоб
+кожен імпортував rgr.py і заново рахував коефіцієнти. Лише стандартна
+бібліотека та numpy — мережа назовні не потрібна.
+
+    POST /simulate?result=arrays&dtype=float32&timeout=5
+        тіло — сценарій у форматі cli.py: params для run_simulation плюс
+        необов'язкова таблиця "aircraft" (update_parameters)
+    GET /metrics    — пропускна здатність, затримки, черга, пакети
+    GET /health
+
+result=arrays (типово) повертає .npz (application/x-npz, np.load) з
+каналами історії, а спрацювання подій — JSON у заголовку X-Events;
+result=metrics — JSON з підсумками, як у sweep (ny_max, dH_final, ...).
+
+Запити, що надійшли впродовж batch_window, об'єднуються: для кожних
+умов польоту (таблиці aircraft) тримається готовий AircraftSimulator, а
+великі групи сумісних сценаріїв (однакові dt, method, T_end і запис, без
+подій) моделюються одним run_batch. Пакети виконуються в потоці або в пулі з
+workers процесів. Черга обмежена max_queue: переповнення одразу дає 503,
+а запит, що не вклався в timeout, — 504. Окремі прогони йдуть блоками
+iter_simulation і перериваються, щойно минув строк запиту, тож зависла
+задача не тримає виконавця; сценарії довші за max_steps кроків
+відхиляються одразу (400).
+
+Запуск: python service.py --port 8765 або python service.py --unix шлях.
+"""
+
+import argparse
+import asyncio
+import http.client
+import io
+import json
+import math
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time as clock
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from rgr import AircraftSimulator
+from sweep import _summarize
+
+RESULTS = ("arrays", "metrics")
+DTYPES = ("float64", "float32")
+BATCH_METHODS = ("euler", "rk4", "exact")
+# Цикл run_batch коштує приблизно як 20-25 скалярних прогонів, тож менші
+# групи вигідніше моделювати окремими run_simulation
+MIN_VECTOR_BATCH = 24
+# run_batch не переривається, тож разом моделюються лише короткі сценарії;
+# окремі прогони перевіряють строк після кожних CHUNK_STEPS кроків
+MAX_VECTOR_STEPS = 20_000
+CHUNK_STEPS = 10_000
+MAX_STEPS = 2_000_000
+MAX_BODY = 1 << 20
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+def encode_arrays(history, dtype="float64"):
+    """Історія -> байти .npz (без стиснення)."""
+    buffer = io.BytesIO()
+    np.savez(
+        buffer, **{name: np.asarray(v, dtype=dtype) for name, v in history.items()}
+    )
+    return buffer.getvalue()
+
+
+def decode_arrays(data):
+    """Байти .npz -> словник масивів."""
+    with np.load(io.BytesIO(data)) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def _error(message):
+    return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+def _json_safe(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _batch_key(params):
+    return json.dumps(
+        [
+            params.get("dt", 0.01),
+            params.get("method", "rk4"),
+            params.get("T_end", 100.0),
+            params.get("channels"),
+            params.get("record_every"),
+            params.get("output_dt"),
+        ]
+    )
+
+
+def _respond(history, params, event_log, result, dtype):
+    if result == "metrics":
+        summary = _summarize(history, params, "H", 1.0, event_log)
+        summary = {name: _json_safe(value) for name, value in summary.items()}
+        body = {"metrics": summary, "rows": len(history["t"]), "events": event_log}
+        return 200, json.dumps(body, ensure_ascii=False).encode("utf-8"), event_log
+    return 200, encode_arrays(history, dtype), event_log
+
+
+def _steps(params):
+    dt = params.get("dt", 0.01)
+    return params.get("T_end", 100.0) / dt if dt > 0 else math.inf
+
+
+def _run_until(simulator, params, event_log, deadline, cancel):
+    """Прогін блоками iter_simulation; None, якщо минув строк або cancel."""
+    chunks = []
+    stream = simulator.iter_simulation(
+        params, chunk_steps=CHUNK_STEPS, event_log=event_log
+    )
+    for chunk in stream:
+        if clock.time() > deadline or (cancel is not None and cancel.is_set()):
+            stream.close()
+            return None
+        chunks.append(chunk)
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def _execute(simulator, requests, cancel=None):
+    """Виконує пакет запитів одних умов польоту (у потоці або процесі пулу).
+
+    requests — список (params, result, dtype, deadline), deadline — строк
+    за time.time(); повертає (статус, тіло, події) у тому ж порядку.
+    Щонайменше MIN_VECTOR_BATCH сумісних коротких сценаріїв без подій
+    моделюються одним run_batch (збігається з run_simulation з точністю до
+    округлення), решта — окремими прогонами, що зупиняються після строку
+    або встановлення cancel (threading.Event чи Event менеджера процесів).
+    """
+    groups = {}
+    for index, (params, _, _, _) in enumerate(requests):
+        batchable = (
+            not params.get("events")
+            and params.get("method", "rk4") in BATCH_METHODS
+            and _steps(params) <= MAX_VECTOR_STEPS
+        )
+        key = _batch_key(params) if batchable else index
+        groups.setdefault(key, []).append(index)
+
+    responses = [None] * len(requests)
+    for indices in groups.values():
+        histories = None
+        if len(indices) >= MIN_VECTOR_BATCH:
+            try:
+                histories = simulator.run_batch([requests[i][0] for i in indices])
+            except (ValueError, TypeError):
+                histories = None  # помилку покаже окремий прогін кожного запиту
+        for k, i in enumerate(indices):
+            params, result, dtype, deadline = requests[i]
+            try:
+                event_log = []
+                if histories is None:
+                    history = _run_until(simulator, params, event_log, deadline, cancel)
+                    if history is None:
+                        responses[i] = 504, _error("Час очікування вичерпано"), []
+                        continue
+                else:
+                    history = histories[k]
+                responses[i] = _respond(history, params, event_log, result, dtype)
+            except (ValueError, TypeError, KeyError) as exc:
+                responses[i] = 400, _error(str(exc)), []
+    return responses
+
+
+class ServiceMetrics:
+    """Лічильники сервісу та ковзне вікно затримок останніх запитів."""
+
+    def __init__(self, window=1024):
+        self.started = clock.perf_counter()
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.batches = 0
+        self.batched_runs = 0
+        self._done = deque(maxlen=window)  # (момент завершення, затримка)
+
+    def finish(self, latency, ok=True):
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self._done.append((clock.perf_counter(), latency))
+
+    def as_dict(self, queue_depth=0, in_flight=0, simulators=0, horizon=10.0):
+        now = clock.perf_counter()
+        uptime = now - self.started
+        latencies = np.array([latency for _, latency in self._done])
+        recent = sum(1 for finished, _ in self._done if now - finished <= horizon)
+        report = {
+            "uptime_s": uptime,
+            "requests": self.requests,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "batches": self.batches,
+            "mean_batch": self.batched_runs / self.batches if self.batches else 0.0,
+            "queue_depth": queue_depth,
+            "in_flight": in_flight,
+            "warm_simulators": simulators,
+            "throughput_rps": self.completed / uptime if uptime > 0 else 0.0,
+            "recent_rps": recent / min(horizon, uptime) if uptime > 0 else 0.0,
+        }
+        for q in (50, 95, 99):
+            value = float(np.percentile(latencies, q)) * 1e3 if len(latencies) else 0.0
+            report[f"latency_p{q}_ms"] = value
+        return report
+
+
+class _Job:
+    def __init__(self, params, result, dtype, key, future, timeout):
+        self.params, self.result, self.dtype = params, result, dtype
+        self.key, self.future = key, future
+        self.received = clock.perf_counter()
+        # Строк за годинником системи — однаковим і в процесах пулу
+        self.deadline = clock.time() + timeout
+
+
+class SimulationService:
+    """Черга запитів, пакетування за умовами польоту та HTTP-сервер.
+
+    max_queue — межа черги (далі 503), max_batch — найбільший пакет,
+    batch_window — час (с) на збирання пакета, timeout — найбільший
+    час очікування запиту (с), workers — процеси пулу (1 — потік у цьому
+    процесі), max_simulators — скільки умов польоту тримати «теплими»,
+    max_steps — найбільша кількість кроків T_end / dt одного сценарію.
+    """
+
+    def __init__(
+        self,
+        max_queue=256,
+        max_batch=64,
+        batch_window=0.005,
+        timeout=30.0,
+        workers=1,
+        max_simulators=16,
+        max_steps=MAX_STEPS,
+    ):
+        if max_queue < 1 or max_batch < 1 or timeout <= 0 or max_steps < 1:
+            raise ValueError(
+                "max_queue, max_batch, timeout та max_steps мають бути додатними"
+            )
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_simulators = max_simulators
+        self.max_steps = max_steps
+        self._cancel = None
+        self._manager = None
+        self.metrics = ServiceMetrics()
+        self._simulators = OrderedDict()
+        self._queue = None
+        self._slots = None
+        self._executor = None
+        self._batcher = None
+        self._server = None
+        self._tasks = set()
+        self._in_flight = 0
+        self._unix_path = None
+
+    def simulator(self, aircraft):
+        """Готовий AircraftSimulator для таблиці aircraft (LRU) та його ключ."""
+        key = json.dumps(aircraft, sort_keys=True)
+        simulator = self._simulators.get(key)
+        if simulator is None:
+            simulator = AircraftSimulator()
+            if aircraft:
+                simulator.update_parameters(**aircraft)
+            self._simulators[key] = simulator
+            while len(self._simulators) > self.max_simulators:
+                self._simulators.popitem(last=False)
+        self._simulators.move_to_end(key)
+        return key, simulator
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """Запускає обробник черги та сервер (TCP або Unix-сокет за path)."""
+        self._queue = asyncio.Queue(self.max_queue)
+        self._slots = asyncio.Semaphore(self.workers)
+        # cancel зупиняє прогони, що виконуються, під час close()
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._manager = multiprocessing.Manager()
+            self._cancel = self._manager.Event()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            self._cancel = threading.Event()
+        self._batcher = asyncio.create_task(self._collect())
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)  # залишок попереднього запуску
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+            self._unix_path = path
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    @property
+    def address(self):
+        if self._unix_path is not None:
+            return self._unix_path
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def close(self):
+        if self._cancel is not None:
+            self._cancel.set()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+        if self._unix_path is not None and os.path.exists(self._unix_path):
+            os.unlink(self._unix_path)
+
+    async def submit(self, scenario, result="arrays", dtype="float64", timeout=None):
+        """Ставить сценарій у чергу; повертає (статус, тіло, події)."""
+        if result not in RESULTS:
+            raise ValueError(f"result має бути одним з {RESULTS}")
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype має бути одним з {DTYPES}")
+        if not isinstance(scenario, dict):
+            raise ValueError("Сценарій має бути словником params")
+        params = dict(scenario)
+        aircraft = params.pop("aircraft", None) or {}
+        if not isinstance(aircraft, dict):
+            raise ValueError("aircraft має бути словником параметрів літака")
+        if result == "metrics":
+            channels = set(params.get("channels", ())) | {"V", "H", "ny"}
+            params["channels"] = sorted(channels)
+        steps = _steps(params)
+        if not 0 <= steps <= self.max_steps:
+            raise ValueError(
+                f"T_end / dt має бути не більше {self.max_steps} кроків, а не {steps:g}"
+            )
+        key, _ = self.simulator(aircraft)
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+
+        self.metrics.requests += 1
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(params, result, dtype, key, future, timeout)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            return 503, _error("Черга переповнена"), []
+        try:
+            status, body, event_log = await asyncio.wait_for(job.future, timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            return 504, _error("Час очікування вичерпано"), []
+        self.metrics.finish(clock.perf_counter() - job.received, status == 200)
+        return status, body, event_log
+
+    async def _collect(self):
+        while True:
+            batch = [await self._queue.get()]
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Запити, що вже не чекають відповіді (тайм-аут), не моделюються
+            batch = [job for job in batch if not job.future.done()]
+            if not batch:
+                continue
+            await self._slots.acquire()  # зайняті всі виконавці — черга росте
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        self._in_flight += len(batch)
+        try:
+            groups = OrderedDict()
+            for job in batch:
+                groups.setdefault(job.key, []).append(job)
+            calls = []
+            for key, jobs in groups.items():
+                simulator = self._simulators.get(key)
+                if simulator is None:  # витіснений з LRU, поки запит чекав
+                    simulator = self.simulator(json.loads(key))[1]
+                requests = [
+                    (job.params, job.result, job.dtype, job.deadline) for job in jobs
+                ]
+                calls.append(
+                    loop.run_in_executor(
+                        self._executor, _execute, simulator, requests, self._cancel
+                    )
+                )
+            results = await asyncio.gather(*calls, return_exceptions=True)
+            for jobs, responses in zip(groups.values(), results):
+                # Збій виконавця (наприклад, зламаний пул) не зупиняє сервіс
+                if isinstance(responses, BaseException):
+                    responses = [(500, _error(repr(responses)), [])] * len(jobs)
+                self.metrics.batches += 1
+                self.metrics.batched_runs += len(jobs)
+                for job, response in zip(jobs, responses):
+                    if not job.future.done():
+                        job.future.set_result(response)
+        finally:
+            self._in_flight -= len(batch)
+            self._slots.release()
+
+    async def _respond(self, method, target, body):
+        """(статус, тип вмісту, тіло, додаткові заголовки) для одного запиту."""
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, "application/json", b'{"status": "ok"}', {}
+        if url.path == "/metrics":
+            report = self.metrics.as_dict(
+                self._queue.qsize(), self._in_flight, len(self._simulators)
+            )
+            return 200, "application/json", json.dumps(report).encode("utf-8"), {}
+        if url.path != "/simulate":
+            return 404, "application/json", _error("Невідомий шлях"), {}
+        if method != "POST":
+            return 405, "application/json", _error("Лише POST"), {}
+
+        query = dict(parse_qsl(url.query))
+        result = query.get("result", "arrays")
+        try:
+            scenario = json.loads(body or b"{}")
+            timeout = float(query["timeout"]) if "timeout" in query else None
+            status, payload, event_log = await self.submit(
+                scenario, result, query.get("dtype", "float64"), timeout
+            )
+        except (ValueError, TypeError) as exc:
+            return 400, "application/json", _error(str(exc)), {}
+        if status == 200 and result == "arrays":
+            events = json.dumps(event_log, ensure_ascii=True)
+            return status, "application/x-npz", payload, {"X-Events": events}
+        return status, "application/json", payload, {}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                response = await self._respond(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await _write_response(writer, *response, keep_alive)
+                if not keep_alive:
+                    break
+        except _PayloadTooLarge:
+            error = _error("Завеликий запит")
+            await _write_response(writer, 413, "application/json", error, {}, False)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+class _PayloadTooLarge(Exception):
+    pass
+
+
+async def _read_request(reader):
+    """(метод, шлях, заголовки, тіло) або None, якщо клієнт закрив з'єднання."""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+        if len(headers) > 64:
+            raise ValueError("Забагато заголовків")
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        raise _PayloadTooLarge
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+async def _write_response(writer, status, content_type, body, extra, keep_alive):
+    head = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if status == 503:
+        head.append("Retry-After: 1")
+    head += [f"{name}: {value}" for name, value in extra.items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+class ServiceError(Exception):
+    """Відповідь сервісу зі статусом, відмінним від 200."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """Блокувальний клієнт: address — "host:port" або шлях Unix-сокета.
+
+    З'єднання тримається відкритим між запитами (keep-alive).
+    """
+
+    def __init__(self, address, timeout=60.0):
+        self.address = address
+        self.timeout = timeout
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            host, _, port = self.address.rpartition(":")
+            if port.isdigit() and os.path.sep not in self.address:
+                self._connection = http.client.HTTPConnection(
+                    host, int(port), timeout=self.timeout
+                )
+            else:
+                self._connection = _UnixConnection(self.address, self.timeout)
+        return self._connection
+
+    def _request(self, method, target, body=None):
+        connection = self._connect()
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            connection.request(method, target, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.status != 200:
+            raise ServiceError(response.status, payload.decode("utf-8", "replace"))
+        return response, payload
+
+    def simulate(self, scenario, result="arrays", dtype="float64", timeout=None):
+        """arrays: (історія, події); metrics: словник підсумків."""
+        query = f"result={result}&dtype={dtype}"
+        if timeout is not None:
+            query += f"&timeout={timeout}"
+        body = json.dumps(scenario).encode("utf-8")
+        response, payload = self._request("POST", f"/simulate?{query}", body)
+        if result == "metrics":
+            return json.loads(payload)
+        events = json.loads(response.getheader("X-Events") or "[]")
+        return decode_arrays(payload), events
+
+    def metrics(self):
+        return json.loads(self._request("GET", "/metrics")[1])
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def serve(service, host="127.0.0.1", port=8765, path=None):
+    """Запускає service і працює до скасування (Ctrl+C)."""
+    await service.start(host, port, path)
+    print(f"Сервіс симуляції: {service.address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="шлях Unix-сокета замість TCP")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="кількість процесів (0 — усі ядра)"
+    )
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--batch-window", type=float, default=5.0, help="мс")
+    parser.add_argument("--timeout", type=float, default=30.0, help="с")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    args = parser.parse_args(argv)
+
+    service = SimulationService(
+        max_queue=args.max_queue,
+        max_batch=args.max_batch,
+        batch_window=args.batch_window / 1e3,
+        timeout=args.timeout,
+        workers=args.workers,
+        max_steps=args.max_steps,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""Лінеаризований аналіз стійкості та частотні характеристики.
+
+Моделі будуються з тих самих коефіцієнтів c, e, що й симуляція
+(AircraftSimulator._state_space): ẋ = A x + B u, y = C x + D u, де
+x = [ΔV, α, ωz, θ, ΔH] (рад, рад/с), u = [δ_в, рад; δ_г], а виходи
+збігаються з каналами історії (V, H, alpha, omega_z, theta у градусах; ny —
+приріст Δny відносно 1).
+Демпфери m_z_wz та m_z_alpha_dot вмикаються/вимикаються аргументами, а
+closed_loop() додає автопілот (kh, kh_dot, kv, kv_dot, T_dv, Tv_dot) з
+двома станами регулятора — як у rk45 (_augmented_rhs), без обмеження
+Fv_limit. Запуск: python stability.py — звіт про моди для всіх варіантів.
+"""
+
+import copy
+import sys
+
+import numpy as np
+
+from rgr import AircraftSimulator, _expm
+
+STATES = ("V", "alpha", "omega_z", "theta", "H")
+OUTPUTS = ("V", "H", "alpha", "ny", "omega_z", "theta")
+NEUTRAL_TOL = 1e-9
+
+
+class LinearModel:
+    """Лінійна модель ẋ = A x + B u, y = C x + D u з назвами сигналів."""
+
+    def __init__(self, A, B, C, D, states, inputs, outputs):
+        self.A, self.B, self.C, self.D = (
+            np.asarray(M, dtype=float) for M in (A, B, C, D)
+        )
+        self.states = tuple(states)
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+    def eigenvalues(self):
+        return np.linalg.eigvals(self.A)
+
+    @property
+    def stable(self):
+        """Усі власні числа в лівій півплощині (нульові — нейтральні, ΔH)."""
+        return bool(np.all(self.eigenvalues().real < NEUTRAL_TOL))
+
+    def modes(self):
+        """Моди руху: власне число, ωn, рад/с; ζ; період, с; час зміни амплітуди.
+
+        Якщо коливальних пар щонайменше дві, найшвидша позначається
+        short_period, а найповільніша — phugoid. time_to_half для
+        затухаючих мод, time_to_double — для розбіжних.
+        """
+        eigenvalues = self.eigenvalues()
+        oscillatory = sorted(
+            (lam for lam in eigenvalues if lam.imag > NEUTRAL_TOL), key=abs
+        )
+        kinds = {}
+        if len(oscillatory) > 1:
+            kinds[oscillatory[-1]] = "short_period"
+            kinds[oscillatory[0]] = "phugoid"
+
+        modes = []
+        for lam in sorted(eigenvalues[eigenvalues.imag >= 0], key=abs, reverse=True):
+            wn = abs(lam)
+            if wn < NEUTRAL_TOL:
+                kind = "neutral"
+            elif abs(lam.imag) <= NEUTRAL_TOL:
+                kind = "aperiodic"
+            else:
+                kind = kinds.get(lam, "oscillatory")
+            mode = {
+                "kind": kind,
+                "eigenvalue": complex(lam),
+                "wn": wn,
+                "zeta": -lam.real / wn if wn >= NEUTRAL_TOL else np.nan,
+                "period": 2 * np.pi / lam.imag if lam.imag > NEUTRAL_TOL else np.nan,
+                "time_to_half": np.nan,
+                "time_to_double": np.nan,
+            }
+            if lam.real < -NEUTRAL_TOL:
+                mode["time_to_half"] = np.log(2) / -lam.real
+            elif lam.real > NEUTRAL_TOL:
+                mode["time_to_double"] = np.log(2) / lam.real
+            modes.append(mode)
+        return modes
+
+    def frequency_response(self, omega):
+        """H(jω) для всіх частот одразу: масив (len(omega), виходи, входи)."""
+        s = 1j * np.asarray(omega, dtype=float)
+        n = len(self.states)
+        M = s[:, None, None] * np.eye(n) - self.A
+        X = np.linalg.solve(M, np.broadcast_to(self.B, (len(s), *self.B.shape)))
+        return self.C @ X + self.D
+
+    def bode(self, omega, output, input):
+        """Амплітуда, дБ, та фаза, град (розгорнута), каналу input -> output."""
+        H = self.frequency_response(omega)[
+            :, self.outputs.index(output), self.inputs.index(input)
+        ]
+        with np.errstate(divide="ignore"):
+            magnitude = 20 * np.log10(np.abs(H))
+        return magnitude, np.rad2deg(np.unwrap(np.angle(H)))
+
+    def response(self, t, inputs=None, x0=None):
+        """Реакція на сталі входи (сходинки) з початкового стану x0.
+
+        t — рівномірна сітка від 0; inputs — {назва входу: величина}.
+        Дискретизація точна (перехідна матриця), тож результат не залежить
+        від кроку сітки. Повертає історію {"t", виходи...}.
+        """
+        t = np.asarray(t, dtype=float)
+        n, m = self.B.shape
+        u = np.zeros(m)
+        for name, value in (inputs or {}).items():
+            u[self.inputs.index(name)] = value
+        x = np.zeros(n) if x0 is None else np.asarray(x0, dtype=float)
+
+        X = np.empty((len(t), n))
+        if len(t):
+            dt = t[1] - t[0] if len(t) > 1 else 0.0
+            M = np.zeros((n + m, n + m))
+            M[:n, :n], M[:n, n:] = self.A, self.B
+            E = _expm(M * dt)
+            Phi, forced = E[:n, :n], E[:n, n:] @ u
+            for k in range(len(t)):
+                X[k] = x
+                x = Phi @ x + forced
+        Y = X @ self.C.T + u @ self.D.T
+        history = {"t": t}
+        for j, name in enumerate(self.outputs):
+            history[name] = Y[:, j]
+        return history
+
+    def step_response(self, t, input, amplitude=1.0):
+        return self.response(t, {input: amplitude})
+
+    def submodel(self, states):
+        """Відсічена модель лише зі станами states (інші вважаються нульовими)."""
+        index = [self.states.index(name) for name in states]
+        return LinearModel(
+            self.A[np.ix_(index, index)],
+            self.B[index],
+            self.C[:, index],
+            self.D,
+            states,
+            self.inputs,
+            self.outputs,
+        )
+
+    def residualized(self, fast):
+        """Модель повільних рухів: похідні швидких станів fast прирівняно нулю."""
+        f = [self.states.index(name) for name in fast]
+        s = [k for k in range(len(self.states)) if k not in f]
+        A_ff_inv = np.linalg.inv(self.A[np.ix_(f, f)])
+        A_sf, A_fs = self.A[np.ix_(s, f)], self.A[np.ix_(f, s)]
+        C_f = self.C[:, f]
+        return LinearModel(
+            self.A[np.ix_(s, s)] - A_sf @ A_ff_inv @ A_fs,
+            self.B[s] - A_sf @ A_ff_inv @ self.B[f],
+            self.C[:, s] - C_f @ A_ff_inv @ A_fs,
+            self.D - C_f @ A_ff_inv @ self.B[f],
+            [self.states[k] for k in s],
+            self.inputs,
+            self.outputs,
+        )
+
+    def short_period(self):
+        """Короткоперіодичний рух: α та ωz при сталих ΔV, θ."""
+        return self.submodel(("alpha", "omega_z"))
+
+    def phugoid(self):
+        """Фугоїдний рух: ΔV та θ, короткоперіодичні стани квазісталі."""
+        return self.residualized(("alpha", "omega_z")).submodel(("V", "theta"))
+
+
+def _configured(simulator, damper_wz, damper_alpha_dot):
+    simulator = simulator or AircraftSimulator()
+    if damper_wz and damper_alpha_dot:
+        return simulator
+    simulator = copy.deepcopy(simulator)
+    overrides = {}
+    if not damper_wz:
+        overrides["m_z_wz"] = 0.0
+    if not damper_alpha_dot:
+        overrides["m_z_alpha_dot"] = 0.0
+    return simulator.update_parameters(**overrides)
+
+
+def _output_matrices(simulator, A, B):
+    """C, D для каналів історії; ny = 1 + V0/g·(ωz − α̇) дає приріст Δny."""
+    r2d = 180.0 / np.pi
+    n, m = A.shape[0], B.shape[1]
+    C, D = np.zeros((len(OUTPUTS), n)), np.zeros((len(OUTPUTS), m))
+    C[0, 0] = 1.0
+    C[1, 4] = 1.0
+    C[2, 1] = r2d
+    ny_gain = simulator.V0 / simulator.g
+    C[3] = -ny_gain * A[1]
+    C[3, 2] += ny_gain
+    D[3] = -ny_gain * B[1]
+    C[4, 2] = r2d
+    C[5, 3] = r2d
+    return C, D
+
+
+def linearize(
+    simulator=None, mode="free_flight", damper_wz=True, damper_alpha_dot=True
+):
+    """Розімкнена модель літака для режиму mode (free_flight або special_rv)."""
+    simulator = _configured(simulator, damper_wz, damper_alpha_dot)
+    A, B = simulator._state_space(mode)
+    C, D = _output_matrices(simulator, A, B)
+    return LinearModel(A, B, C, D, STATES, ("delta_v", "delta_g"), OUTPUTS)
+
+
+def closed_loop(simulator=None, params=None, damper_wz=True, damper_alpha_dot=True):
+    """Замкнена модель з автопілотом режиму controlled.
+
+    Стани: [ΔV, α, ωz, θ, ΔH, фільтр PD, δ_г]; входи: V_zad (задана ΔV, м/с)
+    та delta_v — додаткове відхилення РВ, рад (збурення). Параметри
+    автопілота беруться з params, як у run_simulation; failure вимикає
+    контур швидкості (відмова датчика). Вихід delta_g — команда тяги.
+    """
+    params = params or {}
+    simulator = _configured(simulator, damper_wz, damper_alpha_dot)
+    A, B = simulator._state_space("controlled")
+    kv, kv_dot, T_dv, Tv_dot, _, _, kh, kh_dot = simulator._controller_constants(params)
+    if params.get("failure", False):
+        kv = 0.0
+    d2r, V0 = np.pi / 180.0, simulator.V0
+
+    # δ_в = (kh·ΔH + kh_dot·Ḣ)·π/180, Ḣ ≈ V0·(θ − α)
+    K = np.zeros(5)
+    K[4], K[3], K[1] = kh * d2r, kh_dot * V0 * d2r, -kh_dot * V0 * d2r
+
+    A_cl = np.zeros((7, 7))
+    A_cl[:5, :5] = A + np.outer(B[:, 0], K)
+    A_cl[:5, 6] = B[:, 1]
+    # Фільтр PD диференціює швидкість: ṗ = (kv_dot·ΔV̇ − p) / Tv_dot
+    A_cl[5] = kv_dot / Tv_dot * A_cl[0]
+    A_cl[5, 5] = -1.0 / Tv_dot
+    A_cl[6, 0] = -kv / T_dv
+    A_cl[6, 5] = -1.0 / T_dv
+
+    B_cl = np.zeros((7, 2))
+    B_cl[6, 0] = kv / T_dv
+    B_cl[:5, 1] = B[:, 0]
+    B_cl[5, 1] = kv_dot / Tv_dot * B[0, 0]
+
+    # Виходи через вхід літака u = [K x + δ_в, δ_г]
+    C_ol, D_ol = _output_matrices(simulator, A, B)
+    C = np.zeros((len(OUTPUTS) + 1, 7))
+    C[: len(OUTPUTS), :5] = C_ol + np.outer(D_ol[:, 0], K)
+    C[: len(OUTPUTS), 6] = D_ol[:, 1]
+    C[-1, 6] = 1.0
+    D = np.zeros((len(OUTPUTS) + 1, 2))
+    D[: len(OUTPUTS), 1] = D_ol[:, 0]
+    return LinearModel(
+        A_cl,
+        B_cl,
+        C,
+        D,
+        STATES + ("pd_filter", "delta_g"),
+        ("V_zad", "delta_v"),
+        OUTPUTS + ("delta_g",),
+    )
+
+
+def _print_modes(title, model):
+    print(f"{title}: {'стійка' if model.stable else 'НЕСТІЙКА'}")
+    for mode in model.modes():
+        lam = mode["eigenvalue"]
+        line = f"  {mode['kind']:13s} λ={lam.real:+9.4f}{lam.imag:+9.4f}j"
+        line += f"  ωn={mode['wn']:8.4f}  ζ={mode['zeta']:7.4f}"
+        if np.isfinite(mode["period"]):
+            line += f"  T={mode['period']:8.2f} с"
+        print(line)
+
+
+def main():
+    simulator = AircraftSimulator()
+    for damper_wz in (True, False):
+        for damper_alpha_dot in (True, False):
+            dampers = f"демпфери ωz={'так' if damper_wz else 'ні'}, "
+            dampers += f"α̇={'так' if damper_alpha_dot else 'ні'}"
+            _print_modes(
+                f"Вільний літак ({dampers})",
+                linearize(simulator, "free_flight", damper_wz, damper_alpha_dot),
+            )
+    _print_modes(
+        "Автопілот", closed_loop(simulator, {"mode": "controlled", "y0": [0] * 5})
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Параметричні сітки та Монте-Карло над параметрами літака й автопілота.
+
+Кожна вибірка — словник: ключі з AircraftSimulator.CONTROLLER_DEFAULTS
+(kv, kv_dot, kh, kh_dot, Fv_limit, ...) потрапляють у params прогону, решта
+(Cya, m_z_alpha, m_z_wz, rho_H, V0, G, X_t_bar, ...) — у
+AircraftSimulator.update_parameters, тож c, e та балансування
+перераховуються для кожної вибірки. Прогони розподіляються блоками по пулу
+процесів, а назад повертаються лише підсумкові метрики, без історій.
+
+Події з base_params["events"] (див. events.py) дають колонки t_<назва> —
+момент першого спрацювання; подія зі stop завершує прогін достроково
+(наприклад, після встановлення або при виході ny за межі), що скорочує
+час великих вибірок.
+
+Ключ вибірки turbulence_seed замінює seed у base_params["turbulence"]
+(див. turbulence.py) — Монте-Карло за реалізаціями турбулентності.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from events import event_names
+from rgr import AircraftSimulator, HistoryRecorder
+
+METRICS = (
+    "ny_max",
+    "ny_min",
+    "dH_final",
+    "dV_final",
+    "settling_time",
+    "instability_time",
+    "stop_time",
+)
+
+
+def grid(**axes):
+    """Декартова сітка: grid(kv=[3, 5], Cya=[5.5, 5.9]) — 4 вибірки."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def monte_carlo(n, distributions, seed=None):
+    """Випадкові вибірки параметрів.
+
+    distributions: {"Cya": ("normal", 5.9, 0.2), "kv": ("uniform", 3.0, 7.0)}.
+    Підтримуються normal (середнє, СКВ), uniform (min, max) та
+    lognormal (середнє, СКВ логарифма).
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (kind, a, b) in distributions.items():
+        if kind == "normal":
+            columns[name] = rng.normal(a, b, n)
+        elif kind == "uniform":
+            columns[name] = rng.uniform(a, b, n)
+        elif kind == "lognormal":
+            columns[name] = rng.lognormal(a, b, n)
+        else:
+            raise ValueError(f"Невідомий розподіл: {kind}")
+    return [
+        {name: float(column[i]) for name, column in columns.items()} for i in range(n)
+    ]
+
+
+def settling_time(t, x, tol):
+    """Момент, після якого |x - x_кінц| ≤ tol до кінця прогону."""
+    if not len(x):
+        return np.nan
+    outside = np.flatnonzero(np.abs(x - x[-1]) > tol)
+    if not len(outside):
+        return float(t[0])
+    if outside[-1] + 1 == len(t):
+        return np.nan
+    return float(t[outside[-1] + 1])
+
+
+def _summarize(history, params, settle_channel, settle_tol, event_log=()):
+    t = history["t"]
+    dt = params.get("dt", 0.01)
+    steps = len(np.arange(0, params.get("T_end", 100.0), dt))
+    every = HistoryRecorder.decimation(dt, params)
+    stops = [event["t"] for event in event_log if event["action"] == "stop"]
+    stable = len(t) == -(-steps // every) or bool(stops)
+    events = {}
+    for event in event_log:
+        events.setdefault(f"t_{event['name']}", event["t"])
+    if not len(t):
+        return dict.fromkeys(METRICS, np.nan) | events | {"instability_time": 0.0}
+    return events | {
+        "ny_max": float(np.max(history["ny"])),
+        "ny_min": float(np.min(history["ny"])),
+        "dH_final": float(history["H"][-1]),
+        "dV_final": float(history["V"][-1]),
+        "settling_time": settling_time(t, history[settle_channel], settle_tol),
+        "instability_time": np.nan if stable else float(t[-1]),
+        "stop_time": stops[0] if stops else np.nan,
+    }
+
+
+def _run_chunk(samples, base_params, settle_channel, settle_tol):
+    controller_keys = set(AircraftSimulator.CONTROLLER_DEFAULTS) | {"gain_factor"}
+    channels = sorted({"V", "H", "ny", settle_channel})
+    rows = []
+    for sample in samples:
+        sample = dict(sample)
+        seed = sample.pop("turbulence_seed", None)
+        aircraft = {k: v for k, v in sample.items() if k not in controller_keys}
+        controller = {k: v for k, v in sample.items() if k in controller_keys}
+        simulator = AircraftSimulator().update_parameters(**aircraft)
+        params = {**base_params, **controller, "channels": channels}
+        if seed is not None:
+            turbulence = {**params.get("turbulence", {}), "seed": int(seed)}
+            params["turbulence"] = turbulence
+        event_log = []
+        history = simulator.run_simulation(params, event_log=event_log)
+        rows.append(_summarize(history, params, settle_channel, settle_tol, event_log))
+    return rows
+
+
+def run_sweep(
+    samples,
+    base_params=None,
+    workers=None,
+    chunk_size=None,
+    settle_channel="H",
+    settle_tol=1.0,
+):
+    """Виконує вибірки в пулі процесів і повертає колонки метрик.
+
+    Результат — словник масивів: параметри кожної вибірки та METRICS
+    (пікові ny, кінцеві ΔH/ΔV, час встановлення каналу settle_channel у
+    межах settle_tol відносно кінцевого значення, момент втрати
+    стабільності або NaN, момент зупинки подією або NaN) і t_<назва> для
+    кожної події base_params["events"]. workers=1 виконує все в поточному
+    процесі.
+    """
+    base_params = {"mode": "controlled", "y0": [0, 0, 0, 0, 0], **(base_params or {})}
+    # Перевірка подій до запуску пулу: помилка специфікації — одразу тут
+    events = event_names(base_params.get("events"), HistoryRecorder.CHANNELS)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # Кілька блоків на процес вирівнюють навантаження без зайвого pickle
+        chunk_size = max(1, len(samples) // (workers * 8))
+    chunks = [samples[i : i + chunk_size] for i in range(0, len(samples), chunk_size)]
+    args = (base_params, settle_channel, settle_tol)
+
+    if workers == 1:
+        results = [_run_chunk(chunk, *args) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _run_chunk,
+                    chunks,
+                    *(itertools.repeat(arg, len(chunks)) for arg in args),
+                )
+            )
+
+    rows = [row for chunk in results for row in chunk]
+    names = sorted({name for sample in samples for name in sample})
+    columns = {
+        name: np.array([sample.get(name, np.nan) for sample in samples])
+        for name in names
+    }
+    for metric in METRICS + tuple(f"t_{name}" for name in events):
+        columns[metric] = np.array([row.get(metric, np.nan) for row in rows])
+    return columns
@@ -0,0 +1,76 @@
+"""Регресійні тести ядра симуляції (python -m pytest)."""
+
+import numpy as np
+import pytest
+
+from rgr import AircraftSimulator, SimulationStats
+
+METHODS = ("euler", "rk4", "exact", "rk45")
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    return AircraftSimulator()
+
+
+def _params(method, **changes):
+    return {"T_end": 10.0, "dt": 0.01, "method": method, **changes}
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_decimated_run_integrates_to_t_end(simulator, method):
+    """З record_every > 1 останні кроки після запису теж інтегруються."""
+    reference = simulator.run_simulation(_params(method))
+    for every in (1, 10):
+        params = _params(method, record_every=every)
+        stats = SimulationStats()
+        history = simulator.run_simulation(params, stats=stats)
+        state = simulator.initial_state(params)
+        simulator.run_simulation(params, state=state)
+
+        assert len(history["t"]) == len(reference["t"][::every])
+        np.testing.assert_allclose(history["V"], reference["V"][::every])
+        assert state.step == 1000 and state.t == pytest.approx(10.0)
+        if method != "rk45":
+            assert stats.steps == 1000
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_decimated_run_checks_events_to_t_end(simulator, method):
+    """Події перевіряються на кожному кроці до T_end за будь-якого проріджування."""
+    reference = simulator.run_simulation(_params(method))
+    # Поріг між рядками 996 і 997: перетин у t ≈ 9.975, після останнього запису
+    threshold = 0.5 * (reference["V"][996] + reference["V"][997])
+    events = [{"channel": "V", "threshold": threshold, "direction": "both"}]
+
+    logs = {}
+    for every in (1, 10):
+        logs[every] = []
+        params = _params(method, record_every=every, events=events)
+        simulator.run_simulation(params, event_log=logs[every])
+    streamed = []
+    params = _params(method, record_every=10, events=events)
+    for _ in simulator.iter_simulation(params, chunk_steps=100, event_log=streamed):
+        pass
+
+    assert len(logs[1]) == len(logs[10]) == len(streamed) == 1
+    assert logs[10][0]["t"] == pytest.approx(logs[1][0]["t"])
+    assert streamed[0]["t"] == pytest.approx(logs[1][0]["t"])
+    assert logs[10][0]["t"] == pytest.approx(9.975, abs=0.01)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_decimated_state_stops_at_until(simulator, method):
+    """Знімок стану береться точно в until, а не в останньому записаному рядку."""
+    params = _params(method, record_every=10)
+    state = simulator.initial_state(params)
+    simulator.run_simulation(params, state=state, until=5.0)
+    assert state.step == 500 and state.t == pytest.approx(5.0)
+
+    branch = [(5.0, {"mode": "special_rv"})]
+    decimated = simulator.run_branches(params, branch)[0]
+    reference = simulator.run_branches(_params(method), branch)[0]
+    for channel in decimated:
+        np.testing.assert_allclose(
+            decimated[channel], reference[channel][::10], rtol=1e-9, atol=1e-12
+        )
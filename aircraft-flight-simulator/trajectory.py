@@ -0,0 +1,339 @@
+"""Бінарний формат траєкторій: блоковий запис і читання через mmap.
+
+Файл — архів з одного або кількох прогонів:
+
+    MAGIC (8 байт)
+    прогін: RUN_MAGIC, довжина заголовка, кількість рядків (uint64 LE),
+            JSON-заголовок (params, c, e, канали, chunk_rows), вирівнювання,
+            блоки даних
+    ...
+    індекс: JSON [{"offset", "name", "rows"}], довжина (uint64), INDEX_MAGIC
+
+Блок містить chunk_rows значень float64 для кожного каналу поспіль
+(t, V, H, alpha, ...); останній блок доповнюється NaN до повного розміру.
+Тому канал прогону — рівномірно розташовані в файлі відрізки, і читач
+бачить його як масив (блоки, chunk_rows) поверх mmap без копіювання.
+Кількість рядків у заголовку прогону оновлюється після кожного блоку, тож
+перерваний запис лишається читабельним: без індексу прогони знаходяться
+послідовним переглядом файлу.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"AFSTRJ01"
+RUN_MAGIC = b"RUN0\0\0\0\0"
+INDEX_MAGIC = b"AFSTRIDX"
+_RUN_HEAD = struct.Struct("<8sQQ")
+_INDEX_TAIL = struct.Struct("<Q8s")
+DTYPE = np.dtype("<f8")
+
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return repr(value)
+
+
+def _run_header(params, simulator, channels, chunk_rows, name):
+    header = {
+        "name": name,
+        "channels": list(channels),
+        "chunk_rows": chunk_rows,
+        "params": params,
+    }
+    if simulator is not None:
+        header.update(
+            c=simulator.c,
+            e=simulator.e,
+            delta_v_bal_rad=simulator.delta_v_bal_rad,
+            V0=simulator.V0,
+            H0=simulator.H0,
+            g=simulator.g,
+        )
+    return header
+
+
+class TrajectoryWriter:
+    """Дописує прогони в архів; mode="w" створює новий, "a" — доповнює.
+
+    Використання:
+        with TrajectoryWriter("runs.traj") as writer:
+            writer.write_simulation(simulator, params, name="nominal")
+    """
+
+    def __init__(self, path, mode="w", chunk_rows=65536):
+        if mode not in ("w", "a"):
+            raise ValueError("mode має бути 'w' або 'a'")
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows має бути додатним")
+        self.path = path
+        self.chunk_rows = int(chunk_rows)
+        self._run = None
+        if mode == "a" and os.path.exists(path):
+            self.index, end = _read_index(path)
+            self._file = open(path, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self.index = []
+            self._file = open(path, "wb")
+            self._file.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def begin(self, channels, params=None, simulator=None, name=None):
+        """Починає новий прогін з каналами channels (перший — зазвичай "t")."""
+        if self._run is not None:
+            raise RuntimeError("Попередній прогін не завершено (end())")
+        name = str(len(self.index)) if name is None else str(name)
+        header = _run_header(params or {}, simulator, channels, self.chunk_rows, name)
+        text = json.dumps(header, default=_json_default, ensure_ascii=False)
+        payload = text.encode("utf-8")
+        payload += b" " * (-(len(payload) + _RUN_HEAD.size) % DTYPE.itemsize)
+        offset = self._file.tell()
+        self._file.write(_RUN_HEAD.pack(RUN_MAGIC, len(payload), 0))
+        self._file.write(payload)
+        self._run = {
+            "offset": offset,
+            "name": name,
+            "channels": list(channels),
+            "rows": 0,
+            "pending": [],
+            "pending_rows": 0,
+        }
+
+    def append(self, chunk):
+        """Дописує блок історії — словник масивів однакової довжини."""
+        run = self._run
+        if run is None:
+            raise RuntimeError("Прогін не розпочато (begin())")
+        columns = [np.asarray(chunk[name], dtype=DTYPE) for name in run["channels"]]
+        run["pending"].append(columns)
+        run["pending_rows"] += len(columns[0])
+        while run["pending_rows"] >= self.chunk_rows:
+            self._write_block(self.chunk_rows)
+
+    def end(self):
+        """Записує доповнений NaN останній блок і додає прогін до індексу."""
+        run = self._run
+        if run is None:
+            raise RuntimeError("Прогін не розпочато (begin())")
+        if run["pending_rows"]:
+            self._write_block(run["pending_rows"])
+        self._run = None
+        entry = {"offset": run["offset"], "name": run["name"], "rows": run["rows"]}
+        self.index.append(entry)
+        return entry
+
+    def add(self, history, params=None, simulator=None, name=None):
+        """Записує готову історію (наприклад, з run_batch) одним прогоном."""
+        self.begin(list(history), params, simulator, name)
+        self.append(history)
+        return self.end()
+
+    def write_simulation(self, simulator, params, name=None, chunk_steps=None):
+        """Запускає iter_simulation і дописує блоки по мірі обчислення."""
+        chunk_steps = chunk_steps or self.chunk_rows
+        chunks = simulator.iter_simulation(params, chunk_steps=chunk_steps)
+        first = next(chunks)
+        self.begin(list(first), params, simulator, name)
+        self.append(first)
+        for chunk in chunks:
+            self.append(chunk)
+        return self.end()
+
+    def _write_block(self, rows):
+        run = self._run
+        pending = run["pending"]
+        if len(pending) == 1:
+            columns = pending[0]  # зрізи-представлення, без копіювання
+        else:
+            columns = [np.concatenate(parts) for parts in zip(*pending)]
+        block = np.full((len(columns), self.chunk_rows), np.nan, dtype=DTYPE)
+        for k, column in enumerate(columns):
+            block[k, :rows] = column[:rows]
+        self._file.write(block.tobytes())
+        rest = [column[rows:] for column in columns]
+        run["pending"] = [rest] if len(rest[0]) else []
+        run["pending_rows"] = len(rest[0])
+        run["rows"] += rows
+        # Кількість рядків у заголовку робить уже записані блоки читабельними
+        end = self._file.tell()
+        self._file.seek(run["offset"] + 16)
+        self._file.write(struct.pack("<Q", run["rows"]))
+        self._file.seek(end)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._run is not None:
+            self.end()
+        text = json.dumps(self.index, ensure_ascii=False).encode("utf-8")
+        self._file.write(text)
+        self._file.write(_INDEX_TAIL.pack(len(text), INDEX_MAGIC))
+        self._file.close()
+
+
+def _read_index(path):
+    """Індекс архіву та зміщення кінця даних (початку індексу)."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: не файл траєкторій")
+        size = file.seek(0, os.SEEK_END)
+        if size >= len(MAGIC) + _INDEX_TAIL.size:
+            file.seek(size - _INDEX_TAIL.size)
+            length, magic = _INDEX_TAIL.unpack(file.read(_INDEX_TAIL.size))
+            start = size - _INDEX_TAIL.size - length
+            if magic == INDEX_MAGIC and start >= len(MAGIC):
+                file.seek(start)
+                return json.loads(file.read(length).decode("utf-8")), start
+        return _scan(file, size)
+
+
+def _scan(file, size):
+    """Відновлює індекс перерваного запису послідовним переглядом прогонів."""
+    index, offset = [], len(MAGIC)
+    while offset + _RUN_HEAD.size <= size:
+        file.seek(offset)
+        magic, length, rows = _RUN_HEAD.unpack(file.read(_RUN_HEAD.size))
+        if magic != RUN_MAGIC:
+            break
+        header = json.loads(file.read(length).decode("utf-8"))
+        blocks = -(-rows // header["chunk_rows"])
+        end = offset + _RUN_HEAD.size + length
+        end += blocks * len(header["channels"]) * header["chunk_rows"] * DTYPE.itemsize
+        if end > size:
+            break
+        index.append({"offset": offset, "name": header["name"], "rows": rows})
+        offset = end
+    return index, offset
+
+
+class TrajectoryColumn:
+    """Канал прогону поверх mmap; зрізи читають лише потрібні блоки."""
+
+    def __init__(self, blocks, rows):
+        self.blocks = blocks
+        self.rows = rows
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def shape(self):
+        return (self.rows,)
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        return values if dtype is None else values.astype(dtype)
+
+    def __getitem__(self, key):
+        R = self.blocks.shape[1]
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.rows)
+            if (stop - start) * step <= 0:
+                return np.empty(0, dtype=DTYPE)
+            if step == 1:
+                first, last = start // R, (stop - 1) // R + 1
+                flat = self.blocks[first:last].reshape(-1)
+                return flat[start - first * R : stop - first * R]
+            key = np.arange(start, stop, step)
+        index = np.asarray(key)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        index = np.where(index < 0, index + self.rows, index)
+        if np.any((index < 0) | (index >= self.rows)):
+            raise IndexError("індекс поза межами каналу")
+        values = self.blocks[index // R, index % R]
+        return values if np.ndim(key) else float(values)
+
+
+class Trajectory:
+    """Один прогін архіву: header (params, c, e, ...) та канали за назвою."""
+
+    def __init__(self, buffer, offset, rows):
+        magic, length, _ = _RUN_HEAD.unpack_from(buffer, offset)
+        if magic != RUN_MAGIC:
+            raise ValueError(f"Пошкоджений прогін за зміщенням {offset}")
+        start = offset + _RUN_HEAD.size
+        self.header = json.loads(bytes(buffer[start : start + length]).decode("utf-8"))
+        self.name = self.header["name"]
+        self.params = self.header["params"]
+        self.channels = self.header["channels"]
+        self.rows = rows
+        R = self.header["chunk_rows"]
+        k, blocks = len(self.channels), -(-rows // R)
+        data = np.ndarray(
+            (blocks, k, R), dtype=DTYPE, buffer=buffer, offset=start + length
+        )
+        self._columns = {
+            name: TrajectoryColumn(data[:, j, :], rows)
+            for j, name in enumerate(self.channels)
+        }
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, channel):
+        return self._columns[channel]
+
+    def __contains__(self, channel):
+        return channel in self._columns
+
+    def to_history(self, start=None, stop=None, step=None):
+        """Зріз усіх каналів як звичайна історія (словник масивів)."""
+        key = slice(start, stop, step)
+        return {name: column[key] for name, column in self._columns.items()}
+
+
+class TrajectoryArchive:
+    """Читання архіву траєкторій через mmap; прогони за номером або назвою."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index, _ = _read_index(path)
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._names = {entry["name"]: n for n, entry in enumerate(self.index)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return (self[n] for n in range(len(self)))
+
+    def names(self):
+        return [entry["name"] for entry in self.index]
+
+    def __getitem__(self, key):
+        n = self._names[key] if isinstance(key, str) else key
+        entry = self.index[n]
+        return Trajectory(self._mmap, entry["offset"], entry["rows"])
+
+    def close(self):
+        # Поки існують масиви поверх mmap, він закриється лише разом з ними
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+def write_simulation(path, simulator, params, chunk_rows=65536, mode="w", name=None):
+    """Один прогін run_simulation одразу у файл траєкторії."""
+    with TrajectoryWriter(path, mode=mode, chunk_rows=chunk_rows) as writer:
+        return writer.write_simulation(simulator, params, name=name)
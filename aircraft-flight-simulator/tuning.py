@@ -0,0 +1,286 @@
+"""Автоматичний підбір коефіцієнтів автопілота ансамблевими прогонами.
+
+Пошук — метод крос-ентропії в логарифмах коефіцієнтів (kv, kv_dot, kh,
+kh_dot, T_dv, Tv_dot): кожне покоління — популяція кандидатів, що
+моделюється одним викликом run_batch (за потреби — блоками в пулі
+процесів). Оцінювання поетапне: спочатку короткий горизонт, після якого
+відкидаються нестійкі кандидати, кандидати з порушенням меж ny та гірша
+частина за проміжною вартістю; повний горизонт моделюють лише решта.
+
+Вартість — зважена сума: часи встановлення ΔH та ΔV (частка T_end),
+перерегулювання ΔV, пікове |ΔH|, вихід ny за межі та частка часу в
+насиченні тяги (|δ_г*| = Fv_limit). Запуск: python tuning.py.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rgr import AircraftSimulator, HistoryRecorder
+
+GAINS = ("kv", "kv_dot", "kh", "kh_dot", "T_dv", "Tv_dot")
+BOUNDS = {
+    "kv": (0.5, 20.0),
+    "kv_dot": (0.2, 20.0),
+    "kh": (0.01, 1.0),
+    "kh_dot": (0.05, 3.0),
+    "T_dv": (0.2, 5.0),
+    "Tv_dot": (0.2, 5.0),
+}
+WEIGHTS = {
+    "settling_H": 1.0,
+    "settling_V": 1.0,
+    "overshoot_V": 1.0,
+    "peak_H": 0.05,
+    "ny_violation": 20.0,
+    "saturation": 0.5,
+}
+BASE_PARAMS = {
+    "mode": "controlled",
+    "y0": [0, 0, 0, 0, 0],
+    "method": "rk4",
+    "dt": 0.02,
+    "T_end": 60.0,
+    "output_dt": 0.1,
+    "channels": ("V", "H", "ny", "delta_g"),
+}
+METRICS = (
+    "settling_H",
+    "settling_V",
+    "overshoot_V",
+    "peak_H",
+    "ny_min",
+    "ny_max",
+    "ny_violation",
+    "saturation",
+    "unstable",
+    "cost",
+)
+
+
+def _settling_time(t, x, tol, horizon):
+    """Момент, після якого |x| ≤ tol до кінця; horizon, якщо не встановилось."""
+    outside = np.flatnonzero(np.abs(x) > tol)
+    if not len(outside):
+        return 0.0
+    if outside[-1] + 1 == len(t):
+        return horizon
+    return float(t[outside[-1] + 1])
+
+
+def candidate_metrics(history, params, horizon, ny_limits, tol_H=1.0, tol_V=0.5):
+    """Показники якості одного прогону (словник з ключами METRICS без cost)."""
+    t = history["t"]
+    dt = params.get("dt", 0.01)
+    steps = len(np.arange(0, params.get("T_end", 100.0), dt))
+    every = HistoryRecorder.decimation(dt, params)
+    if not len(t) or len(t) < -(-steps // every):
+        return dict.fromkeys(METRICS, np.nan) | {"unstable": 1.0}
+
+    V_zad = params.get("V_pr_zad", AircraftSimulator.CONTROLLER_DEFAULTS["V_pr_zad"])
+    Fv_limit = params.get("Fv_limit", AircraftSimulator.CONTROLLER_DEFAULTS["Fv_limit"])
+    T_dv = params.get("T_dv", AircraftSimulator.CONTROLLER_DEFAULTS["T_dv"])
+    error_V, H, ny = history["V"] - V_zad, history["H"], history["ny"]
+
+    # Насичення: δ̇_г·T_dv досягає Fv_limit (за записаними значеннями δ_г)
+    rate = np.diff(history["delta_g"]) / np.diff(t) * T_dv if len(t) > 1 else []
+    saturation = float(np.mean(np.abs(rate) >= 0.999 * Fv_limit)) if len(rate) else 0.0
+    ny_min, ny_max = float(ny.min()), float(ny.max())
+    return {
+        "settling_H": _settling_time(t, H, tol_H, horizon),
+        "settling_V": _settling_time(t, error_V, tol_V, horizon),
+        "overshoot_V": float(max(0.0, error_V.max()) / abs(V_zad)) if V_zad else 0.0,
+        "peak_H": float(np.abs(H).max()),
+        "ny_min": ny_min,
+        "ny_max": ny_max,
+        "ny_violation": max(0.0, ny_max - ny_limits[1], ny_limits[0] - ny_min),
+        "saturation": saturation,
+        "unstable": 0.0,
+    }
+
+
+def _cost(metrics, horizon, weights):
+    if metrics["unstable"]:
+        return np.inf
+    cost = 0.0
+    for name, weight in weights.items():
+        value = metrics[name]
+        if name.startswith("settling"):
+            value /= horizon
+        cost += weight * value
+    return cost
+
+
+def _evaluate_chunk(simulator, candidates, base_params, horizon, ny_limits, weights):
+    params_list = [{**base_params, **gains, "T_end": horizon} for gains in candidates]
+    histories = simulator.run_batch(params_list)
+    rows = []
+    for history, params in zip(histories, params_list):
+        metrics = candidate_metrics(history, params, horizon, ny_limits)
+        metrics["cost"] = _cost(metrics, horizon, weights)
+        rows.append(metrics)
+    return rows
+
+
+def evaluate(
+    candidates,
+    base_params=None,
+    simulator=None,
+    horizon=None,
+    ny_limits=(0.5, 1.5),
+    weights=None,
+    executor=None,
+    workers=1,
+):
+    """Метрики та вартість для списку словників коефіцієнтів (колонки METRICS).
+
+    Кандидати моделюються ансамблем run_batch; з executor — блоками по
+    workers процесах.
+    """
+    base_params = {**BASE_PARAMS, **(base_params or {})}
+    horizon = horizon or base_params["T_end"]
+    simulator = simulator or AircraftSimulator()
+    args = (base_params, horizon, ny_limits, weights or WEIGHTS)
+    if executor is None or workers == 1 or len(candidates) < 2:
+        rows = _evaluate_chunk(simulator, candidates, *args)
+    else:
+        size = -(-len(candidates) // workers)
+        futures = [
+            executor.submit(_evaluate_chunk, simulator, candidates[i : i + size], *args)
+            for i in range(0, len(candidates), size)
+        ]
+        rows = [row for future in futures for row in future.result()]
+    return {name: np.array([row[name] for row in rows]) for name in METRICS}
+
+
+def tune(
+    base_params=None,
+    simulator=None,
+    gains=GAINS,
+    bounds=None,
+    population=64,
+    generations=12,
+    elite=0.2,
+    stages=(0.3, 1.0),
+    survival=0.5,
+    ny_limits=(0.5, 1.5),
+    weights=None,
+    workers=1,
+    seed=None,
+    callback=None,
+):
+    """Підбирає коефіцієнти gains; повертає словник з найкращим результатом.
+
+    stages — частки T_end для поетапного оцінювання; після кожного етапу,
+    крім останнього, лишається survival частка кандидатів. callback
+    (покоління, найкраща вартість, найкращі коефіцієнти) викликається після
+    кожного покоління. Результат: gains, cost, metrics, history (найкраща
+    вартість за поколіннями) та evaluations (кількість прогонів).
+    """
+    base_params = {**BASE_PARAMS, **(base_params or {})}
+    simulator = simulator or AircraftSimulator()
+    bounds = {**BOUNDS, **(bounds or {})}
+    T_end = base_params["T_end"]
+    low = np.log([bounds[name][0] for name in gains])
+    high = np.log([bounds[name][1] for name in gains])
+    defaults = [
+        base_params.get(name, AircraftSimulator.CONTROLLER_DEFAULTS[name])
+        for name in gains
+    ]
+    mean = np.clip(np.log(defaults), low, high)
+    sigma = np.full(len(gains), 0.5)
+    rng = np.random.default_rng(seed)
+
+    best = {"gains": dict(zip(gains, np.exp(mean))), "cost": np.inf, "metrics": None}
+    history, evaluations = [], 0
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    options = dict(
+        simulator=simulator,
+        ny_limits=ny_limits,
+        weights=weights,
+        executor=executor,
+        workers=workers,
+    )
+    try:
+        for generation in range(generations):
+            samples = mean + sigma * rng.standard_normal((population, len(gains)))
+            samples[0] = mean  # поточний центр розподілу завжди оцінюється
+            samples = np.clip(samples, low, high)
+            candidates = [dict(zip(gains, np.exp(row).tolist())) for row in samples]
+
+            alive = np.arange(population)
+            for fraction in stages[:-1]:
+                result = evaluate(
+                    [candidates[i] for i in alive],
+                    base_params,
+                    horizon=fraction * T_end,
+                    **options,
+                )
+                evaluations += len(alive)
+                # Явно погані кандидати далі не моделюються
+                order = np.argsort(result["cost"])
+                ok = np.isfinite(result["cost"]) & (result["ny_violation"] == 0)
+                keep = max(2, int(np.ceil(survival * len(alive))))
+                alive = alive[[i for i in order if ok[i]][:keep]]
+                if len(alive) < 2:
+                    break
+
+            # Ранжування — лише за повним горизонтом для тих, хто лишився
+            finite = []
+            if len(alive):
+                result = evaluate(
+                    [candidates[i] for i in alive],
+                    base_params,
+                    horizon=stages[-1] * T_end,
+                    **options,
+                )
+                evaluations += len(alive)
+                cost = result["cost"]
+                finite = [i for i in np.argsort(cost) if np.isfinite(cost[i])]
+            if finite and cost[finite[0]] < best["cost"]:
+                i = finite[0]
+                best = {
+                    "gains": candidates[alive[i]],
+                    "cost": float(cost[i]),
+                    "metrics": {name: float(result[name][i]) for name in METRICS},
+                }
+            history.append(best["cost"])
+            if callback is not None:
+                callback(generation, best["cost"], best["gains"])
+
+            n_elite = max(2, int(elite * population))
+            elite_rows = samples[alive[finite[:n_elite]]] if len(finite) >= 2 else None
+            if elite_rows is not None:
+                mean = 0.7 * elite_rows.mean(axis=0) + 0.3 * mean
+                sigma = np.maximum(0.7 * elite_rows.std(axis=0) + 0.3 * sigma, 0.02)
+            else:
+                sigma = sigma * 1.5
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {**best, "history": history, "evaluations": evaluations}
+
+
+def main():
+    print("Підбір коефіцієнтів автопілота...")
+    nominal = evaluate([{}])
+    print(f"Початкові коефіцієнти: вартість {nominal['cost'][0]:.4f}")
+    result = tune(
+        workers=0,
+        seed=1,
+        callback=lambda g, cost, gains: print(f"  покоління {g + 1}: {cost:.4f}"),
+    )
+    print("Найкращі коефіцієнти:")
+    for name, value in result["gains"].items():
+        print(f"  {name:8s} = {value:.4f}")
+    for name, value in result["metrics"].items():
+        print(f"  {name:13s} {value:10.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Атмосферна турбулентність (Драйден / фон Карман) та дискретні пориви.
+
+Збурення задаються в params["turbulence"] словником, тож сценарії
+JSON/TOML, кеш і сервіс працюють без змін:
+
+    {"model": "dryden", "intensity": "moderate", "seed": 7,
+     "gusts": [{"t": 20.0, "duration": 3.0, "amplitude": 5.0, "axis": "w"}]}
+
+Ключі: model — dryden або von_karman; intensity — light, moderate,
+severe або СКВ пориву, м/с (0 — лише дискретні пориви); sigma_u,
+sigma_w — окремі СКВ осей; L_u, L_w — масштаби турбулентності, м; seed —
+ціле ≥ 0; gusts — пориви «1 - cos» з моменту t тривалістю duration,
+амплітудою amplitude (м/с) уздовж осі u (назустріч, збільшує ΔV) або w
+(вгору, збільшує α).
+
+Поздовжній порив u додається до ΔV, вертикальний — до α як w / V0 в
+аеродинамічних членах рівнянь руху (кінематика висоти їх не бачить).
+Білий шум генерується блоками по NOISE_BLOCK значень з генератора,
+засіяного (seed, вісь, номер блоку), і фільтрується FIR-ядром, побудованим
+за спектром моделі, — векторизовано, цілими блоками кроків. Тому
+реалізація однозначно визначається seed, dt і V0 та не залежить від
+розбиття прогону на блоки, продовження зі знімка чи складу ансамблю.
+Ядра й блоки кешуються в процесі, тож однакові специфікації в ансамблі
+або Монте-Карло генеруються один раз.
+"""
+
+import functools
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+MODELS = ("dryden", "von_karman")
+AXES = ("u", "w")
+# СКВ пориву, м/с — орієнтовно за MIL-F-8785C для середніх висот
+INTENSITIES = {"light": 1.5, "moderate": 3.0, "severe": 6.0}
+# Масштаби турбулентності вище 2000 футів (1750 та 2500 футів), м
+SCALES = {"dryden": 533.4, "von_karman": 762.0}
+NOISE_BLOCK = 4096
+# Кроків у блоці збурень; ядро довше за блок подовжує блок до своєї довжини
+CHUNK_STEPS = 8192
+MAX_BLOCKS = 16
+
+
+def spectrum_shape(model, axis, L, Omega):
+    """Форма спектральної густини пориву від просторової частоти Ω, рад/м.
+
+    Множник σ² L / π опущено: ядро нормується за дисперсією окремо.
+    """
+    x = L * Omega
+    if model == "dryden":
+        if axis == "u":
+            return 2.0 / (1.0 + x**2)
+        return (1.0 + 3.0 * x**2) / (1.0 + x**2) ** 2
+    a = (1.339 * x) ** 2
+    if axis == "u":
+        return 2.0 / (1.0 + a) ** (5.0 / 6.0)
+    return (1.0 + 8.0 / 3.0 * a) / (1.0 + a) ** (11.0 / 6.0)
+
+
+@functools.lru_cache(maxsize=32)
+def _kernel(model, axis, L, V0, dt):
+    """FIR-ядро одиничної дисперсії: фільтрований білий шум має спектр моделі.
+
+    Довжина — степінь двійки, що покриває 16 часів кореляції L / V0.
+    """
+    size = 64
+    while size < 16 * L / (V0 * dt):
+        size *= 2
+    f = np.fft.rfftfreq(size, dt)
+    shape = spectrum_shape(model, axis, L, 2 * np.pi * f / V0)
+    h = np.fft.fftshift(np.fft.irfft(np.sqrt(shape), size))
+    h /= np.sqrt(np.sum(h**2))
+    h.flags.writeable = False
+    return h
+
+
+@functools.lru_cache(maxsize=64)
+def _kernel_spectrum(model, axis, L, V0, dt, size):
+    return np.fft.rfft(_kernel(model, axis, L, V0, dt), size)
+
+
+@functools.lru_cache(maxsize=256)
+def _noise_block(seed, axis, block):
+    noise = np.random.default_rng([seed, AXES.index(axis), block]).standard_normal(
+        NOISE_BLOCK
+    )
+    noise.flags.writeable = False
+    return noise
+
+
+def white_noise(seed, axis, start, stop):
+    """Білий шум N(0, 1) з індексами [start, stop) — з блоків NOISE_BLOCK."""
+    first, last = start // NOISE_BLOCK, (stop - 1) // NOISE_BLOCK
+    noise = np.concatenate(
+        [_noise_block(seed, axis, block) for block in range(first, last + 1)]
+    )
+    offset = first * NOISE_BLOCK
+    return noise[start - offset : stop - offset]
+
+
+class Turbulence:
+    """Збурення (α_г, ΔV_г) на сітці кроків прогону для однієї специфікації."""
+
+    def __init__(self, spec, V0, dt):
+        spec = dict(spec)
+        self.model = spec.pop("model", "dryden")
+        if self.model not in MODELS:
+            raise ValueError(f"Невідома модель турбулентності: {self.model!r}")
+        intensity = spec.pop("intensity", "light")
+        if isinstance(intensity, str):
+            if intensity not in INTENSITIES:
+                raise ValueError(f"intensity має бути числом або одним з {INTENSITIES}")
+            intensity = INTENSITIES[intensity]
+        self.sigma = {
+            "u": float(spec.pop("sigma_u", intensity)),
+            "w": float(spec.pop("sigma_w", intensity)),
+        }
+        scale = SCALES[self.model]
+        self.L = {
+            "u": float(spec.pop("L_u", scale)),
+            "w": float(spec.pop("L_w", scale)),
+        }
+        self.seed = int(spec.pop("seed", 0))
+        self.gusts = [self._parse_gust(gust) for gust in spec.pop("gusts", ())]
+        if spec:
+            raise ValueError(f"Невідомі ключі турбулентності: {sorted(spec)}")
+        if self.seed < 0 or min(self.sigma.values()) < 0 or min(self.L.values()) <= 0:
+            raise ValueError(
+                "seed та СКВ мають бути невід'ємними, масштаби — додатними"
+            )
+        self.V0, self.dt = float(V0), float(dt)
+        self.chunk = max(CHUNK_STEPS, *(self._kernel(axis).size for axis in AXES))
+        self._blocks = OrderedDict()
+
+    @staticmethod
+    def _parse_gust(gust):
+        gust = dict(gust)
+        try:
+            parsed = (
+                float(gust.pop("t")),
+                float(gust.pop("duration")),
+                float(gust.pop("amplitude")),
+                gust.pop("axis", "w"),
+            )
+        except KeyError as exc:
+            raise ValueError(f"Для пориву потрібен ключ {exc}") from None
+        if parsed[3] not in AXES or parsed[1] <= 0 or gust:
+            raise ValueError("Порив: axis — u або w, duration > 0, без зайвих ключів")
+        return parsed
+
+    def _kernel(self, axis):
+        return _kernel(self.model, axis, self.L[axis], self.V0, self.dt)
+
+    def velocity(self, axis, start, stop):
+        """Швидкість пориву вздовж axis, м/с, на кроках [start, stop)."""
+        n = stop - start
+        result = np.zeros(n)
+        if self.sigma[axis] > 0:
+            h = self._kernel(axis)
+            noise = white_noise(self.seed, axis, start, stop + h.size - 1)
+            size = 1 << (noise.size - 1).bit_length()
+            spectrum = _kernel_spectrum(
+                self.model, axis, self.L[axis], self.V0, self.dt, size
+            )
+            filtered = np.fft.irfft(np.fft.rfft(noise, size) * spectrum, size)
+            result += self.sigma[axis] * filtered[h.size - 1 : h.size - 1 + n]
+        t = np.arange(start, stop) * self.dt
+        for t0, duration, amplitude, gust_axis in self.gusts:
+            if gust_axis == axis:
+                phase = np.clip((t - t0) / duration, 0.0, 1.0)
+                result += 0.5 * amplitude * (1.0 - np.cos(2 * np.pi * phase))
+        return result
+
+    def _block(self, step):
+        start = step - step % self.chunk
+        block = self._blocks.get(start)
+        if block is None:
+            stop = start + self.chunk
+            alpha = self.velocity("w", start, stop) / self.V0
+            block = start, alpha, self.velocity("u", start, stop)
+            self._blocks[start] = block
+            if len(self._blocks) > MAX_BLOCKS:
+                self._blocks.popitem(last=False)
+        return block
+
+    def series(self, start, stop):
+        """(α_г, рад; ΔV_г, м/с) на кроках [start, stop) з кешованих блоків."""
+        alpha, V = [], []
+        step = start
+        while step < stop:
+            first, block_alpha, block_V = self._block(step)
+            end = min(stop, first + self.chunk)
+            alpha.append(block_alpha[step - first : end - first])
+            V.append(block_V[step - first : end - first])
+            step = end
+        return np.concatenate(alpha), np.concatenate(V)
+
+
+@functools.lru_cache(maxsize=16)
+def _shared(key, V0, dt):
+    return Turbulence(json.loads(key), V0, dt)
+
+
+def shared_turbulence(spec, V0, dt):
+    """Turbulence для spec, спільний для однакових специфікацій у процесі.
+
+    Останні MAX_BLOCKS блоків зберігаються в об'єкті, тож ансамбль чи серія
+    прогонів з тим самим spec, dt і V0 генерує кожен блок один раз.
+    """
+    return _shared(json.dumps(spec, sort_keys=True), float(V0), float(dt))